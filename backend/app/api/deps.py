@@ -1,15 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
 
-from ..core.database import get_db
-from ..core.security import verify_token
+from ..core.config import settings
+from ..core.database import get_async_db
 from ..models.user import User
+from ..services.auth_cache import Principal, auth_cache
 
 security = HTTPBearer()
 
-def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -17,14 +19,29 @@ def get_current_user(token: str = Depends(security), db: Session = Depends(get_d
     )
     
     try:
-        payload = verify_token(token.credentials)
+        # Memoized per token until it expires
+        payload = auth_cache.verify(token.credentials)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    # Short-TTL principal cache in front of the users table
+    user = await auth_cache.get_principal(username)
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        db_user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+        if db_user is None:
+            raise credentials_exception
+        user = Principal.from_user(db_user)
+        await auth_cache.set_principal(user)
+    
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    return user
+
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    """The logged-in user, if listed in ADMIN_USERNAMES"""
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return current_user
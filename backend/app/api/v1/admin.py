@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Dict
+
+from ...api.deps import get_admin_user
+from ...core.config import settings
+from ...core.profiling import slow_requests
+from ...models.user import User
+
+router = APIRouter()
+
+@router.get("/slow-requests")
+async def get_slow_requests(
+    limit: int = Query(50, ge=1, le=1000),
+    route: str = Query(None, description="Only requests to this route template, e.g. /api/v1/movies/{movie_id}"),
+    current_user: User = Depends(get_admin_user)
+) -> Dict:
+    """Recent slow requests with their span breakdown (when profiled), newest first"""
+    entries = slow_requests.recent(len(slow_requests.entries))
+    if route:
+        entries = [entry for entry in entries if entry["route"] == route]
+    return {
+        "enabled": settings.PROFILING_ENABLED,
+        "sample_rate": settings.PROFILING_SAMPLE_RATE,
+        "slow_ms": settings.PROFILING_SLOW_MS,
+        **slow_requests.stats(),
+        "items": entries[:limit],
+    }
+
+@router.delete("/slow-requests", status_code=204)
+async def clear_slow_requests(current_user: User = Depends(get_admin_user)) -> Response:
+    """Empty the slow request log"""
+    slow_requests.clear()
+    return Response(status_code=204)
@@ -1,11 +1,15 @@
 from fastapi import APIRouter
+from .admin import router as admin_router
 from .auth import router as auth_router
 from .movies import router as movies_router  
 from .ratings import router as ratings_router
+from .recommendations import router as recommendations_router
 
 api_router = APIRouter()
 
 # Include only the routes you need for TMDB API
 api_router.include_router(auth_router, prefix="/auth", tags=["authentication"])
 api_router.include_router(movies_router, prefix="/movies", tags=["movies"])
-api_router.include_router(ratings_router, prefix="/ratings", tags=["ratings"])
\ No newline at end of file
+api_router.include_router(ratings_router, prefix="/ratings", tags=["ratings"])
+api_router.include_router(recommendations_router, prefix="/recommendations", tags=["recommendations"])
+api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
\ No newline at end of file
@@ -1,22 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from ...core.database import get_db
-from ...core.security import verify_password, get_password_hash, create_access_token
+from ...core.database import get_async_db
+from ...api.deps import get_admin_user, get_current_user
+from ...core.security import create_access_token
 from ...models.user import User
 from ...schemas.user import UserCreate, UserResponse, Token
+from ...services.auth_cache import auth_cache
+from ...services.password_hasher import HasherBusy, password_hasher
 
 router = APIRouter()
 
+def hasher_busy(e: HasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login attempts in progress, please retry shortly",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    taken = (await db.execute(select(User.id).where(User.email == user.email))).first() is not None
+    await db.rollback()  # Give the connection back to the pool while bcrypt runs
+    if taken:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherBusy as e:
+        raise hasher_busy(e)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -24,21 +39,60 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         full_name=user.full_name
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(
+        select(User.id, User.username, User.hashed_password, User.is_active)
+        .where(User.username == form_data.username)
+    )).first()
+    await db.rollback()  # Give the connection back to the pool while bcrypt runs
+    valid, new_hash = False, None
+    if user:
+        # bcrypt runs on the hashing pool, off the event loop and the threadpool
+        try:
+            valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        except HasherBusy as e:
+            raise hasher_busy(e)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+    
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this password was hashed: store it with the current cost
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
     
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/hasher/stats")
+async def hasher_stats(current_user: User = Depends(get_admin_user)):
+    """Password hashing pool queue depth and counters"""
+    return password_hasher.stats()
+
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(current_user: User = Depends(get_current_user)):
+    return current_user
+
+@router.post("/deactivate")
+async def deactivate_account(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Deactivate the current account
+    
+    Its tokens stop working at once on this worker. Other workers may still serve
+    the cached user for up to AUTH_CACHE_TTL seconds (see AuthCache).
+    """
+    await db.execute(update(User).where(User.id == current_user.id).values(is_active=False))
+    await db.commit()
+    await auth_cache.invalidate(current_user.username)
+    return {"message": "Account deactivated"}
@@ -1,136 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
 from app.core.database import get_db  
-from app.services.tmdb_service import tmdb_service
-from typing import Dict, Optional
+from app.core.http_cache import cached_response, track_source_times
+from app.models.movie import Movie
+from app.schemas.movie import MovieBatchRequest, MovieSummary, parse_fields, project
+from app.services import catalog_service
+from app.services.ann_index import similar_index
+from app.services.prefetcher import prefetcher
+from app.services.rating_metadata import rating_metadata_refresher
+from app.services.title_index import title_index
+from app.services.tmdb_service import tmdb_service, resolve_genre_ids, genres_match, CATEGORY_DISCOVER_SORT
+from typing import Dict, List, Optional
+import asyncio
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+FIELDS_DESCRIPTION = "Only return these item fields, comma-separated (e.g. tmdb_id,title,poster_url,average_rating)"
+
+def _format_results(tmdb_data: Dict, genre_ids: List[int] = None, match_all: bool = False) -> List[MovieSummary]:
+    """Format a TMDB page, skipping adult/posterless movies and applying a local genre filter"""
+    movies = []
+    for tmdb_movie in tmdb_data.get("results", []):
+        # Skip adult content and movies without posters
+        if tmdb_movie.get("adult", False) or not tmdb_movie.get("poster_path"):
+            continue
+        
+        # Match against all of the movie's genres, not just the primary one
+        if genre_ids and not genres_match(tmdb_movie.get("genre_ids", []), genre_ids, match_all):
+            continue
+        
+        movies.append(tmdb_service.movie_summary(tmdb_movie))
+    return movies
+
+def _item_fields(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _page_response(request: Request, page: Dict, fields, family: str,
+                   source_times: Optional[List[float]]) -> Response:
+    """Encode a page of movies with orjson directly (skipping FastAPI's generic encoder), with caching headers"""
+    page["items"] = project(page["items"], fields)
+    return cached_response(request, page, family, source_times)
+
 @router.get("/")
 async def get_movies(
+    request: Request,
     category: str = Query("popular", description="Category: popular, trending, now_playing, upcoming, top_rated"),
     page: int = Query(1, ge=1, le=500, description="Page number"),
-    genre: Optional[str] = Query(None, description="Filter by genre name")
-) -> Dict:
-    """Get real movies from TMDB API"""
+    genre: Optional[str] = Query(None, description="Filter by genre name(s), comma-separated"),
+    genre_match: str = Query("any", pattern="^(any|all)$", description="Match any or all of the genres"),
+    min_results: int = Query(0, ge=0, le=100, description="Fetch further pages until at least this many movies"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Get movies from the local catalog, falling back to the TMDB API"""
     try:
         logger.info(f"Fetching {category} movies, page {page}")
         
-        # Get data from TMDB based on category
-        if category == "popular":
-            tmdb_data = tmdb_service.get_popular_movies(page)
-        elif category == "trending":
-            tmdb_data = tmdb_service.get_trending_movies("day", page)
-        elif category == "now_playing":
-            tmdb_data = tmdb_service.get_now_playing_movies(page)
-        elif category == "upcoming":
-            tmdb_data = tmdb_service.get_upcoming_movies(page)
-        elif category == "top_rated":
-            tmdb_data = tmdb_service.get_top_rated_movies(page)
-        else:
-            tmdb_data = tmdb_service.get_popular_movies(page)
+        item_fields = _item_fields(fields)
+        source_times = track_source_times()
+        genre_ids = resolve_genre_ids(genre) if genre else []
+        match_all = genre_match == "all"
+        if genre and not genre_ids:
+            # Unknown genre: nothing can match, don't spend an upstream call
+            return _page_response(request, {"items": [], "total": 0, "page": page, "total_pages": 0,
+                                            "category": category, "limit": 0, "source": "none"},
+                                  item_fields, "list", None)
         
-        # Format movies data
-        movies = []
-        for tmdb_movie in tmdb_data.get("results", []):
-            # Skip adult content and movies without posters
-            if tmdb_movie.get("adult", False) or not tmdb_movie.get("poster_path"):
-                continue
-                
-            formatted_movie = tmdb_service.format_movie_data(tmdb_movie)
-            
-            # Apply genre filter if specified
-            if genre:
-                if genre.lower() not in formatted_movie["genre"].lower():
-                    continue
-            
-            movies.append(formatted_movie)
+        # Serve from the local catalog when it has data for this request
+        if settings.CATALOG_ENABLED:
+            try:
+                local_page = await run_in_threadpool(
+                    catalog_service.list_movies, db, category, genre_ids, page, cursor, match_all=match_all
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except SQLAlchemyError as e:
+                logger.warning(f"Catalog unavailable, falling back to TMDB: {e}")
+                local_page = None
+            if local_page is not None:
+                return _page_response(request, local_page, item_fields, "list", source_times)
         
-        return {
+        # Genre filters go to discover/movie; only trending is filtered here
+        local_genre_ids = genre_ids if category not in CATEGORY_DISCOVER_SORT else None
+        tmdb_data = await tmdb_service.get_category_movies(category, page, genre_ids, match_all)
+        movies = _format_results(tmdb_data, local_genre_ids, match_all)
+        total_pages = min(tmdb_data.get("total_pages", 1), 500)  # TMDB serves at most 500 pages
+        
+        # Fill mode: fetch further pages concurrently until min_results movies
+        next_page = page + 1
+        pages_fetched = 1
+        while (len(movies) < min_results and next_page <= total_pages
+               and pages_fetched < settings.TMDB_FILL_MAX_PAGES):
+            per_page = max(len(movies) / pages_fetched, 1)
+            batch = min(
+                math.ceil((min_results - len(movies)) / per_page),
+                settings.TMDB_FILL_MAX_PAGES - pages_fetched,
+                total_pages - next_page + 1
+            )
+            pages = await asyncio.gather(*(
+                tmdb_service.get_category_movies(category, p, genre_ids, match_all)
+                for p in range(next_page, next_page + batch)
+            ))
+            for extra_data in pages:
+                movies.extend(_format_results(extra_data, local_genre_ids, match_all))
+            next_page += batch
+            pages_fetched += batch
+        
+        return _page_response(request, {
             "items": movies,
             "total": tmdb_data.get("total_results", 0),
             "page": page,
-            "total_pages": tmdb_data.get("total_pages", 1),
+            "total_pages": total_pages,
+            "next_page": next_page if next_page <= total_pages else None,
             "category": category,
-            "limit": len(movies)
-        }
+            "limit": len(movies),
+            "source": "tmdb"
+        }, item_fields, "list", source_times)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching movies: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch movies")
 
 @router.get("/search")
 async def search_movies(
+    request: Request,
     query: str = Query(..., description="Search query"),
-    page: int = Query(1, ge=1, le=500, description="Page number")
-) -> Dict:
+    page: int = Query(1, ge=1, le=500, description="Page number"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Search movies by title"""
+    item_fields = _item_fields(fields)
+    source_times = track_source_times()
     try:
-        tmdb_data = tmdb_service.search_movies(query, page)
-        
-        movies = []
-        for tmdb_movie in tmdb_data.get("results", []):
-            if tmdb_movie.get("adult", False) or not tmdb_movie.get("poster_path"):
-                continue
-                
-            formatted_movie = tmdb_service.format_movie_data(tmdb_movie)
-            movies.append(formatted_movie)
+        tmdb_data = await tmdb_service.search_movies(query, page)
+        movies = _format_results(tmdb_data)
         
-        return {
+        return _page_response(request, {
             "items": movies,
             "total": tmdb_data.get("total_results", 0),
             "page": page,
             "total_pages": tmdb_data.get("total_pages", 1),
             "query": query,
             "limit": len(movies)
-        }
+        }, item_fields, "search", source_times)
         
     except Exception as e:
         logger.error(f"Error searching movies: {e}")
         raise HTTPException(status_code=500, detail="Failed to search movies")
 
+@router.get("/suggest")
+async def suggest_movies(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="What has been typed so far"),
+    limit: int = Query(10, ge=1, description="Number of suggestions")
+) -> Response:
+    """Typeahead title suggestions from the in-process index (no TMDB call)"""
+    if not settings.SUGGEST_ENABLED:
+        raise HTTPException(status_code=503, detail="Suggestions are disabled")
+    
+    limit = min(limit, settings.SUGGEST_MAX_RESULTS)
+    items = title_index.suggest(q, limit)
+    for item in items:
+        poster = item.pop("poster")
+        # Catalog and TMDB titles carry a poster path, rated ones the full URL
+        item["poster_url"] = poster if poster is None or poster.startswith("http") else tmdb_service._get_full_image_url(poster)
+    return cached_response(request, {"query": q, "items": items, "limit": limit}, "search")
+
+@router.post("/batch")
+async def get_movies_batch(batch: MovieBatchRequest) -> Dict:
+    """Details for many movies in one request: cached ones at once, the rest fetched concurrently
+    
+    Movies that could not be fetched are listed under `errors` instead of failing the request.
+    """
+    movie_ids = list(dict.fromkeys(batch.ids))
+    movies, errors = await tmdb_service.get_movies_with_credits(movie_ids)
+    return {
+        "items": [movies[movie_id] for movie_id in movie_ids if movie_id in movies],
+        "errors": [{"tmdb_id": movie_id, "error": errors[movie_id]} for movie_id in movie_ids if movie_id in errors],
+    }
+
 @router.get("/{movie_id}")
-async def get_movie_details(movie_id: int) -> Dict:
+async def get_movie_details(request: Request, movie_id: int) -> Response:
     """Get detailed movie information"""
+    source_times = track_source_times()
     try:
-        movie_data = tmdb_service.get_movie_details(movie_id)
-        credits_data = tmdb_service.get_movie_credits(movie_id)
+        # Details and credits in one upstream round trip, already slimmed and cached
+        movie = await tmdb_service.get_movie_with_credits(movie_id)
         
-        if not movie_data.get("id"):
+        if not movie.get("id"):
             raise HTTPException(status_code=404, detail="Movie not found")
         
-        # Get cast and crew info
-        cast = credits_data.get("cast", [])[:10]  # Top 10 cast members
-        crew = credits_data.get("crew", [])
-        
-        # Find director
-        director = next((person["name"] for person in crew if person["job"] == "Director"), "Unknown")
-        
-        # Format cast names
-        cast_names = [person["name"] for person in cast]
-        
-        return {
-            "id": movie_data["id"],
-            "title": movie_data["title"],
-            "overview": movie_data["overview"],
-            "genres": [g["name"] for g in movie_data.get("genres", [])],
-            "release_date": movie_data.get("release_date"),
-            "runtime": movie_data.get("runtime"),
-            "poster_url": tmdb_service._get_full_image_url(movie_data.get("poster_path")),
-            "backdrop_url": tmdb_service._get_full_image_url(movie_data.get("backdrop_path")),
-            "vote_average": movie_data.get("vote_average"),
-            "vote_count": movie_data.get("vote_count"),
-            "popularity": movie_data.get("popularity"),
-            "director": director,
-            "cast": cast_names[:5],  # Top 5 cast
-            "production_companies": [c["name"] for c in movie_data.get("production_companies", [])[:3]],
-            "budget": movie_data.get("budget"),
-            "revenue": movie_data.get("revenue"),
-            "status": movie_data.get("status"),
-            "tagline": movie_data.get("tagline")
-        }
+        return cached_response(request, movie, "details", source_times)
         
     except HTTPException:
         raise
@@ -138,10 +210,55 @@ async def get_movie_details(movie_id: int) -> Dict:
         logger.error(f"Error fetching movie details: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch movie details")
 
+@router.get("/{movie_id}/similar")
+async def get_similar_movies(
+    request: Request,
+    movie_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Number of similar movies"),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Movies similar to this one, from the approximate nearest neighbour index"""
+    if not similar_index.is_ready:
+        raise HTTPException(status_code=503, detail="Similar movies index is not available")
+    if similar_index.vector(movie_id) is None:
+        raise HTTPException(status_code=404, detail="No similarity data for this movie")
+    
+    neighbours = await run_in_threadpool(similar_index.similar, movie_id, limit, settings.SIMILAR_INDEX_NPROBE)
+    
+    # Attach movie metadata from the local catalog where we have it
+    ids = [neighbour_id for neighbour_id, _ in neighbours]
+    try:
+        rows = await run_in_threadpool(lambda: db.query(Movie).filter(Movie.tmdb_id.in_(ids)).all()) if ids else []
+    except SQLAlchemyError as e:
+        logger.warning(f"Catalog unavailable for similar movies: {e}")
+        rows = []
+    movies = {m.tmdb_id: m for m in rows}
+    
+    items = []
+    for neighbour_id, score in neighbours:
+        item = tmdb_service.format_movie_data(movies[neighbour_id].to_tmdb_dict()) if neighbour_id in movies else {"tmdb_id": neighbour_id}
+        item["score"] = round(score, 4)
+        items.append(item)
+    
+    return cached_response(request, {"movie_id": movie_id, "items": items, "limit": len(items)}, "details")
+
+@router.get("/cache/stats")
+async def get_cache_stats(response: Response) -> Dict:
+    """TMDB response cache hit/miss counters, request coalescing, upstream health and the background jobs"""
+    response.headers["Cache-Control"] = "no-store"
+    return {
+        **tmdb_service.cache.stats(),
+        "singleflight": tmdb_service._inflight.stats(),
+        "upstream": tmdb_service.upstream_stats(),
+        "prefetch": prefetcher.stats(),
+        "title_index": title_index.stats(),
+        "rating_refresh": rating_metadata_refresher.stats(),
+    }
+
 @router.get("/categories/all")
-async def get_movie_categories() -> Dict:
+async def get_movie_categories(request: Request) -> Response:
     """Get all available movie categories"""
-    return {
+    return cached_response(request, {
         "categories": [
             {"id": "popular", "name": "Popular", "description": "Most popular movies right now"},
             {"id": "trending", "name": "Trending", "description": "Trending movies today"},
@@ -161,4 +278,4 @@ async def get_movie_categories() -> Dict:
             {"id": "Crime", "name": "Crime"},
             {"id": "Fantasy", "name": "Fantasy"}
         ]
-    }
\ No newline at end of file
+    }, "static")
\ No newline at end of file
@@ -1,67 +1,221 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import DateTime, bindparam, delete, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+import json
 
-from ...core.database import get_db
+from ...core.database import get_async_db, get_db
 from ...api.deps import get_current_user
 from ...models.user import User
 from ...models.rating import Rating
-from ...schemas.rating import RatingCreate, RatingResponse
+from ...database.pagination import decode_cursor, encode_cursor
+from ...core.config import settings
+from ...schemas.rating import (
+    RatingCreate, RatingResponse, RatingBatchCreate, RatingBatchResult, RatingImportResult, MovieRatingStatsResponse
+)
+from ...services.rating_events import RatingEvent, rating_events
+from ...services.rating_io import PARSERS, LineTooLong, RatingImporter, export_ratings, upsert_ratings
+from ...services.rating_stats import (
+    PREVIOUS_RATING, RATING_STATS_UPSERT, SQLITE_WRITE_LOCK, get_movie_stats, stats_deltas, takes_sqlite_lock,
+    top_movies, user_write_lock
+)
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+# What RatingResponse needs, selected as plain columns instead of loading Rating entities
+MY_RATINGS_COLUMNS = (
+    Rating.id, Rating.user_id, Rating.tmdb_movie_id, Rating.rating,
+    Rating.movie_title, Rating.movie_poster, Rating.created_at
+)
+
+# Rating write in one round trip (PostgreSQL and SQLite share the ON CONFLICT syntax).
+# Textual because SQLAlchemy doesn't cache compiled dialect insert().on_conflict_do_update()
+# statements and would recompile it on every request.
+RATING_UPSERT = text("""
+    INSERT INTO ratings (user_id, tmdb_movie_id, rating, movie_title, movie_poster, created_at, updated_at)
+    VALUES (:user_id, :tmdb_movie_id, :rating, :movie_title, :movie_poster, :now, :now)
+    ON CONFLICT (user_id, tmdb_movie_id) DO UPDATE SET
+        rating = excluded.rating,
+        movie_title = COALESCE(excluded.movie_title, ratings.movie_title),
+        movie_poster = COALESCE(excluded.movie_poster, ratings.movie_poster),
+        updated_at = excluded.updated_at
+    RETURNING id, user_id, tmdb_movie_id, rating, movie_title, movie_poster, created_at, updated_at
+""").bindparams(bindparam("now", type_=DateTime)).columns(*Rating.__table__.columns)
+
 @router.post("/", response_model=RatingResponse)
-def create_rating(
+async def create_rating(
     rating: RatingCreate,
     current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    now = datetime.utcnow()
+    if takes_sqlite_lock(db):
+        await db.execute(SQLITE_WRITE_LOCK, {"user_id": current_user.id})
+    locked = (await db.execute(PREVIOUS_RATING, {
+        "user_id": current_user.id, "tmdb_movie_id": rating.tmdb_movie_id
+    })).first()
+    previous = locked.rating if locked is not None else None
+    # Insert, or update the user's existing rating of this movie, in one statement
+    saved = (await db.execute(RATING_UPSERT, {
+        "user_id": current_user.id,
+        "tmdb_movie_id": rating.tmdb_movie_id,
+        "rating": rating.rating,
+        "movie_title": rating.movie_title,
+        "movie_poster": rating.movie_poster,
+        "now": now
+    })).mappings().one()
+    # The movie's aggregates change in the same transaction
+    deltas = stats_deltas(
+        [(rating.tmdb_movie_id, previous, rating.rating, saved["movie_title"], saved["movie_poster"])], now
+    )
+    if deltas:
+        await db.execute(RATING_STATS_UPSERT, deltas[0])
+    await db.commit()
+    rating_events.publish(RatingEvent(
+        current_user.id, rating.tmdb_movie_id, rating.rating, saved["movie_title"], saved["movie_poster"]
+    ))
+    return saved
+
+@router.post("/batch", response_model=RatingBatchResult)
+def create_ratings_batch(
+    batch: RatingBatchCreate,
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Check if user already rated this movie
-    existing_rating = db.query(Rating).filter(
-        Rating.user_id == current_user.id,
-        Rating.movie_id == rating.movie_id
-    ).first()
+    """Rate many movies at once with multi-row upserts (a later rating of the same movie wins)"""
+    written = upsert_ratings(db, current_user.id, (r.model_dump() for r in batch.ratings))
+    return {"received": len(batch.ratings), "written": written}
+
+@router.post("/import", response_model=RatingImportResult)
+async def import_ratings(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|jsonl)$", description="csv (Letterboxd-style) or jsonl"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import ratings from a CSV or JSON Lines request body, streamed and written in chunks
+    
+    A line longer than RATINGS_IMPORT_MAX_LINE bytes stops the import with a 400;
+    chunks written before it are kept.
+    """
+    parser = PARSERS[format]()
+    importer = RatingImporter(db, current_user.id)
     
-    if existing_rating:
-        # Update existing rating
-        existing_rating.rating = rating.rating
-        db.commit()
-        db.refresh(existing_rating)
-        return existing_rating
+    try:
+        async for data in request.stream():
+            for line, fields in parser.feed(data):
+                importer.add(line, fields)
+            if importer.is_full:
+                await run_in_threadpool(importer.flush)
+        for line, fields in parser.close():
+            importer.add(line, fields)
+    except LineTooLong as e:
+        raise HTTPException(status_code=400, detail=f"{e} (after {importer.written} ratings were written)")
+    await run_in_threadpool(importer.flush)
     
-    # Create new rating
-    db_rating = Rating(
-        user_id=current_user.id,
-        movie_id=rating.movie_id,
-        rating=rating.rating
+    return importer.summary()
+
+@router.get("/movies", response_model=List[MovieRatingStatsResponse])
+async def get_movies_rating_stats(
+    ids: str = Query(..., description="Comma-separated TMDB ids, e.g. the movies on a list page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Community rating aggregates for many movies, one primary key lookup each"""
+    try:
+        tmdb_movie_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not tmdb_movie_ids or len(tmdb_movie_ids) > settings.RATING_STATS_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Pass 1 to {settings.RATING_STATS_MAX_IDS} ids")
+    return await get_movie_stats(db, tmdb_movie_ids)
+
+@router.get("/movies/top", response_model=List[MovieRatingStatsResponse])
+async def get_top_rated_movies(
+    sort: str = Query("bayesian", pattern="^(bayesian|count)$", description="bayesian average or most rated"),
+    min_ratings: int = Query(1, ge=1, description="Leave out movies with fewer ratings"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Movies ranked by our users' ratings, from the maintained aggregates"""
+    return await top_movies(db, sort, min_ratings, limit)
+
+@router.get("/export")
+def export_my_ratings(
+    format: str = Query("csv", pattern="^(csv|jsonl)$", description="csv (Letterboxd-style) or jsonl"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download all of the user's ratings, streamed from the database"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_ratings(db, current_user.id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cinematch-ratings.{format}"'}
     )
-    db.add(db_rating)
-    db.commit()
-    db.refresh(db_rating)
-    return db_rating
 
 @router.get("/my-ratings", response_model=List[RatingResponse])
-def get_my_ratings(
+async def get_my_ratings(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Ratings per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams every remaining rating"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    ratings = db.query(Rating).filter(Rating.user_id == current_user.id).all()
-    return ratings
+    """The user's ratings, newest first, paginated on (created_at, id)"""
+    query = select(*MY_RATINGS_COLUMNS).where(Rating.user_id == current_user.id)
+    if cursor:
+        try:
+            created_at, rating_id = decode_cursor(cursor, datetime)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(Rating.created_at, Rating.id) < tuple_(created_at, rating_id))
+    query = query.order_by(Rating.created_at.desc(), Rating.id.desc())
+    
+    if format == "ndjson":
+        # Server-side cursor: rows are fetched and written in batches, never all at once
+        rows = await db.stream(query.execution_options(yield_per=1000))
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+    
+    rows = (await db.execute(query.limit(limit))).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [row._asdict() for row in rows]
+
+async def _ndjson_lines(rows, batch_size: int = 1000):
+    lines = []
+    async for row in rows:
+        item = row._asdict()
+        item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+        lines.append(json.dumps(item) + "\n")
+        if len(lines) >= batch_size:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
 
 @router.delete("/{rating_id}")
-def delete_rating(
+async def delete_rating(
     rating_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    rating = db.query(Rating).filter(
-        Rating.id == rating_id,
-        Rating.user_id == current_user.id
-    ).first()
+    await db.execute(user_write_lock(db), {"user_id": current_user.id})
+    # Find and delete in one statement
+    deleted = (await db.execute(
+        delete(Rating)
+        .where(Rating.id == rating_id, Rating.user_id == current_user.id)
+        .returning(Rating.tmdb_movie_id, Rating.rating)
+    )).one_or_none()
     
-    if not rating:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Rating not found")
     
-    db.delete(rating)
-    db.commit()
+    tmdb_movie_id = deleted.tmdb_movie_id
+    await db.execute(RATING_STATS_UPSERT, stats_deltas([(tmdb_movie_id, deleted.rating, None, None, None)])[0])
+    await db.commit()
+    rating_events.publish(RatingEvent(current_user.id, tmdb_movie_id, None))
     return {"message": "Rating deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Dict
+
+from ...core.database import get_db
+from ...api.deps import get_current_user
+from ...models.user import User
+from ...models.movie import Movie
+from ...services.recommender import recommender
+from ...services.tmdb_service import tmdb_service
+
+router = APIRouter()
+
+@router.get("/")
+def get_recommendations(
+    limit: int = Query(20, ge=1, le=100, description="Number of recommendations"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """Personalized recommendations from the in-memory item-item model"""
+    scored = recommender.recommend(current_user.id, limit)
+    
+    # Attach movie metadata from the local catalog where we have it
+    ids = [movie_id for movie_id, _ in scored]
+    movies = {m.tmdb_id: m for m in db.query(Movie).filter(Movie.tmdb_id.in_(ids))} if ids else {}
+    
+    items = []
+    for movie_id, score in scored:
+        item = tmdb_service.format_movie_data(movies[movie_id].to_tmdb_dict()) if movie_id in movies else {"tmdb_id": movie_id}
+        item["score"] = round(score, 4)
+        items.append(item)
+    
+    return {"items": items, "limit": len(items), "model": recommender.info()}
+
+# Path used by the frontend's movieService.getPersonalizedRecommendations
+router.add_api_route("/for-me", get_recommendations, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,191 @@
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are gzipped only
+    brotli = None
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # wbits 31 = deflate with a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def available_encodings() -> List[str]:
+    """Content codings the server can produce, most preferred first"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def coded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of the encoded body: a strong validator has to differ per content-coding
+    (RFC 9110 8.8.3), so `"abc"` sent as brotli becomes `"abc-br"`. Weak ETags stay as they are."""
+    if not etag.startswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_coding(etag: str) -> str:
+    """The identity form of an ETag that coded_etag may have suffixed"""
+    for encoding in ("br", "gzip"):
+        suffix = f'-{encoding}"'
+        if etag.startswith('"') and etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick a content coding from an Accept-Encoding header
+
+    The highest q-value wins, ties go to the order of `supported`;
+    `*` covers any coding not listed and q=0 refuses one.
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses responses with brotli or gzip, as negotiated with Accept-Encoding
+
+    Complete bodies under `minimum_size` bytes are sent as is: compressing them
+    costs more CPU than it saves on the wire. Streamed bodies are compressed
+    chunk by chunk and flushed, so each chunk reaches the client as it is sent.
+    Responses that already have a Content-Encoding are left alone. A compressed
+    response's strong ETag gets the coding appended (see coded_etag), and a 304
+    echoes the coded form the client sent in If-None-Match.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+            if encoding is not None:
+                await CompressionResponder(self.app, self, encoding)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, middleware: CompressionMiddleware, encoding: str):
+        self.app = app
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Optional[Send] = None
+        self.scope: Scope = {}
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        self.scope = scope
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.initial_message = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            if message["status"] == 304:
+                self.passthrough = True
+                self.match_coded_etag(message)
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = self.middleware.compressor(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if "etag" in headers:
+                headers["ETag"] = coded_etag(headers["etag"], self.encoding)
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                body = self.compressor.compress(body)
+            else:
+                body = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.initial_message)
+            await self.send({**message, "body": body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        body = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+        await self.send({**message, "body": body})
+
+    def match_coded_etag(self, message: Message) -> None:
+        """Give a 304 the ETag form the client validated with, when that was our coded one"""
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+        if etag is None:
+            return
+        coded = coded_etag(etag, self.encoding)
+        if_none_match = Headers(scope=self.scope).get("if-none-match", "")
+        if coded != etag and coded in {tag.strip() for tag in if_none_match.split(",")}:
+            headers["ETag"] = coded
@@ -8,20 +8,123 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./cinematch.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))  # connections kept open, per engine
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # extra connections under load
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # drop dead connections
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; below the server's idle timeout
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms to wait on a locked database
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing (bcrypt runs on a dedicated process pool)
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # changing it rehashes passwords at next login
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = threadpool
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))  # waiting jobs before 503
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "2"))  # seconds, on 503
+    
+    # Authenticated user cache (skips the JWT decode and user query on repeat requests)
+    AUTH_CACHE_ENABLED: bool = os.getenv("AUTH_CACHE_ENABLED", "true").lower() == "true"
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "60"))  # seconds a user lookup is reused
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_CACHE_REDIS_ENABLED: bool = os.getenv("AUTH_CACHE_REDIS_ENABLED", "false").lower() == "true"
+    
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # TMDB response cache (in-process LRU + optional Redis tier)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_REDIS_ENABLED: bool = os.getenv("CACHE_REDIS_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_TTL_LIST: int = int(os.getenv("CACHE_TTL_LIST", "3600"))  # popular, top_rated, trending...
+    CACHE_TTL_DETAILS: int = int(os.getenv("CACHE_TTL_DETAILS", "21600"))
+    CACHE_TTL_CREDITS: int = int(os.getenv("CACHE_TTL_CREDITS", "86400"))
+    CACHE_TTL_SEARCH: int = int(os.getenv("CACHE_TTL_SEARCH", "600"))
+    CACHE_STALE_TTL: int = int(os.getenv("CACHE_STALE_TTL", "86400"))  # seconds expired entries can be served while TMDB is down
+    
+    # Cache prefetcher (keeps category pages 1..PREFETCH_PAGES warm)
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_PAGES: int = int(os.getenv("PREFETCH_PAGES", "5"))
+    PREFETCH_INTERVAL: int = int(os.getenv("PREFETCH_INTERVAL", "60"))  # seconds between expiry checks
+    PREFETCH_REFRESH_AHEAD: int = int(os.getenv("PREFETCH_REFRESH_AHEAD", "300"))  # refresh this long before expiry
+    PREFETCH_JITTER: int = int(os.getenv("PREFETCH_JITTER", "30"))  # seconds, spreads workers apart
+    PREFETCH_CONCURRENCY: int = int(os.getenv("PREFETCH_CONCURRENCY", "4"))  # upstream calls at once
+    
+    # Local movie catalog (served instead of live TMDB lists once synced)
+    CATALOG_ENABLED: bool = os.getenv("CATALOG_ENABLED", "true").lower() == "true"
+    CATALOG_SYNC_ENABLED: bool = os.getenv("CATALOG_SYNC_ENABLED", "true").lower() == "true"
+    CATALOG_SYNC_INTERVAL: int = int(os.getenv("CATALOG_SYNC_INTERVAL", "1800"))  # seconds
+    CATALOG_SYNC_PAGES: int = int(os.getenv("CATALOG_SYNC_PAGES", "5"))  # pages per category per pass
+    CATALOG_DISCOVER_PAGES: int = int(os.getenv("CATALOG_DISCOVER_PAGES", "20"))  # discover pages per pass
+    CATALOG_TOP_RATED_MIN_VOTES: int = int(os.getenv("CATALOG_TOP_RATED_MIN_VOTES", "200"))
+    CATALOG_NOW_PLAYING_DAYS: int = int(os.getenv("CATALOG_NOW_PLAYING_DAYS", "42"))
+    
+    # Ratings
+    RATINGS_BATCH_MAX_ITEMS: int = int(os.getenv("RATINGS_BATCH_MAX_ITEMS", "5000"))  # per POST /ratings/batch
+    RATINGS_IMPORT_CHUNK_SIZE: int = int(os.getenv("RATINGS_IMPORT_CHUNK_SIZE", "500"))  # rows per transaction
+    RATINGS_IMPORT_MAX_LINE: int = int(os.getenv("RATINGS_IMPORT_MAX_LINE", "65536"))  # bytes per line (or quoted CSV record)
+    RATING_STATS_PRIOR_WEIGHT: float = float(os.getenv("RATING_STATS_PRIOR_WEIGHT", "10"))  # Bayesian average: ratings' worth of the global mean
+    RATING_STATS_MAX_IDS: int = int(os.getenv("RATING_STATS_MAX_IDS", "100"))  # per GET /ratings/movies?ids=
+    
+    # Rating metadata refresh (keeps the movie_title/movie_poster copies on ratings current)
+    RATING_REFRESH_ENABLED: bool = os.getenv("RATING_REFRESH_ENABLED", "true").lower() == "true"
+    RATING_REFRESH_MAX_AGE: int = int(os.getenv("RATING_REFRESH_MAX_AGE", "604800"))  # seconds before a movie is re-checked
+    RATING_REFRESH_BATCH_SIZE: int = int(os.getenv("RATING_REFRESH_BATCH_SIZE", "50"))  # movies per TMDB batch
+    RATING_REFRESH_RATE: float = float(os.getenv("RATING_REFRESH_RATE", "5"))  # movies/second, leaves the TMDB quota to users
+    RATING_REFRESH_MAX_ROWS: int = int(os.getenv("RATING_REFRESH_MAX_ROWS", "5000"))  # rating rows per UPDATE transaction
+    RATING_REFRESH_INTERVAL: int = int(os.getenv("RATING_REFRESH_INTERVAL", "3600"))  # seconds between full passes
+    
+    # Recommendations
+    RECOMMENDER_MODEL_PATH: str = os.getenv("RECOMMENDER_MODEL_PATH", "./data/recommender.npz")
+    RECOMMENDER_NEIGHBORS: int = int(os.getenv("RECOMMENDER_NEIGHBORS", "50"))  # similar items kept per item
+    RECOMMENDER_MAX_USER_RATINGS: int = int(os.getenv("RECOMMENDER_MAX_USER_RATINGS", "1000"))  # per user, for similarity
+    RECOMMENDER_REBUILD_INTERVAL: int = int(os.getenv("RECOMMENDER_REBUILD_INTERVAL", "21600"))  # full retrain, seconds
+    RECOMMENDER_REBUILD_AFTER_UPDATES: int = int(os.getenv("RECOMMENDER_REBUILD_AFTER_UPDATES", "5000"))
+    RECOMMENDER_TRAIN_ON_STARTUP: bool = os.getenv("RECOMMENDER_TRAIN_ON_STARTUP", "true").lower() == "true"
+    SIMILAR_INDEX_PATH: str = os.getenv("SIMILAR_INDEX_PATH", "./data/similar_index")
+    SIMILAR_INDEX_NPROBE: int = int(os.getenv("SIMILAR_INDEX_NPROBE", "16"))  # clusters scanned per query
+    
+    # Title suggestions (in-process typeahead index over catalog, cached and rated titles)
+    SUGGEST_ENABLED: bool = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+    SUGGEST_MAX_RESULTS: int = int(os.getenv("SUGGEST_MAX_RESULTS", "20"))  # upper bound for ?limit=
+    SUGGEST_TYPO_MIN_LENGTH: int = int(os.getenv("SUGGEST_TYPO_MIN_LENGTH", "4"))  # shorter words must match as typed
+    
     # API
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "CineMatch"
     PROJECT_VERSION: str = "1.0.0"
     
+    # Response compression (brotli when the brotli package is installed, else gzip)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies go as is
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    
+    # HTTP caching of /movies responses (ETag, Cache-Control, Last-Modified)
+    HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_MAX_AGE_LIST: int = int(os.getenv("HTTP_MAX_AGE_LIST", "60"))  # seconds browsers/CDNs reuse a category page
+    HTTP_MAX_AGE_SEARCH: int = int(os.getenv("HTTP_MAX_AGE_SEARCH", "300"))
+    HTTP_MAX_AGE_DETAILS: int = int(os.getenv("HTTP_MAX_AGE_DETAILS", "3600"))  # movie detail and similar movies
+    HTTP_STALE_WHILE_REVALIDATE: int = int(os.getenv("HTTP_STALE_WHILE_REVALIDATE", "60"))
+    
+    # Metrics (Prometheus text format at /metrics; cheap enough to leave on)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Request profiling (span breakdown of sampled requests, slow ones kept for /admin/slow-requests)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # share profiled
+    PROFILING_HEADER_SECRET: str = os.getenv("PROFILING_HEADER_SECRET", "")  # X-Profile must carry it; empty ignores the header
+    PROFILING_SLOW_MS: float = float(os.getenv("PROFILING_SLOW_MS", "1000"))  # slower requests are kept
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "200"))  # slow requests kept (oldest dropped)
+    
+    # Admin endpoints (usernames, comma separated)
+    @property
+    def ADMIN_USERNAMES(self) -> List[str]:
+        return [name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()]
+    
     # CORS - Fixed parsing
     @property
     def BACKEND_CORS_ORIGINS(self) -> List[str]:
@@ -30,7 +133,26 @@ class Settings:
     
     # TMDB
     TMDB_API_KEY: Optional[str] = os.getenv("TMDB_API_KEY")
-    TMDB_BASE_URL: str = "https://api.themoviedb.org/3"
+    TMDB_BASE_URL: str = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+    TMDB_TIMEOUT: float = float(os.getenv("TMDB_TIMEOUT", "10"))
+    TMDB_MAX_CONNECTIONS: int = int(os.getenv("TMDB_MAX_CONNECTIONS", "100"))
+    TMDB_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("TMDB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    TMDB_MAX_CONCURRENCY: int = int(os.getenv("TMDB_MAX_CONCURRENCY", "50"))
+    TMDB_HTTP2: bool = os.getenv("TMDB_HTTP2", "true").lower() == "true"
+    TMDB_FILL_MAX_PAGES: int = int(os.getenv("TMDB_FILL_MAX_PAGES", "5"))  # page cap for min_results fill
+    TMDB_DETAILS_MODE: str = os.getenv("TMDB_DETAILS_MODE", "append")  # append (one request) or parallel
+    TMDB_BATCH_MAX_IDS: int = int(os.getenv("TMDB_BATCH_MAX_IDS", "300"))  # per POST /movies/batch
+    TMDB_BATCH_CONCURRENCY: int = int(os.getenv("TMDB_BATCH_CONCURRENCY", "10"))  # upstream calls at once per batch
+    TMDB_CONNECT_TIMEOUT: float = float(os.getenv("TMDB_CONNECT_TIMEOUT", "3"))
+    
+    # TMDB resilience (rate limit, retries, circuit breaker)
+    TMDB_RATE_LIMIT: float = float(os.getenv("TMDB_RATE_LIMIT", "40"))  # requests/second per worker (0 = unlimited)
+    TMDB_RATE_BURST: int = int(os.getenv("TMDB_RATE_BURST", "20"))
+    TMDB_MAX_RETRIES: int = int(os.getenv("TMDB_MAX_RETRIES", "2"))  # on 429, 5xx and connection errors
+    TMDB_RETRY_BACKOFF: float = float(os.getenv("TMDB_RETRY_BACKOFF", "0.25"))  # seconds, doubled per attempt, jittered
+    TMDB_RETRY_MAX_DELAY: float = float(os.getenv("TMDB_RETRY_MAX_DELAY", "5"))  # longer Retry-After gives up instead
+    TMDB_BREAKER_THRESHOLD: int = int(os.getenv("TMDB_BREAKER_THRESHOLD", "5"))  # consecutive failures to open (0 = off)
+    TMDB_BREAKER_RESET: float = float(os.getenv("TMDB_BREAKER_RESET", "30"))  # seconds open before a trial request
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -1,8 +1,12 @@
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core import profiling
+from app.core.metrics import instrument_engine
 import redis
 import logging
 
@@ -11,18 +15,71 @@ logger = logging.getLogger(__name__)
 # Database URL
 DATABASE_URL = settings.DATABASE_URL
 
+# Same database through an asyncio driver, for the async session
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+def engine_options(url: str) -> dict:
+    """Pool settings for create_engine / create_async_engine"""
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/").endswith(":"):
+            return {}  # One shared in-memory connection, no pool to size
+        return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the writer; NORMAL sync is safe with WAL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-16000")  # KiB, per connection
+    cursor.close()
+
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
-        echo=settings.DEBUG  # This will work now
+        echo=settings.DEBUG,  # This will work now
+        **engine_options(DATABASE_URL)
     )
+    # aiosqlite defaults to NullPool, i.e. a new connection (and thread) per session
+    pool_options = engine_options(DATABASE_URL)
+    if pool_options:
+        pool_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), echo=settings.DEBUG, **pool_options)
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
 else:
-    engine = create_engine(DATABASE_URL, echo=settings.DEBUG)
+    engine = create_engine(DATABASE_URL, echo=settings.DEBUG, **engine_options(DATABASE_URL))
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL), echo=settings.DEBUG, **engine_options(DATABASE_URL)
+    )
+
+# Query timing and pool checkouts for /metrics
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+if settings.PROFILING_ENABLED:
+    profiling.instrument_engine(engine, "sync")
+    profiling.instrument_engine(async_engine.sync_engine, "async")
 
 # Create SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async sessions for routes that await the database instead of using a threadpool slot
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 def get_db():
     """Dependency to get database session"""
@@ -32,6 +89,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def test_db_connection():
     """Test database connection"""
     try:
@@ -0,0 +1,85 @@
+import hashlib
+from contextvars import ContextVar
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, List, Optional
+
+from fastapi import Request, Response
+
+from app.core.compression import strip_coding
+from app.core.config import settings
+from app.core.profiling import ORJSONResponse
+
+# Seconds the fixed category/genre lists may be reused
+STATIC_MAX_AGE = 86400
+
+# When the data behind the response being built was fetched from TMDB or synced
+# into the catalog. Each request runs in its own context, so this is per request.
+_source_times: ContextVar[Optional[List[float]]] = ContextVar("source_times", default=None)
+
+def track_source_times() -> List[float]:
+    """Start collecting source data times for the current request, returns the list they go into"""
+    times: List[float] = []
+    _source_times.set(times)
+    return times
+
+def note_source_time(timestamp: float):
+    """Record when a piece of data used by the current request was fetched (no-op if not tracking)"""
+    times = _source_times.get()
+    if times is not None:
+        times.append(timestamp)
+
+def cache_control(family: str) -> str:
+    max_age = {
+        "list": settings.HTTP_MAX_AGE_LIST,
+        "search": settings.HTTP_MAX_AGE_SEARCH,
+        "details": settings.HTTP_MAX_AGE_DETAILS,
+        "static": STATIC_MAX_AGE,
+    }[family]
+    return f"public, max-age={max_age}, stale-while-revalidate={settings.HTTP_STALE_WHILE_REVALIDATE}"
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when there is no If-None-Match (RFC 9110 13.2.2)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison; tags CompressionMiddleware suffixed with a coding match too
+        return etag in {strip_coding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cached_response(request: Request, content: Any, family: str,
+                    source_times: Optional[List[float]] = None) -> Response:
+    """Encode a GET response with a strong ETag and caching headers, or answer 304 Not Modified
+
+    The ETag hashes the encoded body, so it is the same on every worker for the
+    same cached upstream payload. `source_times` (from track_source_times) gives
+    Last-Modified; when it was tracked but is empty nothing came from a cache or
+    a successful fetch (e.g. TMDB failed), and the response is marked no-cache.
+    """
+    response = ORJSONResponse(content)
+    if not settings.HTTP_CACHE_ENABLED:
+        return response
+
+    etag = strong_etag(response.body)
+    last_modified = max(source_times) if source_times else None
+    headers = {"ETag": etag}
+    if source_times is not None and not source_times:
+        headers["Cache-Control"] = "no-cache"
+    else:
+        headers["Cache-Control"] = cache_control(family)
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
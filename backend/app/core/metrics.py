@@ -0,0 +1,260 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds; HTTP and TMDB latencies, then database queries (mostly well under a millisecond)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response adds the charset
+
+Labels = Tuple[str, ...]
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer():
+            return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values]
+
+
+class Histogram:
+    """Bucketed observations per label set (cumulative `le` buckets, _sum and _count when rendered)
+
+    An observation is a bisect and two additions under a lock, cheap enough
+    to time every request and every query.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: a count per bucket, then +Inf, then the sum
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        names = self.labelnames + ("le",)
+        lines = []
+        for labels, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(float(bound)),))} "
+                             f"{cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Collected:
+    """A gauge or counter read from existing state when scraped, so it costs nothing in between
+
+    `collect` returns (label values, value) pairs.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Labels, float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in self.collect()]
+
+
+class MetricsRegistry:
+    """The process's metrics, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collected(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                  collect: Callable[[], Iterable[Tuple[Labels, float]]]) -> Collected:
+        return self._register(Collected(name, documentation, kind, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.render()
+            except Exception as e:
+                # One broken collector shouldn't take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+                continue
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+# Create singleton instance
+metrics = MetricsRegistry()
+
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template",
+    ["method", "route", "status"]
+)
+db_query_seconds = metrics.histogram(
+    "db_query_duration_seconds", "Database statement execution time", ["engine"], QUERY_BUCKETS
+)
+db_pool_checkouts = metrics.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool", ["engine"]
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request into http_request_duration_seconds
+
+    Requests are labelled with the matched route's path template (so
+    /movies/{movie_id} is one series, not one per movie); anything no route
+    matched is "unmatched". Streamed responses are timed until the last chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path_format", None) or "unmatched"
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], route, str(status))
+
+
+_engines: Dict[str, object] = {}
+
+
+def instrument_engine(engine, name: str):
+    """Time the engine's statements and count its pool checkouts (for an async engine pass .sync_engine)"""
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            db_query_seconds.observe(time.perf_counter() - started, name)
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc(name)
+
+
+def _pool_connections():
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):  # QueuePool; SQLite in-memory databases have no pool to size
+            yield (name, "checked_out"), pool.checkedout()
+            yield (name, "idle"), pool.checkedin()
+            yield (name, "overflow"), max(0, pool.overflow())
+
+
+def _threadpool():
+    # Sync routes, dependencies and run_in_threadpool calls share anyio's default limiter
+    from anyio import to_thread
+
+    limiter = to_thread.current_default_thread_limiter().statistics()
+    yield ("busy",), limiter.borrowed_tokens
+    yield ("limit",), limiter.total_tokens
+    yield ("waiting",), limiter.tasks_waiting
+
+
+metrics.collected("db_pool_connections", "Pooled database connections by state", "gauge",
+                  ["engine", "state"], _pool_connections)
+metrics.collected("threadpool_tasks", "Worker threads in use, their limit, and tasks queued for one", "gauge",
+                  ["state"], _threadpool)
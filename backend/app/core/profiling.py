@@ -0,0 +1,180 @@
+import hmac
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from fastapi.responses import ORJSONResponse as BaseORJSONResponse
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+MAX_SPANS = 500  # Per request; a runaway loop of queries shouldn't grow one trace without bound
+SPAN_NAME_LENGTH = 120
+
+
+class RequestTrace:
+    """Spans (kind, name, start, duration) recorded while one request is served"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[tuple] = []
+        self.dropped = 0
+
+    def add(self, kind: str, name: str, started: float, finished: float):
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append((kind, name, started, finished - started))
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per span kind"""
+        totals: Dict[str, float] = {}
+        for kind, _, _, duration in self.spans:
+            totals[kind] = totals.get(kind, 0.0) + duration
+        return totals
+
+    def describe(self) -> Dict:
+        return {
+            "totals_ms": {kind: round(seconds * 1000, 3) for kind, seconds in self.totals().items()},
+            "spans": [
+                {"kind": kind, "name": name, "start_ms": round((started - self.started) * 1000, 3),
+                 "duration_ms": round(duration * 1000, 3)}
+                for kind, name, started, duration in self.spans
+            ],
+            "dropped_spans": self.dropped,
+        }
+
+
+# The trace of the request being served, None when it isn't profiled. Each request
+# runs in its own context (copied into threadpool calls), so this is per request.
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def record_span(kind: str, name: str, started: float, finished: Optional[float] = None):
+    """Add a span (perf_counter times) to the current request's trace; a no-op when it isn't profiled"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(kind, name, started, time.perf_counter() if finished is None else finished)
+
+
+class ORJSONResponse(BaseORJSONResponse):
+    """ORJSONResponse whose encoding shows up as a "serialize" span"""
+
+    def render(self, content) -> bytes:
+        if _trace.get() is None:
+            return super().render(content)
+        started = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            record_span("serialize", "orjson", started)
+
+
+def instrument_engine(engine, name: str):
+    """Record the engine's statements as "db" spans (for an async engine pass .sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _trace.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profile_started", None)
+        if started is not None:
+            record_span("db", f"{name}: {' '.join(statement.split())[:SPAN_NAME_LENGTH]}", started)
+
+
+class SlowRequestLog:
+    """The last `max_entries` slow (or explicitly profiled) requests, newest last"""
+
+    def __init__(self, max_entries: int):
+        self.entries: Deque[Dict] = deque(maxlen=max_entries)
+        self.recorded = 0
+
+    def add(self, entry: Dict):
+        self.entries.append(entry)
+        self.recorded += 1
+
+    def recent(self, limit: int) -> List[Dict]:
+        return list(self.entries)[-limit:][::-1]
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        return {"entries": len(self.entries), "max_entries": self.entries.maxlen, "recorded": self.recorded}
+
+
+class ProfilingMiddleware:
+    """Records a span breakdown for sampled requests and keeps the slow ones
+
+    A request is profiled when it carries an `X-Profile` header whose value is
+    `secret`, or falls in the `sample_rate` share of requests. Its TMDB calls,
+    database statements and JSON encoding are recorded as spans, summed in a
+    Server-Timing response header when asked for by header. Any request slower
+    than `slow_ms` goes to `log` (with its spans if it was profiled); fast
+    header-profiled ones only get the header, so they can't push slow requests
+    out of the log. Unprofiled requests cost two clock reads.
+    """
+
+    def __init__(self, app: ASGIApp, log: SlowRequestLog, sample_rate: float = 0.0, slow_ms: float = 1000,
+                 secret: str = ""):
+        self.app = app
+        self.log = log
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_ms / 1000
+        self.secret = secret.encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = bool(self.secret) and any(
+            name == PROFILE_HEADER and hmac.compare_digest(value, self.secret) for name, value in scope["headers"]
+        )
+        trace = RequestTrace() if requested or (self.sample_rate and random.random() < self.sample_rate) else None
+        token = _trace.set(trace) if trace is not None else None
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if requested:
+                    server_timing = [f"{kind};dur={seconds * 1000:.2f}" for kind, seconds in trace.totals().items()]
+                    server_timing.append(f"total;dur={(time.perf_counter() - started) * 1000:.2f}")
+                    MutableHeaders(scope=message).append("Server-Timing", ", ".join(server_timing))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - started
+            if token is not None:
+                _trace.reset(token)
+            if duration >= self.slow_seconds:
+                route = getattr(scope.get("route"), "path_format", None)
+                self.log.add({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "route": route,
+                    "status": status,
+                    "finished_at": datetime.utcnow().isoformat(),
+                    "duration_ms": round(duration * 1000, 3),
+                    "trigger": "header" if requested else "slow",
+                    **(trace.describe() if trace is not None else {"totals_ms": None, "spans": None}),
+                })
+
+
+# Create singleton instance
+slow_requests = SlowRequestLog(settings.PROFILING_BUFFER_SIZE)
@@ -1,17 +1,22 @@
+from sqlalchemy import func, inspect, select, text
 from sqlalchemy.orm import Session
 from app.core.database import engine  # ✅ Updated import
 from app.database.base import Base
 from app.models.user import User
-# from app.models.movie import Movie  # ✅ Remove this import
-from app.models.rating import Rating
+from app.models.movie import Movie, MovieGenre
+from app.models.rating import MovieRatingStats, Rating
+from app.models.checkpoint import JobCheckpoint
+from app.services.rating_stats import rebuild_rating_stats, refresh_bayesian_scores
 
 def init_database():
     """Initialize database with tables"""
     print("🎬 Initializing CineMatch database...")
     
     try:
-        # Create all tables (users, ratings only)
+        # Create all tables (users, ratings, movie catalog, job checkpoints)
         Base.metadata.create_all(bind=engine)
+        ensure_rating_indexes()
+        ensure_rating_stats()
         print("✅ Database tables created successfully!")
         return True
         
@@ -19,6 +24,38 @@ def init_database():
         print(f"❌ Database initialization failed: {e}")
         return False
 
+def ensure_rating_indexes():
+    """Add the unique (user_id, tmdb_movie_id) index, and any newer ones, to an existing ratings table"""
+    with engine.begin() as connection:
+        # Keep the newest row of any duplicate ratings so the unique index can be built
+        removed = connection.execute(text(
+            "DELETE FROM ratings WHERE id NOT IN "
+            "(SELECT MAX(id) FROM ratings GROUP BY user_id, tmdb_movie_id)"
+        )).rowcount
+        if removed:
+            print(f"🧹 Removed {removed} duplicate ratings")
+        for index in Rating.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def ensure_rating_stats():
+    """Build the per-movie rating aggregates for ratings written before they were maintained"""
+    with engine.begin() as connection:
+        # Columns added after the table (see rating_metadata and top_movies)
+        columns = {c["name"] for c in inspect(connection).get_columns("movie_rating_stats")}
+        if "metadata_synced_at" not in columns:
+            connection.execute(text("ALTER TABLE movie_rating_stats ADD COLUMN metadata_synced_at TIMESTAMP"))
+        if "bayesian_score" not in columns:
+            connection.execute(text("ALTER TABLE movie_rating_stats ADD COLUMN bayesian_score FLOAT NOT NULL DEFAULT 0"))
+            refresh_bayesian_scores(connection)
+        for index in MovieRatingStats.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        if connection.execute(select(func.count()).select_from(MovieRatingStats)).scalar():
+            return
+        if not connection.execute(select(Rating.id).limit(1)).first():
+            return
+        movies = rebuild_rating_stats(connection)
+        print(f"📊 Built rating aggregates for {movies} movies")
+
 def create_sample_users():
     """Create sample users for testing"""
     from sqlalchemy.orm import sessionmaker
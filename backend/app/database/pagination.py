@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Tuple
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Opaque keyset cursor for the last row of a page: (sort value, tie-breaking id)"""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+def decode_cursor(cursor: str, sort_type=None) -> Tuple:
+    """Decode a keyset cursor, raising ValueError if it is malformed.
+
+    `sort_type` (date or datetime) parses an ISO-formatted sort value back.
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_type is not None:
+            sort_value = sort_type.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
@@ -0,0 +1,45 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import Table, func
+
+# SQLite caps bound parameters per statement, so multi-row inserts are chunked
+MAX_PARAMS_PER_STATEMENT = 30000
+
+def dialect_insert(dialect_name: str):
+    """Get the dialect's INSERT construct that supports ON CONFLICT"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect '{dialect_name}'")
+    return insert
+
+def upsert_statement(dialect_name: str, table: Table, rows: Optional[List[Dict]],
+                     index_elements: Sequence[str], update_columns: Iterable[str],
+                     keep_existing: Iterable[str] = ()):
+    """Build a multi-row INSERT ... ON CONFLICT (index_elements) DO UPDATE statement
+
+    With rows=None the statement has no VALUES and is meant to be executed with a
+    list of parameter dicts, which skips compiling every row into the SQL.
+    Columns in `keep_existing` keep their stored value when the new one is NULL.
+    """
+    insert = dialect_insert(dialect_name)
+    stmt = insert(table) if rows is None else insert(table).values(rows)
+    update_columns = list(update_columns)
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    keep_existing = set(keep_existing)
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={
+            column: func.coalesce(stmt.excluded[column], table.c[column]) if column in keep_existing
+            else stmt.excluded[column]
+            for column in update_columns
+        }
+    )
+
+def chunked(rows: List[Dict], columns_per_row: int) -> Iterable[List[Dict]]:
+    """Split rows so each multi-row statement stays under the parameter limit"""
+    size = max(1, MAX_PARAMS_PER_STATEMENT // max(1, columns_per_row))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
@@ -1,9 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.core.config import settings
-from app.core.database import test_db_connection, test_redis_connection
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from app.core.profiling import ORJSONResponse, ProfilingMiddleware, slow_requests
+from app.core.database import test_db_connection, test_redis_connection, SessionLocal, async_engine
 from app.api.v1.api import api_router  # Add this import
+from app.services.tmdb_service import tmdb_service
+from app.services.auth_cache import auth_cache
+from app.services.password_hasher import password_hasher
+from app.services.catalog_service import catalog_sync
+from app.services.prefetcher import prefetcher
+from app.services.recommender import recommender
+from app.services.ann_index import similar_index
+from app.services.rating_events import rating_events
+from app.services.rating_metadata import rating_metadata_refresher
+from app.services.title_index import title_index
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
 
 # Configure logging
@@ -14,7 +29,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -24,11 +40,65 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Compress large responses (brotli or gzip, as the client accepts)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Opt-in span breakdown of sampled / X-Profile requests; slow ones are kept for /admin/slow-requests
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        log=slow_requests,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        slow_ms=settings.PROFILING_SLOW_MS,
+        secret=settings.PROFILING_HEADER_SECRET,
+    )
+
+# Time every request per route (outermost, so compression and profiling are included)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API routes - ADD THIS
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Background jobs
+background_tasks = []  # Cancelled on shutdown
+
+def train_recommender():
+    """Train the recommender from the ratings table and save it (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        recommender.fit_from_db(db)
+        recommender.save(settings.RECOMMENDER_MODEL_PATH)
+    except Exception as e:
+        logger.error(f"❌ Recommender training failed: {e}")
+    finally:
+        db.close()
+
+def build_title_index():
+    """Index the catalog and rated titles for /movies/suggest (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        title_index.load_from_db(db)
+    except Exception as e:
+        logger.error(f"❌ Title index build failed: {e}")
+    finally:
+        db.close()
+
+async def rebuild_recommender_periodically():
+    while True:
+        await asyncio.sleep(60)
+        if recommender.needs_rebuild():
+            await run_in_threadpool(train_recommender)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -43,6 +113,63 @@ async def startup_event():
     
     # Test Redis connection (optional)
     test_redis_connection()
+    
+    # Attach the Redis tier of the TMDB cache (falls back to memory only)
+    if settings.CACHE_ENABLED:
+        await tmdb_service.cache.connect()
+    if settings.AUTH_CACHE_ENABLED and settings.AUTH_CACHE_REDIS_ENABLED:
+        await auth_cache.principals.connect()
+    
+    # bcrypt runs on its own process pool; spawn the workers before the first login
+    password_hasher.start()
+    
+    # Keep hot category pages cached, refreshing them before they expire
+    if settings.PREFETCH_ENABLED and settings.CACHE_ENABLED and tmdb_service.api_key:
+        prefetcher.start()
+    
+    # Keep the local movie catalog in sync with TMDB
+    if settings.CATALOG_SYNC_ENABLED and tmdb_service.api_key:
+        catalog_sync.start()
+    
+    # Keep the movie titles/posters copied onto ratings current
+    if settings.RATING_REFRESH_ENABLED and tmdb_service.api_key:
+        rating_metadata_refresher.start()
+    
+    # Load the recommendation model (trained offline by train_recommender.py)
+    if not recommender.load(settings.RECOMMENDER_MODEL_PATH) and settings.RECOMMENDER_TRAIN_ON_STARTUP:
+        background_tasks.append(asyncio.create_task(run_in_threadpool(train_recommender)))
+    
+    # Similar-movies index is built offline by build_similar_index.py and memory-mapped here
+    if not similar_index.load(settings.SIMILAR_INDEX_PATH):
+        logger.info("⏭️  No similar-movies index found, /movies/{id}/similar is unavailable")
+    
+    # Typeahead index: built from the database, then fed every title TMDB returns or a user rates
+    if settings.SUGGEST_ENABLED:
+        tmdb_service.response_listeners.append(title_index.on_tmdb_response)
+        rating_events.subscribe(title_index.apply_event)
+        background_tasks.append(asyncio.create_task(run_in_threadpool(build_title_index)))
+    
+    # Rating writes update the model incrementally; a periodic rebuild corrects drift
+    rating_events.subscribe(recommender.apply_event)
+    rating_events.start()
+    background_tasks.append(asyncio.create_task(rebuild_recommender_periodically()))
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run on application shutdown"""
+    await catalog_sync.stop()
+    await prefetcher.stop()
+    await rating_metadata_refresher.stop()
+    for task in background_tasks:
+        task.cancel()
+    rating_events.stop()
+    password_hasher.shutdown()
+    
+    # Close pooled TMDB connections
+    await tmdb_service.aclose()
+    await auth_cache.principals.close()
+    await async_engine.dispose()
 
 # Health check endpoint
 @app.get("/health")
@@ -54,6 +181,55 @@ async def health_check():
         "version": settings.PROJECT_VERSION
     }
 
+# Metrics read from the services when scraped, so they cost nothing per request
+CACHE_RESULTS = {"memory_hit": "memory_hits", "redis_hit": "redis_hits", "stale_hit": "stale_hits", "miss": "misses"}
+
+def cache_metrics():
+    return {"tmdb": tmdb_service.cache.stats(), "auth": auth_cache.principals.stats()}
+
+metrics.collected(
+    "cache_lookups_total", "Response/user cache lookups by result", "counter", ["cache", "result"],
+    lambda: [((cache, result), stats[key]) for cache, stats in cache_metrics().items()
+             for result, key in CACHE_RESULTS.items()]
+)
+metrics.collected(
+    "cache_hit_ratio", "Share of cache lookups answered from memory or Redis", "gauge", ["cache"],
+    lambda: [((cache,), stats["hit_ratio"]) for cache, stats in cache_metrics().items()]
+)
+metrics.collected(
+    "tmdb_upstream_events_total", "TMDB retries, failures, stale responses served and circuit breaker rejections",
+    "counter", ["event"],
+    lambda: [(("retry",), tmdb_service.upstream_counters["retries"]),
+             (("failure",), tmdb_service.upstream_counters["failures"]),
+             (("stale_served",), tmdb_service.upstream_counters["stale_served"]),
+             (("circuit_rejected",), tmdb_service.breaker.stats_counters["rejected"]),
+             (("circuit_opened",), tmdb_service.breaker.stats_counters["opened"])]
+)
+metrics.collected(
+    "tmdb_circuit_open", "1 while TMDB calls fail fast (open or half-open breaker)", "gauge", [],
+    lambda: [((), int(tmdb_service.breaker.state != "closed"))]
+)
+metrics.collected(
+    "password_hash_tasks", "bcrypt jobs running and waiting for a worker", "gauge", ["state"],
+    lambda: [(("running",), password_hasher.in_flight - password_hasher.queued),
+             (("queued",), password_hasher.queued)]
+)
+metrics.collected(
+    "password_hash_rejected_total", "Logins/registrations turned away because the bcrypt queue was full",
+    "counter", [], lambda: [((), password_hasher.stats_counters["rejected"])]
+)
+metrics.collected(
+    "password_hash_failed_total", "bcrypt jobs that raised or lost their worker process",
+    "counter", [], lambda: [((), password_hasher.stats_counters["failed"])]
+)
+
+# Prometheus scrape endpoint
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        """Metrics in the Prometheus text format"""
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+
 # Root endpoint  
 @app.get("/")
 async def root():
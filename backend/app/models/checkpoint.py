@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, String
+from app.database.base import Base
+from datetime import datetime
+
+class JobCheckpoint(Base):
+    """Where a resumable background job stopped, so a restart continues from there"""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(100), primary_key=True)
+    position = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JobCheckpoint(name='{self.name}', position='{self.position}')>"
\ No newline at end of file
@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String, Text, Boolean, Date, Index
+from app.database.base import Base
+from datetime import datetime
+
+class Movie(Base):
+    """Local copy of TMDB movie metadata, kept fresh by the catalog sync job"""
+    __tablename__ = "movies"
+
+    tmdb_id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    original_title = Column(String(255))
+    original_language = Column(String(10))
+    overview = Column(Text)
+    release_date = Column(Date, index=True)
+    poster_path = Column(String(255))
+    backdrop_path = Column(String(255))
+    
+    popularity = Column(Float, nullable=False, default=0)
+    vote_average = Column(Float, nullable=False, default=0)
+    vote_count = Column(Integer, nullable=False, default=0)
+    adult = Column(Boolean, default=False)
+    genre_ids = Column(String(100))  # Comma-separated TMDB genre ids, in TMDB order
+    
+    # Timestamps
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Composite indexes back keyset pagination: (sort column, tmdb_id)
+    __table_args__ = (
+        Index("ix_movies_popularity_id", "popularity", "tmdb_id"),
+        Index("ix_movies_vote_average_id", "vote_average", "tmdb_id"),
+        Index("ix_movies_release_date_id", "release_date", "tmdb_id"),
+    )
+
+    def to_tmdb_dict(self) -> dict:
+        """Shape the row like a TMDB list result, so format_movie_data can be reused"""
+        return {
+            "id": self.tmdb_id,
+            "title": self.title,
+            "original_title": self.original_title,
+            "original_language": self.original_language,
+            "overview": self.overview,
+            "release_date": self.release_date.isoformat() if self.release_date else None,
+            "poster_path": self.poster_path,
+            "backdrop_path": self.backdrop_path,
+            "popularity": self.popularity,
+            "vote_average": self.vote_average,
+            "vote_count": self.vote_count,
+            "adult": self.adult,
+            "genre_ids": [int(g) for g in self.genre_ids.split(",")] if self.genre_ids else [],
+        }
+
+    def __repr__(self):
+        return f"<Movie(tmdb_id={self.tmdb_id}, title='{self.title}')>"
+
+class MovieGenre(Base):
+    """Movie ↔ genre association, indexed by genre for filtered browsing"""
+    __tablename__ = "movie_genres"
+
+    tmdb_movie_id = Column(Integer, ForeignKey("movies.tmdb_id", ondelete="CASCADE"), primary_key=True)
+    genre_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_movie_genres_genre_movie", "genre_id", "tmdb_movie_id"),
+    )
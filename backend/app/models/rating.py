@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String  # ✅ Added String
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, String  # ✅ Added String
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 from datetime import datetime
 
 class Rating(Base):
     __tablename__ = "ratings"
+    __table_args__ = (
+        # One rating per user and movie; also serves per-user lookups (leading user_id)
+        Index("uq_ratings_user_movie", "user_id", "tmdb_movie_id", unique=True),
+        # Keyset pagination of a user's ratings, newest first
+        Index("ix_ratings_user_created_id", "user_id", "created_at", "id"),
+        # All ratings of a movie (metadata refresh)
+        Index("ix_ratings_movie_id", "tmdb_movie_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -23,4 +31,35 @@ class Rating(Base):
     user = relationship("User")
 
     def __repr__(self):
-        return f"<Rating(user_id={self.user_id}, tmdb_movie_id={self.tmdb_movie_id}, rating={self.rating})>"
\ No newline at end of file
+        return f"<Rating(user_id={self.user_id}, tmdb_movie_id={self.tmdb_movie_id}, rating={self.rating})>"
+
+class MovieRatingStats(Base):
+    """Running aggregates of the ratings of one movie, maintained by every rating write"""
+    __tablename__ = "movie_rating_stats"
+    __table_args__ = (
+        # "Most rated" and Bayesian top ordering without a scan
+        Index("ix_movie_rating_stats_count_id", "rating_count", "tmdb_movie_id"),
+        Index("ix_movie_rating_stats_bayesian_id", "bayesian_score", "tmdb_movie_id"),
+    )
+
+    tmdb_movie_id = Column(Integer, primary_key=True, autoincrement=False)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0)
+    rating_sum_sq = Column(Float, nullable=False, default=0)  # For the standard deviation
+    bayesian_score = Column(Float, nullable=False, default=0)  # Bayesian average, see rating_stats
+    
+    # Histogram by whole stars (a 3.5 counts as 3)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    
+    # Latest known title and poster, so ranked lists need no join
+    movie_title = Column(String(255))
+    movie_poster = Column(String(500))
+    metadata_synced_at = Column(DateTime)  # Last checked against TMDB, NULL = never
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MovieRatingStats(tmdb_movie_id={self.tmdb_movie_id}, rating_count={self.rating_count})>"
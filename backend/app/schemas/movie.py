@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+MOVIE_FIELDS = (
+    "tmdb_id", "title", "overview", "genre", "genre_ids", "release_date", "poster_url",
+    "backdrop_url", "average_rating", "rating_count", "popularity", "adult",
+    "original_language", "original_title",
+)
+
+@dataclass
+class MovieSummary:
+    """A movie as served in list, search and catalog pages (serialized natively by orjson)"""
+    __slots__ = MOVIE_FIELDS
+    tmdb_id: Optional[int]
+    title: str
+    overview: str
+    genre: str
+    genre_ids: List[int]
+    release_date: Optional[str]
+    poster_url: Optional[str]
+    backdrop_url: Optional[str]
+    average_rating: float
+    rating_count: int
+    popularity: float
+    adult: bool
+    original_language: Optional[str]
+    original_title: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in MOVIE_FIELDS}
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=` projection (comma-separated MovieSummary fields), None means all fields"""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in MOVIE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(MOVIE_FIELDS)}")
+    return names or None
+
+def project(items: List[MovieSummary], fields: Optional[Tuple[str, ...]]) -> List[Any]:
+    """Trim movies to the requested fields"""
+    if fields is None:
+        return items
+    if len(fields) == 1:
+        name = fields[0]
+        return [{name: getattr(item, name)} for item in items]
+    getter = attrgetter(*fields)
+    return [dict(zip(fields, getter(item))) for item in items]
+
+class MovieBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.TMDB_BATCH_MAX_IDS)
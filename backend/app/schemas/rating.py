@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
 
 class RatingBase(BaseModel):
     tmdb_movie_id: int  # ✅ TMDB ID instead of movie_id
@@ -7,14 +10,35 @@ class RatingBase(BaseModel):
 
 class RatingCreate(RatingBase):
     movie_title: str  # ✅ Include for storage
-    movie_poster: str = None
+    movie_poster: Optional[str] = None
 
 class RatingResponse(RatingBase):
     id: int
     user_id: int
     movie_title: str
-    movie_poster: str = None
+    movie_poster: Optional[str] = None
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RatingBatchCreate(BaseModel):
+    ratings: List[RatingCreate] = Field(..., min_length=1, max_length=settings.RATINGS_BATCH_MAX_ITEMS)
+
+class RatingBatchResult(BaseModel):
+    received: int
+    written: int
+
+class RatingImportResult(RatingBatchResult):
+    skipped: int
+    errors: List[str]
+
+class MovieRatingStatsResponse(BaseModel):
+    tmdb_movie_id: int
+    movie_title: Optional[str] = None
+    movie_poster: Optional[str] = None
+    rating_count: int
+    average: Optional[float] = None
+    stddev: Optional[float] = None
+    bayesian_average: float  # Pulled toward the mean of all ratings while a movie has few
+    histogram: Dict[str, int]  # Ratings per whole star, "1" to "5"
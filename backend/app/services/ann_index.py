@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbour index over unit vectors (cosine).
+
+    Vectors are clustered with spherical k-means; each query scans only the
+    `nprobe` clusters whose centroids are closest to it. The arrays are stored
+    as plain .npy files sorted by cluster, so a built index can be memory-mapped
+    at startup instead of loaded into the heap.
+    """
+
+    def __init__(self):
+        self.centroids: Optional[np.ndarray] = None  # nlist x d
+        self.vectors: Optional[np.ndarray] = None    # n x d, grouped by cluster
+        self.ids: Optional[np.ndarray] = None        # n, tmdb ids in the same order
+        self.offsets: Optional[np.ndarray] = None    # nlist + 1, cluster boundaries
+        self.sorted_ids: Optional[np.ndarray] = None  # ids ascending, for id -> row lookup
+        self.sorted_rows: Optional[np.ndarray] = None
+        self.built_at: Optional[float] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.vectors is not None
+
+    def __len__(self) -> int:
+        return 0 if self.ids is None else len(self.ids)
+
+    def build(self, ids: np.ndarray, vectors: np.ndarray, nlist: Optional[int] = None,
+              iterations: int = 20, sample_size: int = 100000, seed: int = 0) -> "IVFIndex":
+        """Cluster `vectors` (one row per id) and build the inverted lists"""
+        started = time.time()
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        ids = np.asarray(ids, dtype=np.int64)
+        n = len(ids)
+        nlist = nlist or max(1, min(n, int(4 * np.sqrt(n))))
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = _nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        assignment = _nearest(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        self.centroids = centroids
+        self.vectors = vectors[order]
+        self.ids = ids[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))]).astype(np.int64)
+        self._index_ids()
+        self.built_at = time.time()
+        logger.info(f"🧭 ANN index built: {n} vectors, {nlist} lists in {time.time() - started:.1f}s")
+        return self
+
+    def _index_ids(self):
+        self.sorted_rows = np.argsort(self.ids, kind="stable")
+        self.sorted_ids = np.asarray(self.ids)[self.sorted_rows]
+
+    def save(self, path: str):
+        """Write the index as .npy files in a directory"""
+        os.makedirs(path, exist_ok=True)
+        for name in ("centroids", "vectors", "ids", "offsets", "sorted_ids", "sorted_rows"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"built_at": self.built_at, "count": len(self), "nlist": len(self.centroids)}, f)
+
+    def load(self, path: str, mmap: bool = True) -> bool:
+        """Load a saved index, memory-mapping the large arrays; False if there is none"""
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return False
+        mode = "r" if mmap else None
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        for name in ("vectors", "ids", "sorted_ids", "sorted_rows"):
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode))
+        with open(os.path.join(path, "meta.json")) as f:
+            self.built_at = json.load(f).get("built_at")
+        logger.info(f"🧭 ANN index loaded from {path}: {len(self)} vectors")
+        return True
+
+    def vector(self, tmdb_id: int) -> Optional[np.ndarray]:
+        """The stored vector for an id, or None if it is not indexed"""
+        position = int(np.searchsorted(self.sorted_ids, tmdb_id))
+        if position >= len(self.sorted_ids) or self.sorted_ids[position] != tmdb_id:
+            return None
+        return np.asarray(self.vectors[self.sorted_rows[position]])
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k by cosine for a batch of queries: (ids, scores), each b x k
+
+        Rows with fewer than k candidates are padded with id -1 and score -inf.
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        nprobe = min(nprobe, len(self.centroids))
+        # One matrix product picks the clusters to probe for the whole batch
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for q, (query, lists) in enumerate(zip(queries, probes)):
+            rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+            if not len(rows):
+                continue
+            rows.sort()  # Sequential reads from the memory map
+            scores = np.asarray(self.vectors[rows]) @ query
+            top = _top_k(scores, k)
+            result_ids[q, :len(top)] = np.asarray(self.ids[rows[top]])
+            result_scores[q, :len(top)] = scores[top]
+        return result_ids, result_scores
+
+    def exact_search(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k, for measuring recall"""
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        scores = queries @ np.asarray(self.vectors).T
+        top = np.stack([_top_k(row, k) for row in scores])
+        return np.asarray(self.ids)[top], np.take_along_axis(scores, top, axis=1)
+
+    def similar(self, tmdb_id: int, k: int = 20, nprobe: int = 8) -> List[Tuple[int, float]]:
+        """Nearest neighbours of an indexed movie, excluding itself"""
+        vector = self.vector(tmdb_id)
+        if vector is None:
+            return []
+        ids, scores = self.search(vector, k + 1, nprobe)
+        return [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i != tmdb_id and i != -1][:k]
+
+    def info(self) -> Dict:
+        if not self.is_ready:
+            return {"ready": False}
+        return {"ready": True, "count": len(self), "nlist": len(self.centroids), "built_at": self.built_at}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each vector, in batches to bound memory"""
+    return np.concatenate([
+        np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), batch_size)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first"""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+# Create singleton instance
+similar_index = IVFIndex()
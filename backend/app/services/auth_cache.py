@@ -0,0 +1,93 @@
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.security import verify_token
+from app.services.cache import LRUCache, TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Snapshot of the authenticated user, safe to share between requests and threads"""
+    __slots__ = ("id", "username", "email", "full_name", "is_active", "is_verified", "created_at")
+
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_verified: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.username, user.email, user.full_name,
+                   bool(user.is_active), bool(user.is_verified), user.created_at)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Principal":
+        created_at = data.get("created_at")
+        return cls(**{**data, "created_at": datetime.fromisoformat(created_at) if created_at else None})
+
+
+class AuthCache:
+    """Memoized token verification plus a short-TTL principal cache keyed by token subject.
+
+    Tokens stay in process memory only, each until its own expiry. Principals go
+    through a TieredCache, so with the Redis tier enabled every worker sees an
+    invalidation; the in-process tier of other workers may still serve the old
+    principal for up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 redis_url: Optional[str] = None, enabled: Optional[bool] = None):
+        self.ttl = ttl or settings.AUTH_CACHE_TTL
+        self.enabled = settings.AUTH_CACHE_ENABLED if enabled is None else enabled
+        max_entries = max_entries or settings.AUTH_CACHE_MAX_ENTRIES
+        self.tokens = LRUCache(max_entries)
+        self.principals = TieredCache(max_entries, redis_url=redis_url, key_prefix="cinematch:auth:")
+
+    def verify(self, token: str) -> Dict:
+        """verify_token(), remembered until the token expires; raises JWTError like it"""
+        if not self.enabled:
+            return verify_token(token)
+        payload = self.tokens.get(token)
+        if payload is None:
+            payload = verify_token(token)
+            expires_at = payload.get("exp")
+            if expires_at:
+                self.tokens.set(token, payload, ttl=0, expires_at=float(expires_at))
+        return payload
+
+    async def get_principal(self, subject: str) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        data = await self.principals.get(subject)
+        return Principal.from_dict(data) if data is not None else None
+
+    async def set_principal(self, principal: Principal):
+        if self.enabled:
+            await self.principals.set(principal.username, principal.to_dict(), self.ttl)
+
+    async def invalidate(self, subject: str):
+        """Forget a user, e.g. after deactivation or a profile change"""
+        await self.principals.delete(subject)
+        logger.info(f"🔐 Auth cache invalidated for '{subject}'")
+
+    def stats(self) -> Dict:
+        return {"enabled": self.enabled, "tokens": len(self.tokens), "principals": self.principals.stats()}
+
+
+# Create singleton instance
+auth_cache = AuthCache(
+    redis_url=settings.REDIS_URL if settings.AUTH_CACHE_REDIS_ENABLED else None
+)
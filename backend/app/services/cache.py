@@ -0,0 +1,297 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """A cached value and the time it expires"""
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+
+class LRUCache:
+    """Bounded, thread-safe in-process LRU cache with per-entry TTL
+
+    Expired entries are kept for another `stale_ttl` seconds so `get_stale`
+    can still serve them (e.g. while the upstream is down).
+    """
+
+    def __init__(self, max_entries: int = 1024, stale_ttl: float = 0):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry for a key (fresh or not) and mark it recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_fresh_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry for a key if it is fresh, dropping it once it is past its stale window"""
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if not entry.is_fresh(now):
+            if now >= entry.expires_at + self.stale_ttl:
+                self.delete(key)
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a fresh value"""
+        entry = self.get_fresh_entry(key)
+        return entry.value if entry is not None else None
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Get a value that may have expired, as long as it is within the stale window"""
+        entry = self.get_entry(key)
+        if entry is None or time.time() >= entry.expires_at + self.stale_ttl:
+            return None
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: float, expires_at: Optional[float] = None):
+        """Store a value for `ttl` seconds, evicting the least recently used entry when full"""
+        entry = CacheEntry(value, expires_at or time.time() + ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """In-process LRU in front of an optional Redis tier.
+
+    Redis is best effort: if it is not reachable the cache keeps working
+    in memory only and retries the connection after `redis_retry_seconds`.
+    Cached values are shared between callers and must be treated as read-only.
+    Both tiers keep values `stale_ttl` seconds past their expiry for `get_stale`.
+    """
+
+    def __init__(self, max_entries: int = 1024, redis_url: Optional[str] = None,
+                 key_prefix: str = "cinematch:", redis_retry_seconds: float = 60,
+                 stale_ttl: float = 0):
+        self.memory = LRUCache(max_entries, stale_ttl=stale_ttl)
+        self.stale_ttl = stale_ttl
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.redis_retry_seconds = redis_retry_seconds
+        self._redis = None
+        self._redis_down_until = 0.0
+        self.stats_counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "redis_errors": 0,
+            "stale_hits": 0,
+        }
+
+    async def connect(self) -> bool:
+        """Connect the Redis tier, falling back to memory only if it is unavailable"""
+        if not self.redis_url:
+            logger.info("⏭️  Response cache running in memory only (no Redis URL)")
+            return False
+        try:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            await client.ping()
+            self._redis = client
+            logger.info("✅ Response cache using Redis tier")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️  Redis unavailable, response cache running in memory only: {e}")
+            self._redis = None
+            self._redis_down_until = time.time() + self.redis_retry_seconds
+            return False
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _redis_client(self):
+        """Get the Redis client, reconnecting once the retry interval has passed"""
+        if self._redis is None and self.redis_url and time.time() >= self._redis_down_until:
+            await self.connect()
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"⚠️  Redis cache error, falling back to memory: {e}")
+        self.stats_counters["redis_errors"] += 1
+        self._redis = None
+        self._redis_down_until = time.time() + self.redis_retry_seconds
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look a key up in memory, then Redis"""
+        entry = await self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Look a key up in memory, then Redis, returning the fresh entry with its expiry"""
+        entry = self.memory.get_fresh_entry(key)
+        if entry is not None:
+            self.stats_counters["memory_hits"] += 1
+            return entry
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                raw = await client.get(self.key_prefix + key)
+            except Exception as e:
+                self._redis_failed(e)
+                raw = None
+            if raw is not None:
+                payload = json.loads(raw)
+                if payload["e"] > time.time():
+                    # Promote to memory with the remaining lifetime
+                    self.memory.set(key, payload["v"], 0, expires_at=payload["e"])
+                    self.stats_counters["redis_hits"] += 1
+                    return CacheEntry(payload["v"], payload["e"])
+
+        self.stats_counters["misses"] += 1
+        return None
+
+    async def get_entries(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """Look many keys up: memory, then one Redis MGET for the rest. Misses are left out."""
+        found: Dict[str, CacheEntry] = {}
+        missing = []
+        for key in keys:
+            entry = self.memory.get_fresh_entry(key)
+            if entry is not None:
+                found[key] = entry
+            else:
+                missing.append(key)
+        self.stats_counters["memory_hits"] += len(found)
+
+        client = await self._redis_client() if missing else None
+        if client is not None:
+            try:
+                raws = await client.mget([self.key_prefix + key for key in missing])
+            except Exception as e:
+                self._redis_failed(e)
+                raws = [None] * len(missing)
+            now = time.time()
+            for key, raw in zip(missing, raws):
+                if raw is None:
+                    continue
+                payload = json.loads(raw)
+                if payload["e"] > now:
+                    self.memory.set(key, payload["v"], 0, expires_at=payload["e"])
+                    self.stats_counters["redis_hits"] += 1
+                    found[key] = CacheEntry(payload["v"], payload["e"])
+
+        self.stats_counters["misses"] += len(keys) - len(found)
+        return found
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Store a value in both tiers"""
+        expires_at = time.time() + ttl
+        self.memory.set(key, value, ttl, expires_at=expires_at)
+        self.stats_counters["sets"] += 1
+
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                await client.set(self.key_prefix + key, json.dumps({"v": value, "e": expires_at}), ex=max(1, int(ttl + self.stale_ttl)))
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def get_stale(self, key: str) -> Optional[Any]:
+        """Look a key up ignoring freshness (within the stale window), memory first.
+
+        For serving something when the value cannot be refreshed; not counted as a lookup.
+        """
+        value = self.memory.get_stale(key)
+        if value is None:
+            client = await self._redis_client()
+            if client is not None:
+                try:
+                    raw = await client.get(self.key_prefix + key)
+                except Exception as e:
+                    self._redis_failed(e)
+                    raw = None
+                if raw is not None:
+                    payload = json.loads(raw)
+                    self.memory.set(key, payload["v"], 0, expires_at=payload["e"])
+                    value = payload["v"]
+        if value is not None:
+            self.stats_counters["stale_hits"] += 1
+        return value
+
+    async def peek_expiry(self, key: str) -> Optional[float]:
+        """When the freshest copy of a key expires, or None if neither tier has it.
+
+        A newer copy in Redis (another worker refreshed it) is promoted to memory.
+        Does not count as a lookup in the hit/miss stats.
+        """
+        entry = self.memory.get_entry(key)
+        expires_at = entry.expires_at if entry is not None else None
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                raw = await client.get(self.key_prefix + key)
+            except Exception as e:
+                self._redis_failed(e)
+                raw = None
+            if raw is not None:
+                payload = json.loads(raw)
+                if expires_at is None or payload["e"] > expires_at:
+                    self.memory.set(key, payload["v"], 0, expires_at=payload["e"])
+                    expires_at = payload["e"]
+        return expires_at
+
+    async def delete(self, key: str):
+        """Remove a key from both tiers"""
+        self.memory.delete(key)
+        client = await self._redis_client()
+        if client is not None:
+            try:
+                await client.delete(self.key_prefix + key)
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def clear(self):
+        """Drop everything from memory (Redis entries expire on their own)"""
+        self.memory.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and tier status"""
+        counters = self.stats_counters
+        lookups = counters["memory_hits"] + counters["redis_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["redis_hits"]
+        return {
+            **counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_max_entries": self.memory.max_entries,
+            "redis_connected": self._redis is not None,
+        }
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import math
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, func, insert, tuple_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.http_cache import note_source_time
+from app.database.pagination import decode_cursor, encode_cursor
+from app.database.upsert import chunked, upsert_statement
+from app.models.movie import Movie, MovieGenre
+from app.services.cache import LRUCache
+from app.services.tmdb_service import tmdb_service
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+
+# How each category is ordered when served from the local catalog. Only categories whose
+# order the catalog's columns reproduce are served locally: trending, now_playing and
+# upcoming are TMDB's own curated lists (not a popularity or release date order), so
+# they always come from TMDB.
+CATEGORY_ORDER = {
+    "popular": ("popularity", "desc"),
+    "top_rated": ("vote_average", "desc"),
+}
+
+# TMDB endpoints the sync job pages through, per category
+CATEGORY_SOURCES: Dict[str, Callable] = {
+    "popular": lambda source, page: source.get_popular_movies(page),
+    "trending": lambda source, page: source.get_trending_movies("day", page),
+    "now_playing": lambda source, page: source.get_now_playing_movies(page),
+    "upcoming": lambda source, page: source.get_upcoming_movies(page),
+    "top_rated": lambda source, page: source.get_top_rated_movies(page),
+}
+
+MOVIE_COLUMNS = [
+    "tmdb_id", "title", "original_title", "original_language", "overview", "release_date",
+    "poster_path", "backdrop_path", "popularity", "vote_average", "vote_count", "adult",
+    "genre_ids", "synced_at",
+]
+
+# Category totals are a COUNT over the catalog, cache them briefly
+_total_cache = LRUCache(max_entries=256)
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def movie_row(tmdb_movie: Dict, synced_at: datetime) -> Optional[Dict]:
+    """Map a TMDB list result to a movies row (None for adult or posterless movies)"""
+    if not tmdb_movie.get("id") or tmdb_movie.get("adult", False) or not tmdb_movie.get("poster_path"):
+        return None
+    return {
+        "tmdb_id": tmdb_movie["id"],
+        "title": (tmdb_movie.get("title") or "Unknown Title")[:255],
+        "original_title": (tmdb_movie.get("original_title") or "")[:255] or None,
+        "original_language": tmdb_movie.get("original_language"),
+        "overview": tmdb_movie.get("overview"),
+        "release_date": _parse_date(tmdb_movie.get("release_date")),
+        "poster_path": tmdb_movie.get("poster_path"),
+        "backdrop_path": tmdb_movie.get("backdrop_path"),
+        "popularity": tmdb_movie.get("popularity") or 0,
+        "vote_average": tmdb_movie.get("vote_average") or 0,
+        "vote_count": tmdb_movie.get("vote_count") or 0,
+        "adult": False,
+        "genre_ids": ",".join(str(g) for g in tmdb_movie.get("genre_ids", [])),
+        "synced_at": synced_at,
+    }
+
+
+def upsert_movies(db: Session, tmdb_movies: List[Dict]) -> int:
+    """Insert or update TMDB list results in the catalog, returns rows written"""
+    synced_at = datetime.utcnow()
+    rows_by_id = {}
+    for tmdb_movie in tmdb_movies:
+        row = movie_row(tmdb_movie, synced_at)
+        if row:
+            rows_by_id[row["tmdb_id"]] = row  # Last occurrence wins
+    rows = list(rows_by_id.values())
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    update_columns = [c for c in MOVIE_COLUMNS if c != "tmdb_id"]
+    for chunk in chunked(rows, len(MOVIE_COLUMNS)):
+        db.execute(upsert_statement(dialect, Movie.__table__, chunk, ["tmdb_id"], update_columns))
+
+        # Replace the genre rows of the movies in this chunk
+        ids = [row["tmdb_id"] for row in chunk]
+        db.execute(delete(MovieGenre).where(MovieGenre.tmdb_movie_id.in_(ids)))
+        genre_rows = [
+            {"tmdb_movie_id": row["tmdb_id"], "genre_id": int(g)}
+            for row in chunk for g in dict.fromkeys(row["genre_ids"].split(",")) if g
+        ]
+        for genre_chunk in chunked(genre_rows, 2):
+            db.execute(insert(MovieGenre), genre_chunk)
+    db.commit()
+    return len(rows)
+
+
+def _category_filters(category: str, genre_ids: List[int], match_all: bool) -> List:
+    filters = []
+    if category == "top_rated":
+        filters.append(Movie.vote_count >= settings.CATALOG_TOP_RATED_MIN_VOTES)
+    if genre_ids and match_all:
+        for genre_id in genre_ids:
+            filters.append(exists().where(and_(
+                MovieGenre.tmdb_movie_id == Movie.tmdb_id, MovieGenre.genre_id == genre_id
+            )))
+    elif genre_ids:
+        filters.append(exists().where(and_(
+            MovieGenre.tmdb_movie_id == Movie.tmdb_id, MovieGenre.genre_id.in_(genre_ids)
+        )))
+    return filters
+
+
+def list_movies(db: Session, category: str, genre_ids: Optional[List[int]] = None, page: int = 1,
+                cursor: Optional[str] = None, limit: int = PAGE_SIZE, match_all: bool = False) -> Optional[Dict]:
+    """Serve a category page from the local catalog with keyset pagination.
+
+    Returns None for categories the catalog can't order like TMDB does, and when
+    it has nothing for a first page (e.g. before the first sync), so the caller
+    can fall back to TMDB.
+    """
+    if category in CATEGORY_SOURCES and category not in CATEGORY_ORDER:
+        return None
+    if category not in CATEGORY_ORDER:
+        category = "popular"
+    sort_name, direction = CATEGORY_ORDER[category]
+    sort_column = getattr(Movie, sort_name)
+    genre_ids = sorted(genre_ids or [])
+    filters = _category_filters(category, genre_ids, match_all)
+
+    query = db.query(Movie).filter(*filters)
+    if cursor:
+        key = tuple_(sort_column, Movie.tmdb_id)
+        value = tuple_(*decode_cursor(cursor))
+        query = query.filter(key < value if direction == "desc" else key > value)
+
+    if direction == "desc":
+        query = query.order_by(sort_column.desc(), Movie.tmdb_id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Movie.tmdb_id.asc())
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * limit)
+    rows = query.limit(limit).all()
+
+    if not rows and not cursor and page == 1:
+        return None
+
+    total_key = f"{category}:{genre_ids}:{match_all}"
+    total = _total_cache.get(total_key)
+    if total is None:
+        total = db.query(func.count(Movie.tmdb_id)).filter(*filters).scalar()
+        _total_cache.set(total_key, total, ttl=60)
+
+    synced_at = max((row.synced_at for row in rows if row.synced_at), default=None)
+    if synced_at is not None:
+        note_source_time(synced_at.replace(tzinfo=timezone.utc).timestamp())
+
+    last = rows[-1] if len(rows) == limit else None
+    return {
+        "items": [tmdb_service.movie_summary(row.to_tmdb_dict()) for row in rows],
+        "total": total,
+        "page": page,
+        "total_pages": max(1, math.ceil(total / limit)),
+        "category": category,
+        "limit": len(rows),
+        "next_cursor": encode_cursor(getattr(last, sort_name), last.tmdb_id) if last else None,
+        "source": "catalog",
+    }
+
+
+class CatalogSync:
+    """Background job that pages through TMDB categories and discover into the catalog.
+
+    `source` is anything with TMDBService's async list methods, so a fake data
+    source can be plugged in for tests and benchmarks.
+    """
+
+    def __init__(self, source=None, session_factory=SessionLocal,
+                 pages_per_category: Optional[int] = None, discover_pages: Optional[int] = None):
+        self.source = source or tmdb_service
+        self.session_factory = session_factory
+        self.pages_per_category = pages_per_category or settings.CATALOG_SYNC_PAGES
+        self.discover_pages = discover_pages if discover_pages is not None else settings.CATALOG_DISCOVER_PAGES
+        self._discover_next_page = 1
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict] = None
+
+    def _store(self, movies: List[Dict]) -> int:
+        db = self.session_factory()
+        try:
+            return upsert_movies(db, movies)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _sync_pages(self, fetch: Callable, pages: List[int]) -> Tuple[int, int]:
+        """Fetch pages concurrently and upsert them, returns (rows written, total_pages)"""
+        results = await asyncio.gather(*(fetch(self.source, page) for page in pages))
+        movies = [movie for data in results for movie in data.get("results", [])]
+        total_pages = max((data.get("total_pages", 0) for data in results), default=0)
+        return await run_in_threadpool(self._store, movies), total_pages
+
+    async def sync_once(self) -> Dict[str, int]:
+        """Run one incremental sync pass, returns rows written per source"""
+        started = datetime.utcnow()
+        counts = {}
+        for category, fetch in CATEGORY_SOURCES.items():
+            counts[category], _ = await self._sync_pages(fetch, list(range(1, self.pages_per_category + 1)))
+
+        # Walk discover a slice at a time, continuing where the previous pass stopped
+        if self.discover_pages:
+            first = self._discover_next_page
+            pages = list(range(first, first + self.discover_pages))
+            counts["discover"], total_pages = await self._sync_pages(
+                lambda source, page: source.discover_movies(page, sort_by="popularity.desc"), pages
+            )
+            total_pages = min(total_pages, 500)  # TMDB serves at most 500 pages
+            self._discover_next_page = pages[-1] + 1 if pages[-1] < total_pages else 1
+
+        self.last_run = {"started_at": started.isoformat(), "rows": counts}
+        logger.info(f"📚 Catalog sync wrote {sum(counts.values())} rows: {counts}")
+        return counts
+
+    async def run_forever(self, interval: Optional[float] = None):
+        interval = interval or settings.CATALOG_SYNC_INTERVAL
+        while True:
+            try:
+                await self.sync_once()
+            except Exception as e:
+                logger.error(f"Catalog sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create singleton instance
+catalog_sync = CatalogSync()
@@ -0,0 +1,92 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sqlalchemy.orm import Session
+
+from app.models.movie import Movie
+from app.services.tmdb_service import GENRE_NAMES, tmdb_service
+
+logger = logging.getLogger(__name__)
+
+GENRE_COLUMNS = {genre_id: i for i, genre_id in enumerate(sorted(GENRE_NAMES))}
+
+# Share of the final cosine similarity each feature block contributes
+BLOCK_WEIGHTS = {"ratings": 0.6, "genres": 0.2, "text": 0.2}
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _reduce(matrix: sp.spmatrix, dims: int, seed: int = 0) -> np.ndarray:
+    """Truncated SVD of a sparse matrix, with the rank capped by its shape"""
+    rank = min(dims, matrix.shape[0] - 1, matrix.shape[1] - 1)
+    if rank < 1 or matrix.nnz == 0:
+        return np.zeros((matrix.shape[0], 0), dtype=np.float32)
+    return TruncatedSVD(n_components=rank, random_state=seed).fit_transform(matrix).astype(np.float32)
+
+
+def genre_features(movies: List[Dict]) -> np.ndarray:
+    """Multi-hot genre vectors"""
+    features = np.zeros((len(movies), len(GENRE_COLUMNS)), dtype=np.float32)
+    for row, movie in enumerate(movies):
+        for genre_id in movie.get("genre_ids") or []:
+            if genre_id in GENRE_COLUMNS:
+                features[row, GENRE_COLUMNS[genre_id]] = 1
+    return features
+
+
+def text_features(movies: List[Dict], dims: int = 64) -> np.ndarray:
+    """Latent topics of title + overview (hashed TF-IDF, then SVD)"""
+    documents = [f"{movie.get('title') or ''} {movie.get('overview') or ''}" for movie in movies]
+    hashed = HashingVectorizer(n_features=2 ** 18, stop_words="english", alternate_sign=False, norm=None).transform(documents)
+    return _reduce(TfidfTransformer(sublinear_tf=True).fit_transform(hashed), dims)
+
+
+def rating_features(tmdb_ids: np.ndarray, item_ids: np.ndarray, item_user: sp.csr_matrix, dims: int = 64) -> np.ndarray:
+    """Item factors from the rating matrix; zero for movies nobody has rated"""
+    factors = _reduce(item_user, dims)
+    features = np.zeros((len(tmdb_ids), factors.shape[1]), dtype=np.float32)
+    if factors.shape[1]:
+        item_index = {int(m): i for i, m in enumerate(item_ids)}
+        rows = [(row, item_index[int(m)]) for row, m in enumerate(tmdb_ids) if int(m) in item_index]
+        if rows:
+            targets, sources = map(list, zip(*rows))
+            features[targets] = factors[sources]
+    return features
+
+
+def build_movie_embeddings(movies: List[Dict], item_ids: Optional[np.ndarray] = None,
+                           item_user: Optional[sp.csr_matrix] = None,
+                           text_dims: int = 64, rating_dims: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """Embed movies (format_movie_data dicts) for cosine similarity, returns (tmdb ids, vectors).
+
+    Rated movies that are missing from `movies` are embedded from their ratings alone.
+    """
+    known = {movie["tmdb_id"] for movie in movies}
+    if item_ids is not None:
+        movies = movies + [{"tmdb_id": int(m)} for m in item_ids if int(m) not in known]
+    tmdb_ids = np.array([movie["tmdb_id"] for movie in movies], dtype=np.int64)
+
+    blocks = {"genres": genre_features(movies), "text": text_features(movies, text_dims)}
+    if item_ids is not None and item_user is not None:
+        blocks["ratings"] = rating_features(tmdb_ids, item_ids, item_user, rating_dims)
+
+    # Normalise each block so the weights, not the block sizes, decide its influence
+    vectors = np.hstack([
+        _normalize_rows(block) * np.sqrt(BLOCK_WEIGHTS[name])
+        for name, block in blocks.items() if block.shape[1]
+    ])
+    logger.info(f"🧭 Embedded {len(tmdb_ids)} movies into {vectors.shape[1]} dimensions")
+    return tmdb_ids, _normalize_rows(vectors)
+
+
+def load_catalog_movies(db: Session, batch_size: int = 5000) -> Iterable[Dict]:
+    """Stream catalog movies in format_movie_data shape"""
+    for movie in db.query(Movie).yield_per(batch_size):
+        yield tmdb_service.format_movie_data(movie.to_tmdb_dict())
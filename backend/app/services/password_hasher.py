@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core import security
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing is saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt on a size-limited process pool, so hashing never holds the
+    event loop or a threadpool slot that other routes need.
+
+    At most `workers` jobs run at once and `max_queue` more may wait; beyond
+    that calls fail fast with HasherBusy instead of queueing without bound.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 retry_after: Optional[int] = None):
+        self.workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+        self.max_queue = settings.PASSWORD_HASH_MAX_QUEUE if max_queue is None else max_queue
+        self.retry_after = retry_after or settings.PASSWORD_HASH_RETRY_AFTER
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.stats_counters: Dict[str, float] = {
+            "completed": 0, "failed": 0, "rejected": 0, "rehashed": 0, "max_queued": 0, "busy_seconds": 0.0
+        }
+
+    def start(self):
+        """Create the pool and spawn its workers ahead of the first login"""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # spawn, not fork: the server process has threads (and their locks) by now
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(self.workers):
+            self._executor.submit(time.sleep, 0)
+        logger.info(f"🔐 Password hashing pool started with {self.workers} workers")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - max(self.workers, 1))
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= max(self.workers, 1) + self.max_queue:
+            self.stats_counters["rejected"] += 1
+            raise HasherBusy(self.retry_after)
+        self.in_flight += 1
+        self.stats_counters["max_queued"] = max(self.stats_counters["max_queued"], self.queued)
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                result = await run_in_threadpool(fn, *args)
+            else:
+                self.start()
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); the next call starts a fresh pool
+            logger.error("❌ Password hashing pool broke, restarting it")
+            self._executor = None
+            self.stats_counters["failed"] += 1
+            raise
+        except Exception:
+            self.stats_counters["failed"] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.stats_counters["completed"] += 1
+        self.stats_counters["busy_seconds"] += time.perf_counter() - started
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; the second value is a replacement hash when the cost settings changed"""
+        valid, new_hash = await self._run(security.verify_and_update_password, password, hashed_password)
+        if new_hash:
+            self.stats_counters["rehashed"] += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict:
+        completed = self.stats_counters["completed"]
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": int(completed),
+            "failed": int(self.stats_counters["failed"]),
+            "rejected": int(self.stats_counters["rejected"]),
+            "rehashed": int(self.stats_counters["rehashed"]),
+            "max_queued": int(self.stats_counters["max_queued"]),
+            "avg_ms": round(self.stats_counters["busy_seconds"] / completed * 1000, 1) if completed else None,
+        }
+
+
+# Create singleton instance
+password_hasher = PasswordHasher()
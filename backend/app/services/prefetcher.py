@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.resilience import CircuitOpenError
+from app.services.tmdb_service import CATEGORY_ENDPOINTS, response_cache_key, tmdb_service
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchTarget:
+    """One cached TMDB page the prefetcher keeps warm"""
+    __slots__ = ("endpoint", "params", "key", "jitter", "expires_at", "refreshed_at", "failures")
+
+    def __init__(self, endpoint: str, params: Dict, jitter: float):
+        self.endpoint = endpoint
+        self.params = params
+        self.key = response_cache_key(endpoint, params)
+        # Per-process offset so several workers don't all refresh the same page at once
+        self.jitter = jitter
+        self.expires_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.failures = 0
+
+
+class CachePrefetcher:
+    """Refreshes hot category pages before their cache entries expire (stale-while-revalidate).
+
+    Every `interval` seconds (randomised by +/-20%) it checks when each page's
+    freshest copy expires, in memory or Redis, and refetches the pages due
+    within `refresh_ahead` seconds, at most `concurrency` at a time. A page
+    another worker already refreshed shows up as a later expiry in Redis and
+    is skipped. Users keep being served the current copy while it refreshes.
+    """
+
+    def __init__(self, source=None, pages: Optional[int] = None, interval: Optional[float] = None,
+                 refresh_ahead: Optional[float] = None, jitter: Optional[float] = None,
+                 concurrency: Optional[int] = None):
+        self.source = source or tmdb_service
+        self.interval = interval or settings.PREFETCH_INTERVAL
+        self.refresh_ahead = refresh_ahead if refresh_ahead is not None else settings.PREFETCH_REFRESH_AHEAD
+        self.jitter = jitter if jitter is not None else settings.PREFETCH_JITTER
+        self.concurrency = concurrency or settings.PREFETCH_CONCURRENCY
+        pages = pages or settings.PREFETCH_PAGES
+        self.targets: List[PrefetchTarget] = [
+            PrefetchTarget(endpoint, {"page": page}, random.uniform(0, self.jitter))
+            for endpoint in CATEGORY_ENDPOINTS.values()
+            for page in range(1, pages + 1)
+        ]
+        self._task: Optional[asyncio.Task] = None
+        self.next_run_at: Optional[float] = None
+        self.last_run: Optional[Dict] = None
+        self.stats_counters: Dict[str, int] = {"runs": 0, "refreshed": 0, "failed": 0, "skipped_fresh": 0}
+
+    def _is_due(self, target: PrefetchTarget, now: float) -> bool:
+        return target.expires_at is None or target.expires_at - now < self.refresh_ahead - target.jitter
+
+    async def _refresh(self, target: PrefetchTarget, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            try:
+                await self.source.refresh(target.endpoint, target.params)
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                # The current copy, if any, keeps being served (stale once it expires)
+                target.failures += 1
+                self.stats_counters["failed"] += 1
+                logger.warning(f"⚠️  Prefetch of {target.key} failed: {e!r}")
+                return False
+        target.refreshed_at = time.time()
+        target.expires_at = await self.source.cache.peek_expiry(target.key)
+        self.stats_counters["refreshed"] += 1
+        return True
+
+    async def run_once(self) -> Dict[str, int]:
+        """Refresh every page that is missing or due, returns counts"""
+        now = time.time()
+        for target in self.targets:
+            target.expires_at = await self.source.cache.peek_expiry(target.key)
+        due = [target for target in self.targets if self._is_due(target, now)]
+        self.stats_counters["skipped_fresh"] += len(self.targets) - len(due)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._refresh(target, semaphore) for target in due))
+        self.stats_counters["runs"] += 1
+        self.last_run = {
+            "started_at": datetime.utcfromtimestamp(now).isoformat(),
+            "due": len(due),
+            "refreshed": sum(results),
+            "seconds": round(time.time() - now, 3),
+        }
+        if due:
+            logger.info(f"🔥 Prefetched {sum(results)}/{len(due)} category pages")
+        return self.last_run
+
+    async def run_forever(self):
+        # Stagger the first run so workers started together don't hit TMDB together
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch run failed: {e}")
+            delay = self.interval * random.uniform(0.8, 1.2)
+            self.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+
+    def start(self):
+        self.source.hot_keys.update(target.key for target in self.targets)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        """Schedule, counters and how often requests for the prefetched pages hit the cache"""
+        now = time.time()
+        upcoming = sorted(
+            (target.expires_at - self.refresh_ahead + target.jitter, target.key)
+            for target in self.targets if target.expires_at is not None
+        )
+        hot = self.source.hot_counters
+        lookups = hot["hits"] + hot["misses"]
+        return {
+            **self.stats_counters,
+            "running": self._task is not None and not self._task.done(),
+            "targets": len(self.targets),
+            "cached": sum(1 for target in self.targets if target.expires_at and target.expires_at > now),
+            "interval": self.interval,
+            "refresh_ahead": self.refresh_ahead,
+            "concurrency": self.concurrency,
+            "last_run": self.last_run,
+            "next_run_in": round(self.next_run_at - now, 1) if self.next_run_at else None,
+            "next_refreshes": [{"key": key, "in": round(due_at - now, 1)} for due_at, key in upcoming[:5]],
+            "hot_hits": hot["hits"],
+            "hot_misses": hot["misses"],
+            "hot_hit_ratio": round(hot["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Create singleton instance
+prefetcher = CachePrefetcher()
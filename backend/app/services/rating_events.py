@@ -0,0 +1,71 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RatingEvent:
+    """A user's rating for a movie changed; rating is None when it was deleted"""
+    user_id: int
+    tmdb_movie_id: int
+    rating: Optional[float]
+    movie_title: Optional[str] = None
+    movie_poster: Optional[str] = None
+
+
+class RatingEventBus:
+    """In-process publish/subscribe for rating writes.
+
+    publish() only enqueues, so request handlers never wait on subscribers;
+    a single worker thread delivers events in order.
+    """
+
+    def __init__(self, max_queue: int = 100000):
+        self._queue: "queue.Queue[Optional[RatingEvent]]" = queue.Queue(maxsize=max_queue)
+        self._handlers: List[Callable[[RatingEvent], None]] = []
+        self._worker: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def subscribe(self, handler: Callable[[RatingEvent], None]):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def publish(self, event: RatingEvent):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Subscribers catch up on the next full rebuild
+            self.dropped += 1
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="rating-events", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5):
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout)
+        self._worker = None
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            for handler in self._handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.error(f"Rating event handler failed for {event}: {e}")
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+# Create singleton instance
+rating_events = RatingEventBus()
@@ -0,0 +1,339 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.upsert import upsert_statement
+from app.models.movie import Movie
+from app.models.rating import Rating
+from app.services.rating_events import RatingEvent, rating_events
+from app.services.rating_stats import RATING_STATS_UPSERT, stats_deltas, user_write_lock
+from app.services.tmdb_service import tmdb_service
+
+logger = logging.getLogger(__name__)
+
+# Accepted header names, lowercased. Covers our own export and Letterboxd's
+# import format (tmdbID, Title, Year, Rating, Rating10) and export (Name, Year, Rating).
+FIELD_ALIASES = {
+    "tmdb_movie_id": ("tmdb_movie_id", "tmdbid", "tmdb_id"),
+    "movie_title": ("movie_title", "title", "name"),
+    "movie_poster": ("movie_poster", "poster"),
+    "year": ("year",),
+    "rating": ("rating",),
+    "rating10": ("rating10",),
+}
+
+EXPORT_CSV_HEADER = ["tmdbID", "Title", "Rating", "Date", "Poster"]
+
+MAX_REPORTED_ERRORS = 20
+
+
+def upsert_ratings(db: Session, user_id: int, ratings: Iterable[Dict], chunk_size: Optional[int] = None) -> int:
+    """Write a user's ratings with multi-row upserts, one transaction per chunk.
+
+    Each rating is a dict with tmdb_movie_id, rating and optionally movie_title
+    and movie_poster; a later rating of the same movie wins. The movies' rating
+    aggregates are updated in the same transactions. Returns rows written.
+    """
+    chunk_size = chunk_size or settings.RATINGS_IMPORT_CHUNK_SIZE
+    stmt = upsert_statement(
+        db.get_bind().dialect.name, Rating.__table__, None, ["user_id", "tmdb_movie_id"],
+        ["rating", "movie_title", "movie_poster", "updated_at"], keep_existing=["movie_title", "movie_poster"]
+    )
+    written = 0
+    chunk: Dict[int, Dict] = {}
+
+    def flush():
+        now = datetime.utcnow()
+        rows = [{**row, "user_id": user_id, "created_at": now, "updated_at": now} for row in chunk.values()]
+        db.execute(user_write_lock(db), {"user_id": user_id})
+        previous = dict(db.execute(
+            select(Rating.tmdb_movie_id, Rating.rating)
+            .where(Rating.user_id == user_id, Rating.tmdb_movie_id.in_(list(chunk)))
+        ).all())
+        # executemany: batched into multi-row VALUES by the driver/SQLAlchemy where supported
+        db.execute(stmt, rows)
+        deltas = stats_deltas(((row["tmdb_movie_id"], previous.get(row["tmdb_movie_id"]), row["rating"],
+                                row["movie_title"], row["movie_poster"]) for row in rows), now)
+        if deltas:
+            db.execute(RATING_STATS_UPSERT, deltas)
+        db.commit()
+        for row in rows:
+            rating_events.publish(RatingEvent(
+                user_id, row["tmdb_movie_id"], row["rating"], row["movie_title"], row["movie_poster"]
+            ))
+        return len(rows)
+
+    for rating in ratings:
+        chunk[rating["tmdb_movie_id"]] = {
+            "tmdb_movie_id": rating["tmdb_movie_id"],
+            "rating": rating["rating"],
+            "movie_title": rating.get("movie_title"),
+            "movie_poster": rating.get("movie_poster"),
+        }
+        if len(chunk) >= chunk_size:
+            written += flush()
+            chunk = {}
+    if chunk:
+        written += flush()
+    return written
+
+
+class RatingImporter:
+    """Validates parsed import rows and writes them in bounded chunks.
+
+    Rows without a TMDB id are matched to the local catalog by title (and year,
+    when given). Nothing is held beyond one chunk, so memory stays bounded
+    whatever the size of the upload.
+    """
+
+    def __init__(self, db: Session, user_id: int, chunk_size: Optional[int] = None):
+        self.db = db
+        self.user_id = user_id
+        self.chunk_size = chunk_size or settings.RATINGS_IMPORT_CHUNK_SIZE
+        self.pending: List[Dict] = []
+        self.received = 0
+        self.written = 0
+        self.skipped = 0
+        self.errors: List[str] = []
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.pending) >= self.chunk_size
+
+    def _skip(self, line: int, reason: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {reason}")
+
+    def add(self, line: int, fields: Dict):
+        """Queue one parsed row (header name -> value)"""
+        self.received += 1
+        fields = {str(k).strip().lower(): v for k, v in fields.items() if k is not None}
+        row = {"line": line}
+        for name, aliases in FIELD_ALIASES.items():
+            value = next((fields[a] for a in aliases if fields.get(a) not in (None, "")), None)
+            row[name] = value.strip() if isinstance(value, str) else value
+
+        try:
+            if row["rating"] is not None:
+                rating = float(row["rating"])
+            elif row["rating10"] is not None:
+                rating = float(row["rating10"]) / 2
+            else:
+                return self._skip(line, "missing rating")
+            row["tmdb_movie_id"] = int(row["tmdb_movie_id"]) if row["tmdb_movie_id"] is not None else None
+            row["year"] = int(row["year"]) if row["year"] is not None else None
+        except (TypeError, ValueError) as e:
+            return self._skip(line, f"invalid value ({e})")
+        if not 1.0 <= rating <= 5.0:
+            return self._skip(line, f"rating {rating} outside 1.0-5.0")
+        if row["tmdb_movie_id"] is None and not row["movie_title"]:
+            return self._skip(line, "needs a TMDB id or a title")
+        row["rating"] = rating
+        self.pending.append(row)
+
+    def _catalog_matches(self, rows: List[Dict]) -> Dict:
+        """Look up catalog movies for rows by id and by title, in two queries"""
+        ids = {row["tmdb_movie_id"] for row in rows if row["tmdb_movie_id"] is not None}
+        titles = {row["movie_title"] for row in rows if row["tmdb_movie_id"] is None}
+        by_id, by_title = {}, {}
+        try:
+            if ids:
+                by_id = {m.tmdb_id: m for m in self.db.query(Movie.tmdb_id, Movie.title, Movie.poster_path)
+                         .filter(Movie.tmdb_id.in_(ids))}
+            if titles:
+                # Most popular first, so an ambiguous title resolves to the best-known movie
+                for m in (self.db.query(Movie.tmdb_id, Movie.title, Movie.release_date, Movie.poster_path)
+                          .filter(Movie.title.in_(titles)).order_by(Movie.popularity.desc())):
+                    by_title.setdefault(m.title, []).append(m)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.warning(f"⚠️  Catalog lookup failed during rating import: {e}")
+        return {"by_id": by_id, "by_title": by_title}
+
+    def flush(self):
+        """Resolve and write the queued rows"""
+        rows, self.pending = self.pending, []
+        if not rows:
+            return
+        matches = self._catalog_matches(rows)
+        ratings = []
+        for row in rows:
+            movie = matches["by_id"].get(row["tmdb_movie_id"])
+            if row["tmdb_movie_id"] is None:
+                candidates = [m for m in matches["by_title"].get(row["movie_title"], [])
+                              if row["year"] is None or (m.release_date and m.release_date.year == row["year"])]
+                if not candidates:
+                    self._skip(row["line"], f"no catalog match for '{row['movie_title']}'")
+                    continue
+                movie = candidates[0]
+            ratings.append({
+                "tmdb_movie_id": movie.tmdb_id if movie else row["tmdb_movie_id"],
+                "rating": row["rating"],
+                "movie_title": row["movie_title"] or (movie.title if movie else "Unknown Title"),
+                "movie_poster": row["movie_poster"] or (tmdb_service._get_full_image_url(movie.poster_path) if movie else None),
+            })
+        self.written += upsert_ratings(self.db, self.user_id, ratings, self.chunk_size)
+
+    def summary(self) -> Dict:
+        return {"received": self.received, "written": self.written, "skipped": self.skipped, "errors": self.errors}
+
+
+class LineTooLong(ValueError):
+    """Raised when an import line (or quoted CSV record) exceeds RATINGS_IMPORT_MAX_LINE bytes"""
+
+    def __init__(self, max_length: int):
+        super().__init__(f"Lines may be at most {max_length} bytes")
+
+
+class LineSplitter:
+    """Turns a byte stream into complete text lines, holding back the partial last line
+
+    Only the new chunk is split; the partial line is kept apart and joined once
+    its newline arrives. Lines longer than `max_length` raise LineTooLong.
+    """
+
+    def __init__(self, max_length: Optional[int] = None):
+        self.max_length = max_length or settings.RATINGS_IMPORT_MAX_LINE
+        self._partial = bytearray()
+        self._started = False
+
+    def feed(self, data: bytes) -> List[str]:
+        *lines, rest = data.split(b"\n")
+        if lines:
+            lines[0] = bytes(self._partial) + lines[0]
+            self._partial = bytearray(rest)
+        else:
+            self._partial += rest
+        if len(self._partial) > self.max_length or any(len(line) > self.max_length for line in lines):
+            raise LineTooLong(self.max_length)
+        return [self._decode(line) for line in lines]
+
+    def close(self) -> List[str]:
+        rest, self._partial = bytes(self._partial), bytearray()
+        return [self._decode(rest)] if rest.strip() else []
+
+    def _decode(self, line: bytes) -> str:
+        text = line.decode("utf-8", errors="replace")
+        if not self._started:
+            self._started = True
+            text = text.lstrip("﻿")  # Excel-style UTF-8 BOM
+        return text.rstrip("\r")
+
+
+class CSVRatingParser:
+    """Incremental CSV parser: feed byte chunks, get (line number, row dict) pairs back"""
+
+    def __init__(self):
+        self._lines = LineSplitter()
+        self._header: Optional[List[str]] = None
+        self._record: List[str] = []
+        self._record_length = 0
+        self._line = 0
+
+    def feed(self, data: bytes) -> List[tuple]:
+        return self._parse(self._lines.feed(data))
+
+    def close(self) -> List[tuple]:
+        rows = self._parse(self._lines.close())
+        if self._record:  # Unterminated quoted field, parse what we have
+            rows.extend(self._parse_record())
+        return rows
+
+    def _parse(self, lines: List[str]) -> List[tuple]:
+        rows = []
+        for line in lines:
+            self._line += 1
+            self._record.append(line)
+            self._record_length += len(line) + 1
+            if self._record_length > self._lines.max_length:  # e.g. a quote that is never closed
+                raise LineTooLong(self._lines.max_length)
+            # A quoted field may contain newlines: wait until the quotes balance
+            if sum(part.count('"') for part in self._record) % 2 == 0:
+                rows.extend(self._parse_record())
+        return rows
+
+    def _parse_record(self) -> List[tuple]:
+        text, self._record, self._record_length = "\n".join(self._record), [], 0
+        if not text.strip():
+            return []
+        values = next(csv.reader(io.StringIO(text)))
+        if self._header is None:
+            self._header = values
+            return []
+        return [(self._line, dict(zip(self._header, values)))]
+
+
+class JSONLRatingParser:
+    """Incremental JSON Lines parser with the same interface as CSVRatingParser"""
+
+    def __init__(self):
+        self._lines = LineSplitter()
+        self._line = 0
+
+    def feed(self, data: bytes) -> List[tuple]:
+        return self._parse(self._lines.feed(data))
+
+    def close(self) -> List[tuple]:
+        return self._parse(self._lines.close())
+
+    def _parse(self, lines: List[str]) -> List[tuple]:
+        rows = []
+        for line in lines:
+            self._line += 1
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                value = None
+            # Invalid lines become empty rows so the importer reports them
+            rows.append((self._line, value if isinstance(value, dict) else {}))
+        return rows
+
+
+PARSERS = {"csv": CSVRatingParser, "jsonl": JSONLRatingParser}
+
+
+def export_ratings(db: Session, user_id: int, format: str = "csv", batch_size: int = 1000) -> Iterator[str]:
+    """Stream a user's ratings as CSV (Letterboxd import compatible) or JSON Lines"""
+    query = (
+        db.query(Rating.tmdb_movie_id, Rating.movie_title, Rating.movie_poster, Rating.rating, Rating.created_at)
+        .filter(Rating.user_id == user_id)
+        .order_by(Rating.id)
+        .yield_per(batch_size)
+    )
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_HEADER)
+        for count, row in enumerate(query, 1):
+            writer.writerow([row.tmdb_movie_id, row.movie_title, row.rating,
+                             row.created_at.date().isoformat() if row.created_at else "", row.movie_poster or ""])
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        lines = []
+        for row in query:
+            lines.append(json.dumps({
+                "tmdb_movie_id": row.tmdb_movie_id,
+                "movie_title": row.movie_title,
+                "movie_poster": row.movie_poster,
+                "rating": row.rating,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+            }) + "\n")
+            if len(lines) >= batch_size:
+                yield "".join(lines)
+                lines = []
+        yield "".join(lines)
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, or_, select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.database.upsert import upsert_statement
+from app.models.checkpoint import JobCheckpoint
+from app.models.rating import MovieRatingStats, Rating
+from app.services.tmdb_service import tmdb_service
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = "rating_metadata"
+
+
+class RatingMetadataRefresher:
+    """Background job that keeps ratings' copies of movie titles and posters current.
+
+    Walks the rated movies (movie_rating_stats) in id order, picking those not
+    checked against TMDB for `max_age` seconds, and fetches them in batches at
+    `rate` movies per second. Changed titles and posters are written to the
+    movies' ratings with bulk UPDATEs of at most `max_rows` rows, each its
+    own short transaction. The position is checkpointed after every batch, so
+    a restart picks up where the previous process stopped.
+    """
+
+    def __init__(self, source=None, session_factory=SessionLocal, batch_size: Optional[int] = None,
+                 rate: Optional[float] = None, max_rows: Optional[int] = None, max_age: Optional[float] = None):
+        self.source = source or tmdb_service
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.RATING_REFRESH_BATCH_SIZE
+        self.rate = rate if rate is not None else settings.RATING_REFRESH_RATE
+        self.max_rows = max_rows or settings.RATING_REFRESH_MAX_ROWS
+        self.max_age = max_age if max_age is not None else settings.RATING_REFRESH_MAX_AGE
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict] = None
+        self.stats_counters: Dict[str, int] = {"batches": 0, "movies": 0, "rows": 0, "errors": 0}
+
+    def _load_position(self) -> int:
+        db = self.session_factory()
+        try:
+            position = db.execute(select(JobCheckpoint.position).where(JobCheckpoint.name == CHECKPOINT)).scalar()
+            return int(position) if position else 0
+        finally:
+            db.close()
+
+    def _stale_movies(self, after: int) -> List[Tuple[int, int]]:
+        """The next batch of (tmdb_movie_id, rating_count) not checked since the cutoff, after `after`"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.max_age)
+        db = self.session_factory()
+        try:
+            return db.execute(
+                select(MovieRatingStats.tmdb_movie_id, MovieRatingStats.rating_count)
+                .where(MovieRatingStats.tmdb_movie_id > after,
+                       or_(MovieRatingStats.metadata_synced_at.is_(None), MovieRatingStats.metadata_synced_at < cutoff))
+                .order_by(MovieRatingStats.tmdb_movie_id)
+                .limit(self.batch_size)
+            ).all()
+        finally:
+            db.close()
+
+    def _update_ratings(self, db, fresh: Dict[int, Tuple[str, Optional[str]]], condition=None) -> int:
+        """One bulk UPDATE of the ratings of `fresh`'s movies that differ from it, committed on its own"""
+        title = case({movie_id: t for movie_id, (t, _) in fresh.items()},
+                     value=Rating.tmdb_movie_id, else_=Rating.movie_title)
+        posters = {movie_id: p for movie_id, (_, p) in fresh.items() if p}
+        poster = case(posters, value=Rating.tmdb_movie_id, else_=Rating.movie_poster) if posters else Rating.movie_poster
+        stmt = (
+            update(Rating)
+            .where(Rating.tmdb_movie_id.in_(list(fresh)),
+                   or_(Rating.movie_title.is_distinct_from(title), Rating.movie_poster.is_distinct_from(poster)))
+            # updated_at is when the user rated, not when we refreshed the copy
+            .values(movie_title=title, movie_poster=poster, updated_at=Rating.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if condition is not None:
+            stmt = stmt.where(condition)
+        rows = db.execute(stmt).rowcount
+        db.commit()
+        return rows
+
+    def _apply(self, fresh: Dict[int, Tuple[str, Optional[str]]], rating_counts: Dict[int, int],
+               checked: List[int], position: int) -> int:
+        """Write current titles/posters to the ratings that differ, mark the batch checked, save the checkpoint.
+
+        Movies are grouped into UPDATEs touching at most `max_rows` ratings; a movie
+        with more ratings than that is walked in id ranges (ix_ratings_movie_id).
+        """
+        db = self.session_factory()
+        try:
+            rows = 0
+            group: Dict[int, Tuple[str, Optional[str]]] = {}
+            group_size = 0
+            for movie_id, metadata in fresh.items():
+                count = rating_counts.get(movie_id, 0)
+                if count > self.max_rows:
+                    last_id = 0
+                    while True:
+                        bound = db.execute(
+                            select(Rating.id).where(Rating.tmdb_movie_id == movie_id, Rating.id > last_id)
+                            .order_by(Rating.id).offset(self.max_rows - 1).limit(1)
+                        ).scalar()
+                        in_range = Rating.id > last_id if bound is None else and_(Rating.id > last_id, Rating.id <= bound)
+                        rows += self._update_ratings(db, {movie_id: metadata}, in_range)
+                        if bound is None:
+                            break
+                        last_id = bound
+                    continue
+                if group and group_size + count > self.max_rows:
+                    rows += self._update_ratings(db, group)
+                    group, group_size = {}, 0
+                group[movie_id] = metadata
+                group_size += count
+            if group:
+                rows += self._update_ratings(db, group)
+
+            now = datetime.utcnow()
+            refreshed = [{"b_id": movie_id, "b_title": fresh[movie_id][0], "b_poster": fresh[movie_id][1]}
+                         for movie_id in checked if movie_id in fresh]
+            if refreshed:
+                # Core table, an ORM update with a list of rows would be a bulk update by primary key
+                stats = MovieRatingStats.__table__
+                db.execute(
+                    update(stats).where(stats.c.tmdb_movie_id == bindparam("b_id"))
+                    .values(movie_title=bindparam("b_title"), movie_poster=bindparam("b_poster"), metadata_synced_at=now),
+                    refreshed
+                )
+            unchanged = [movie_id for movie_id in checked if movie_id not in fresh]
+            if unchanged:
+                db.execute(
+                    update(MovieRatingStats).where(MovieRatingStats.tmdb_movie_id.in_(unchanged))
+                    .values(metadata_synced_at=now).execution_options(synchronize_session=False)
+                )
+            self._save_position(db, position, now)
+            db.commit()
+            return rows
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _save_position(self, db, position: int, now: datetime):
+        stmt = upsert_statement(db.get_bind().dialect.name, JobCheckpoint.__table__,
+                                [{"name": CHECKPOINT, "position": str(position), "updated_at": now}],
+                                ["name"], ["position", "updated_at"])
+        db.execute(stmt)
+
+    async def refresh_batch(self, after: int) -> Optional[int]:
+        """Refresh the next batch of movies after `after`.
+
+        Returns the position to continue from, `after` again if TMDB is down
+        (nothing is skipped), or None once the pass has reached the end.
+        """
+        batch = await run_in_threadpool(self._stale_movies, after)
+        if not batch:
+            await run_in_threadpool(self._apply, {}, {}, [], 0)
+            return None
+
+        movie_ids = [row.tmdb_movie_id for row in batch]
+        movies, errors = await self.source.get_movies_with_credits(movie_ids, concurrency=4, store=False)
+        if errors and all(error == "unavailable" for error in errors.values()) and not movies:
+            return after
+
+        fresh = {movie_id: (movie["title"], movie.get("poster_url")) for movie_id, movie in movies.items()
+                 if movie.get("title")}
+        # Movies TMDB no longer has are checked too, transient errors are retried next pass
+        checked = [movie_id for movie_id in movie_ids if movie_id in movies or errors.get(movie_id) == "not_found"]
+        rating_counts = {row.tmdb_movie_id: row.rating_count for row in batch}
+        rows = await run_in_threadpool(self._apply, fresh, rating_counts, checked, movie_ids[-1])
+
+        counters = self.stats_counters
+        counters["batches"] += 1
+        counters["movies"] += len(checked)
+        counters["rows"] += rows
+        counters["errors"] += len(movie_ids) - len(checked)
+        return movie_ids[-1]
+
+    async def run_once(self) -> Dict[str, int]:
+        """Run until the end of the table (or until TMDB is down), starting at the checkpoint"""
+        started = datetime.utcnow()
+        before = dict(self.stats_counters)
+        position = await run_in_threadpool(self._load_position)
+        while True:
+            batch_started = time.monotonic()
+            next_position = await self.refresh_batch(position)
+            if next_position is None:
+                break
+            if next_position == position:
+                logger.warning("⚠️  TMDB unavailable, rating metadata refresh paused")
+                break
+            position = next_position
+            # Stay at `rate` movies per second
+            if self.rate > 0:
+                await asyncio.sleep(max(0.0, self.batch_size / self.rate - (time.monotonic() - batch_started)))
+        counts = {name: value - before[name] for name, value in self.stats_counters.items()}
+        self.last_run = {"started_at": started.isoformat(), "position": position, **counts}
+        logger.info(f"🖼️  Rating metadata refresh checked {counts['movies']} movies, updated {counts['rows']} ratings")
+        return counts
+
+    async def run_forever(self, interval: Optional[float] = None):
+        interval = interval or settings.RATING_REFRESH_INTERVAL
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Rating metadata refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {**self.stats_counters, "last_run": self.last_run}
+
+
+# Create singleton instance
+rating_metadata_refresher = RatingMetadataRefresher()
@@ -0,0 +1,231 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import DateTime, and_, bindparam, case, delete, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.rating import MovieRatingStats, Rating
+from app.models.user import User
+from app.services.cache import LRUCache
+
+STARS = (1, 2, 3, 4, 5)
+
+# A rating's running totals change by a delta computed from its old and new value, so the
+# old value has to be read first. Locking the user row serializes one user's rating writes,
+# so two requests can't both see "no previous rating" and count the movie twice.
+USER_WRITE_LOCK = select(User.id).where(User.id == bindparam("user_id")).with_for_update()
+
+# SQLite ignores FOR UPDATE, and pysqlite runs a SELECT outside any transaction. A write
+# statement opens the transaction holding the database's write lock, which other writers
+# wait for (busy_timeout) until commit, so there this no-op UPDATE goes first instead.
+# Textual so the users.updated_at onupdate default isn't applied.
+SQLITE_WRITE_LOCK = text("UPDATE users SET id = id WHERE id = :user_id")
+
+# The same lock, plus the user's current rating of the movie, in one round trip (after
+# SQLITE_WRITE_LOCK on SQLite)
+PREVIOUS_RATING = (
+    select(User.id, Rating.rating)
+    .outerjoin(Rating, and_(Rating.user_id == User.id, Rating.tmdb_movie_id == bindparam("tmdb_movie_id")))
+    .where(User.id == bindparam("user_id"))
+    .with_for_update(of=User)
+)
+
+# Apply deltas (PostgreSQL and SQLite share the ON CONFLICT syntax), recomputing the
+# stored Bayesian average with the prior the scores currently use. Executed with a list
+# of rows for batches.
+RATING_STATS_UPSERT = text("""
+    INSERT INTO movie_rating_stats (tmdb_movie_id, rating_count, rating_sum, rating_sum_sq,
+                                    stars_1, stars_2, stars_3, stars_4, stars_5,
+                                    bayesian_score, movie_title, movie_poster, updated_at)
+    VALUES (:tmdb_movie_id, :rating_count, :rating_sum, :rating_sum_sq,
+            :stars_1, :stars_2, :stars_3, :stars_4, :stars_5,
+            (:prior_weight * :prior_mean + :rating_sum) / (:prior_weight + :rating_count),
+            :movie_title, :movie_poster, :updated_at)
+    ON CONFLICT (tmdb_movie_id) DO UPDATE SET
+        rating_count = movie_rating_stats.rating_count + excluded.rating_count,
+        rating_sum = movie_rating_stats.rating_sum + excluded.rating_sum,
+        bayesian_score = (:prior_weight * :prior_mean + movie_rating_stats.rating_sum + excluded.rating_sum)
+                         / (:prior_weight + movie_rating_stats.rating_count + excluded.rating_count),
+        rating_sum_sq = movie_rating_stats.rating_sum_sq + excluded.rating_sum_sq,
+        stars_1 = movie_rating_stats.stars_1 + excluded.stars_1,
+        stars_2 = movie_rating_stats.stars_2 + excluded.stars_2,
+        stars_3 = movie_rating_stats.stars_3 + excluded.stars_3,
+        stars_4 = movie_rating_stats.stars_4 + excluded.stars_4,
+        stars_5 = movie_rating_stats.stars_5 + excluded.stars_5,
+        movie_title = COALESCE(excluded.movie_title, movie_rating_stats.movie_title),
+        movie_poster = COALESCE(excluded.movie_poster, movie_rating_stats.movie_poster),
+        updated_at = excluded.updated_at
+""").bindparams(bindparam("updated_at", type_=DateTime))
+
+# The global mean is a SUM over every aggregate row, cache it briefly
+_mean_cache = LRUCache(max_entries=1)
+GLOBAL_MEAN_TTL = 300
+DEFAULT_MEAN = 3.0  # Until anything is rated
+GLOBAL_MEAN = select(func.sum(MovieRatingStats.rating_sum), func.sum(MovieRatingStats.rating_count))
+
+# bayesian_score is stored so the top list walks an index instead of sorting every row.
+# Writes score with the global mean this process last applied to the whole table; once the
+# mean has moved further than PRIOR_REFRESH_DELTA every score is recomputed.
+PRIOR_REFRESH_DELTA = 0.01
+_scored_prior = {"mean": DEFAULT_MEAN}
+BAYESIAN_SCORES_REFRESH = text("""
+    UPDATE movie_rating_stats
+    SET bayesian_score = (:prior_weight * :prior_mean + rating_sum) / (:prior_weight + rating_count)
+""")
+
+
+def takes_sqlite_lock(db: Union[Session, AsyncSession]) -> bool:
+    """Whether rating writes on this session start with SQLITE_WRITE_LOCK instead of a row lock"""
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def user_write_lock(db: Union[Session, AsyncSession]):
+    """The statement that serializes a user's rating writes on this session's database"""
+    return SQLITE_WRITE_LOCK if takes_sqlite_lock(db) else USER_WRITE_LOCK
+
+
+def star_bucket(rating: float) -> int:
+    """Histogram bucket of a rating: its whole stars"""
+    return min(5, max(1, int(rating)))
+
+
+def stats_deltas(changes: Iterable[Tuple], now: Optional[datetime] = None) -> List[Dict]:
+    """Rows for RATING_STATS_UPSERT, one per movie.
+
+    Each change is (tmdb_movie_id, old rating or None, new rating or None, title, poster):
+    an insert has no old rating, a delete no new one. Changes that leave the
+    totals as they were are dropped.
+    """
+    now = now or datetime.utcnow()
+    prior_mean, prior_weight = _scored_prior["mean"], settings.RATING_STATS_PRIOR_WEIGHT
+    rows: Dict[int, Dict] = {}
+    for tmdb_movie_id, old, new, title, poster in changes:
+        row = rows.get(tmdb_movie_id)
+        if row is None:
+            row = rows[tmdb_movie_id] = {
+                "tmdb_movie_id": tmdb_movie_id, "rating_count": 0, "rating_sum": 0.0, "rating_sum_sq": 0.0,
+                **{f"stars_{star}": 0 for star in STARS},
+                "movie_title": None, "movie_poster": None, "updated_at": now,
+                "prior_mean": prior_mean, "prior_weight": prior_weight,
+            }
+        for rating, sign in ((old, -1), (new, 1)):
+            if rating is not None:
+                row["rating_count"] += sign
+                row["rating_sum"] += sign * rating
+                row["rating_sum_sq"] += sign * rating * rating
+                row[f"stars_{star_bucket(rating)}"] += sign
+        row["movie_title"] = title or row["movie_title"]
+        row["movie_poster"] = poster or row["movie_poster"]
+    return [
+        row for row in rows.values()
+        if row["rating_count"] or row["rating_sum"] or any(row[f"stars_{star}"] for star in STARS)
+    ]
+
+
+def rebuild_rating_stats(connection: Connection) -> int:
+    """Recompute every movie's aggregates from the ratings table (one GROUP BY). Returns movies."""
+    connection.execute(delete(MovieRatingStats))
+    columns = [
+        Rating.tmdb_movie_id,
+        func.count(Rating.id),
+        func.sum(Rating.rating),
+        func.sum(Rating.rating * Rating.rating),
+        *[func.sum(case((_in_bucket(star), 1), else_=0)) for star in STARS],
+        func.max(Rating.movie_title),
+        func.max(Rating.movie_poster),
+        func.max(Rating.updated_at),
+    ]
+    connection.execute(insert(MovieRatingStats).from_select(
+        ["tmdb_movie_id", "rating_count", "rating_sum", "rating_sum_sq",
+         *[f"stars_{star}" for star in STARS], "movie_title", "movie_poster", "updated_at"],
+        select(*columns).group_by(Rating.tmdb_movie_id)
+    ))
+    refresh_bayesian_scores(connection)
+    return connection.execute(select(func.count()).select_from(MovieRatingStats)).scalar()
+
+
+def refresh_bayesian_scores(connection: Connection, prior_mean: Optional[float] = None):
+    """Recompute every stored bayesian_score with this prior (by default the current global mean)"""
+    if prior_mean is None:
+        total, count = connection.execute(GLOBAL_MEAN).one()
+        prior_mean = total / count if count else DEFAULT_MEAN
+    connection.execute(BAYESIAN_SCORES_REFRESH, {
+        "prior_mean": prior_mean, "prior_weight": settings.RATING_STATS_PRIOR_WEIGHT
+    })
+    _scored_prior["mean"] = prior_mean
+
+
+def _in_bucket(star: int):
+    if star == 1:
+        return Rating.rating < 2
+    if star == 5:
+        return Rating.rating >= 5
+    return and_(Rating.rating >= star, Rating.rating < star + 1)
+
+
+async def global_mean(db: AsyncSession) -> float:
+    """Mean of all ratings, the prior of the Bayesian average
+    
+    Recomputing it also rescores every movie when it has moved far enough (in
+    this process, that includes the first time).
+    """
+    mean = _mean_cache.get("mean")
+    if mean is None:
+        total, count = (await db.execute(GLOBAL_MEAN)).one()
+        mean = total / count if count else DEFAULT_MEAN
+        _mean_cache.set("mean", mean, ttl=GLOBAL_MEAN_TTL)
+        if abs(mean - _scored_prior["mean"]) > PRIOR_REFRESH_DELTA:
+            async with async_engine.begin() as connection:
+                await connection.run_sync(refresh_bayesian_scores, mean)
+    return mean
+
+
+def describe(row, prior_mean: float, prior_weight: float) -> Dict:
+    """API shape of an aggregate row (or None for a movie nobody rated)"""
+    count = row.rating_count if row is not None else 0
+    total = row.rating_sum if row is not None else 0.0
+    average = total / count if count else None
+    stddev = math.sqrt(max(0.0, row.rating_sum_sq / count - average * average)) if count else None
+    return {
+        "tmdb_movie_id": row.tmdb_movie_id if row is not None else None,
+        "movie_title": row.movie_title if row is not None else None,
+        "movie_poster": row.movie_poster if row is not None else None,
+        "rating_count": count,
+        "average": round(average, 3) if average is not None else None,
+        "stddev": round(stddev, 3) if stddev is not None else None,
+        "bayesian_average": round((prior_weight * prior_mean + total) / (prior_weight + count), 3),
+        "histogram": {str(star): getattr(row, f"stars_{star}") if row is not None else 0 for star in STARS},
+    }
+
+
+async def get_movie_stats(db: AsyncSession, tmdb_movie_ids: Sequence[int]) -> List[Dict]:
+    """Aggregates for the given movies, in the given order, by primary key"""
+    rows = {row.tmdb_movie_id: row for row in (await db.execute(
+        select(MovieRatingStats).where(MovieRatingStats.tmdb_movie_id.in_(set(tmdb_movie_ids)))
+    )).scalars()}
+    prior_mean, prior_weight = await global_mean(db), settings.RATING_STATS_PRIOR_WEIGHT
+    items = []
+    for tmdb_movie_id in tmdb_movie_ids:
+        item = describe(rows.get(tmdb_movie_id), prior_mean, prior_weight)
+        item["tmdb_movie_id"] = tmdb_movie_id
+        items.append(item)
+    return items
+
+
+async def top_movies(db: AsyncSession, sort: str = "bayesian", min_ratings: int = 1, limit: int = 20) -> List[Dict]:
+    """Movies ranked by Bayesian average (few ratings pull toward the global mean) or by rating count"""
+    prior_mean, prior_weight = await global_mean(db), settings.RATING_STATS_PRIOR_WEIGHT
+    query = select(MovieRatingStats).where(MovieRatingStats.rating_count >= max(1, min_ratings))
+    if sort == "count":
+        # Walks ix_movie_rating_stats_count_id backwards
+        query = query.order_by(MovieRatingStats.rating_count.desc(), MovieRatingStats.tmdb_movie_id.desc())
+    else:
+        # Walks ix_movie_rating_stats_bayesian_id backwards
+        query = query.order_by(MovieRatingStats.bayesian_score.desc(), MovieRatingStats.tmdb_movie_id.desc())
+    rows = (await db.execute(query.limit(limit))).scalars()
+    return [describe(row, prior_mean, prior_weight) for row in rows]
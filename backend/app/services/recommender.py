@@ -0,0 +1,369 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.rating import Rating
+from app.services.rating_events import RatingEvent
+
+logger = logging.getLogger(__name__)
+
+
+class ModelState:
+    """A trained model, swapped in atomically and then updated in place by rating events"""
+
+    def __init__(self, user_ids: np.ndarray, item_ids: np.ndarray, ratings: sp.csr_matrix,
+                 cooccurrence: sp.csr_matrix, norms: np.ndarray, trained_at: float):
+        self.user_ids = user_ids
+        self.item_ids = item_ids
+        self.user_index = {int(u): i for i, u in enumerate(user_ids)}
+        self.item_index = {int(m): i for i, m in enumerate(item_ids)}
+        self.ratings = ratings            # users x items
+        self.cooccurrence = cooccurrence  # items x items, top-k neighbours per row: sum_u r_ui * r_uj
+        self.norms = norms                # per item: sqrt(sum_u r_ui^2)
+        self.trained_at = trained_at
+        # Cold-start fallback: items ranked by how often they were rated
+        counts = np.diff(ratings.tocsc().indptr)
+        self.popular = np.argsort(-counts, kind="stable")
+        # Ratings of items added since training (columns past `popular`), which follow them
+        # in the fallback until the rebuild ranks them properly
+        self.added_counts: Dict[int, int] = {}
+        # Ratings changed since training: user_id -> {item column: rating, 0 when deleted}
+        self.overrides: Dict[int, Dict[int, float]] = {}
+        self.updates_applied = 0
+
+
+class ItemKNNRecommender:
+    """Item-item cosine recommender over a sparse user x item rating matrix.
+
+    sim(i, j) = cooccurrence[i, j] / (norms[i] * norms[j]), and a user's score
+    for item j is sum_i r_ui * sim(i, j) over the items they rated. Training
+    runs offline; serving is a sparse vector-matrix product on the snapshot.
+
+    Rating events update the model in place: the user's profile, the item's
+    norm and the co-occurrence entries already kept for the affected item
+    pairs. New neighbour pairs only appear on the periodic full rebuild; until
+    then movies first rated after training follow the trained popularity order.
+    """
+
+    def __init__(self, neighbors: Optional[int] = None, max_user_ratings: Optional[int] = None):
+        self.neighbors = neighbors or settings.RECOMMENDER_NEIGHBORS
+        self.max_user_ratings = max_user_ratings or settings.RECOMMENDER_MAX_USER_RATINGS
+        self._state: Optional[ModelState] = None
+        self._train_lock = threading.Lock()
+        self._lock = threading.RLock()
+        # Events seen while a rebuild reads the table, replayed onto the new model
+        self._pending: Optional[List[RatingEvent]] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._state is not None
+
+    def fit(self, user_ids: Iterable[int], item_ids: Iterable[int], ratings: Iterable[float]) -> "ItemKNNRecommender":
+        """Train on (user, item, rating) triples and swap the new model in"""
+        state = self._build(user_ids, item_ids, ratings)
+        with self._lock:
+            self._state = state
+        return self
+
+    def _build(self, user_ids: Iterable[int], item_ids: Iterable[int], ratings: Iterable[float]) -> ModelState:
+        """Train a new model from (user, item, rating) triples"""
+        started = time.time()
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        item_ids = np.asarray(item_ids, dtype=np.int64)
+        values = np.asarray(ratings, dtype=np.float32)
+
+        users, user_rows = np.unique(user_ids, return_inverse=True)
+        items, item_cols = np.unique(item_ids, return_inverse=True)
+        
+        # A (user, item) pair keeps its last rating rather than being summed
+        pair_keys = user_rows.astype(np.int64) * len(items) + item_cols
+        _, last_from_end = np.unique(pair_keys[::-1], return_index=True)
+        keep = len(pair_keys) - 1 - last_from_end
+        matrix = sp.csr_matrix(
+            (values[keep], (user_rows[keep], item_cols[keep])), shape=(len(users), len(items)), dtype=np.float32
+        )
+
+        # Co-occurrence grows with the square of a user's rating count, so heavy
+        # raters (e.g. bulk imports) contribute only their latest ratings to it
+        cap = self.max_user_ratings
+        counts = np.bincount(user_rows[keep], minlength=len(users))
+        if counts.max(initial=0) > cap:
+            by_user = keep[np.lexsort((keep, user_rows[keep]))]
+            ends = np.cumsum(counts)[user_rows[by_user]]
+            latest = by_user[ends - 1 - np.arange(len(by_user)) < cap]
+            similarity_matrix = sp.csr_matrix(
+                (values[latest], (user_rows[latest], item_cols[latest])), shape=matrix.shape, dtype=np.float32
+            )
+        else:
+            similarity_matrix = matrix
+
+        norms = np.sqrt(np.asarray(similarity_matrix.power(2).sum(axis=0)).ravel()).astype(np.float32)
+        cooccurrence = (similarity_matrix.T @ similarity_matrix).tocsr()
+        cooccurrence.setdiag(0)
+        cooccurrence.eliminate_zeros()
+        cooccurrence = self._prune(cooccurrence, norms)
+
+        state = ModelState(users, items, matrix, cooccurrence, norms, time.time())
+        logger.info(
+            f"🎯 Recommender trained: {len(users)} users, {len(items)} items, "
+            f"{matrix.nnz} ratings in {time.time() - started:.1f}s"
+        )
+        return state
+
+    def _prune(self, cooccurrence: sp.csr_matrix, norms: np.ndarray) -> sp.csr_matrix:
+        """Keep the `neighbors` most similar items per row"""
+        k = self.neighbors
+        indptr, indices, data = cooccurrence.indptr, cooccurrence.indices, cooccurrence.data
+        keep = np.ones(len(data), dtype=bool)
+        for row in np.flatnonzero(np.diff(indptr) > k):
+            start, end = indptr[row], indptr[row + 1]
+            similarity = data[start:end] / norms[indices[start:end]]
+            drop = np.argpartition(-similarity, k)[k:]
+            keep[start + drop] = False
+        rows = np.repeat(np.arange(cooccurrence.shape[0]), np.diff(indptr))
+        pruned = sp.csr_matrix(
+            (data[keep], (rows[keep], indices[keep])), shape=cooccurrence.shape, dtype=np.float32
+        )
+        pruned.sort_indices()  # In-place updates look entries up with searchsorted
+        return pruned
+
+    def fit_from_db(self, db: Session, batch_size: int = 50000) -> "ItemKNNRecommender":
+        """Train from the ratings table, streaming rows in batches"""
+        with self._train_lock:
+            with self._lock:
+                self._pending = []
+            user_ids, item_ids, values = [], [], []
+            result = db.execute(
+                select(Rating.user_id, Rating.tmdb_movie_id, Rating.rating).execution_options(yield_per=batch_size)
+            )
+            for partition in result.partitions():
+                for user_id, item_id, rating in partition:
+                    user_ids.append(user_id)
+                    item_ids.append(item_id)
+                    values.append(rating)
+            if not values:
+                with self._lock:
+                    self._pending = None
+                logger.info("⏭️  No ratings yet, recommender not trained")
+                return self
+            
+            state = self._build(user_ids, item_ids, values)
+            with self._lock:
+                for event in self._pending:
+                    self._apply(state, event)
+                self._pending = None
+                self._state = state
+            return self
+
+    def apply_event(self, event: RatingEvent):
+        """Fold a rating create/update/delete into the model in place"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(event)
+            if self._state is None:
+                # First ratings before any training: start from an empty model
+                self._state = self._empty_state()
+            self._apply(self._state, event)
+
+    def _empty_state(self) -> ModelState:
+        empty = np.empty(0, dtype=np.int64)
+        return ModelState(
+            empty, empty.copy(), sp.csr_matrix((0, 0), dtype=np.float32),
+            sp.csr_matrix((0, 0), dtype=np.float32), np.empty(0, dtype=np.float32),
+            trained_at=0  # Never trained, so the next rebuild check retrains it
+        )
+
+    def needs_rebuild(self) -> bool:
+        """Due for a full retrain: the rebuild interval passed or too many in-place updates"""
+        state = self._state
+        if state is None:
+            return False
+        return (time.time() - state.trained_at >= settings.RECOMMENDER_REBUILD_INTERVAL
+                or state.updates_applied >= settings.RECOMMENDER_REBUILD_AFTER_UPDATES)
+
+    def _apply(self, state: ModelState, event: RatingEvent):
+        col = state.item_index.get(event.tmdb_movie_id)
+        if col is None:
+            if event.rating is None:
+                return
+            col = self._add_item(state, event.tmdb_movie_id)
+
+        overrides = state.overrides.setdefault(event.user_id, {})
+        old = overrides[col] if col in overrides else self._trained_rating(state, event.user_id, col)
+        new = float(event.rating or 0.0)
+
+        # Co-occurrence with every other item the user rated moves by (new - old) * r_uj.
+        # Heavy raters are capped at training time, so their events wait for the rebuild.
+        if self._profile_size_bound(state, event.user_id) < self.max_user_ratings:
+            cols, values = self._profile(state, event.user_id)
+            others = cols != col
+            if new != old and others.any():
+                self._update_pairs(state, col, cols[others], values[others] * (new - old))
+            state.norms[col] = np.sqrt(max(float(state.norms[col]) ** 2 + new ** 2 - old ** 2, 0.0))
+        overrides[col] = new
+        if col >= len(state.popular) and bool(new) != bool(old):
+            state.added_counts[col] = state.added_counts.get(col, 0) + (1 if new else -1)
+        state.updates_applied += 1
+
+    def _add_item(self, state: ModelState, tmdb_movie_id: int) -> int:
+        """Give a movie unseen at training time a column (no neighbours until the rebuild)"""
+        col = len(state.item_ids)
+        state.item_ids = np.append(state.item_ids, tmdb_movie_id)
+        state.item_index[tmdb_movie_id] = col
+        state.norms = np.append(state.norms, np.float32(0))
+        state.cooccurrence.resize((col + 1, col + 1))
+        return col
+
+    def _update_pairs(self, state: ModelState, col: int, other_cols: np.ndarray, increments: np.ndarray):
+        """Add increments to the kept co-occurrence entries (col, j) and (j, col)"""
+        matrix = state.cooccurrence
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+
+        start, end = indptr[col], indptr[col + 1]
+        if end > start:
+            row = indices[start:end]
+            positions = np.minimum(np.searchsorted(row, other_cols), len(row) - 1)
+            found = row[positions] == other_cols
+            data[start + positions[found]] += increments[found]
+
+        for other, increment in zip(other_cols, increments):
+            start, end = indptr[other], indptr[other + 1]
+            position = start + np.searchsorted(indices[start:end], col)
+            if position < end and indices[position] == col:
+                data[position] += increment
+
+    def _trained_rating(self, state: ModelState, user_id: int, col: int) -> float:
+        """A user's rating of an item in the trained matrix (0 if none)"""
+        row = state.user_index.get(user_id)
+        if row is None:
+            return 0.0
+        start, end = state.ratings.indptr[row], state.ratings.indptr[row + 1]
+        position = start + np.searchsorted(state.ratings.indices[start:end], col)
+        return float(state.ratings.data[position]) if position < end and state.ratings.indices[position] == col else 0.0
+
+    def _profile_size_bound(self, state: ModelState, user_id: int) -> int:
+        """Upper bound on how many items a user has rated, without building the profile"""
+        row = state.user_index.get(user_id)
+        trained = int(state.ratings.indptr[row + 1] - state.ratings.indptr[row]) if row is not None else 0
+        return trained + len(state.overrides.get(user_id, ()))
+
+    def _profile(self, state: ModelState, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """A user's current (item columns, ratings): trained row plus later events"""
+        row = state.user_index.get(user_id)
+        if row is not None:
+            start, end = state.ratings.indptr[row], state.ratings.indptr[row + 1]
+            cols, values = state.ratings.indices[start:end], state.ratings.data[start:end]
+        else:
+            cols, values = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        overrides = state.overrides.get(user_id)
+        if not overrides:
+            return cols, values
+        merged = dict(zip(cols.tolist(), values.tolist()))
+        merged.update(overrides)
+        merged = {c: v for c, v in merged.items() if v}
+        return np.fromiter(merged.keys(), dtype=np.int64, count=len(merged)), \
+            np.fromiter(merged.values(), dtype=np.float32, count=len(merged))
+
+    def _score(self, state: ModelState, item_cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Score every item for a profile of (item columns, ratings)"""
+        weights = values / np.maximum(state.norms[item_cols], 1e-9)
+        scores = state.cooccurrence[item_cols].T @ weights
+        return scores / np.maximum(state.norms, 1e-9)
+
+    def recommend(self, user_id: int, n: int = 20) -> List[Tuple[int, float]]:
+        """Top-n (tmdb_movie_id, score) for a user, excluding movies they rated"""
+        with self._lock:
+            return self._recommend(self._state, user_id, n)
+
+    def _recommend(self, state: Optional[ModelState], user_id: int, n: int) -> List[Tuple[int, float]]:
+        if state is None:
+            return []
+
+        rated, values = self._profile(state, user_id)
+        results: List[Tuple[int, float]] = []
+        if len(rated):
+            scores = self._score(state, rated, values)
+            scores[rated] = 0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > n:
+                candidates = candidates[np.argpartition(-scores[candidates], n)[:n]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            results = [(int(state.item_ids[c]), float(scores[c])) for c in candidates]
+
+        # Not enough signal (new user, or few co-ratings): fill with popular movies, then
+        # those first rated since training (all of them before the first training)
+        if len(results) < n:
+            seen = set(rated.tolist()) | {state.item_index[item_id] for item_id, _ in results}
+            added = sorted((col for col, count in state.added_counts.items() if count > 0),
+                           key=lambda col: -state.added_counts[col])
+            for col in itertools.chain(state.popular, added):
+                if len(results) >= n:
+                    break
+                if col not in seen:
+                    results.append((int(state.item_ids[col]), 0.0))
+        return results
+
+    def save(self, path: str):
+        """Persist the current model to an .npz file"""
+        state = self._state
+        if state is None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(
+            path,
+            user_ids=state.user_ids, item_ids=state.item_ids, trained_at=state.trained_at,
+            r_data=state.ratings.data, r_indices=state.ratings.indices, r_indptr=state.ratings.indptr,
+            c_data=state.cooccurrence.data, c_indices=state.cooccurrence.indices, c_indptr=state.cooccurrence.indptr,
+            norms=state.norms
+        )
+
+    def load(self, path: str) -> bool:
+        """Load a model saved with save(), returns False if there is none"""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as f:
+            n_users, n_items = len(f["user_ids"]), len(f["item_ids"])
+            ratings = sp.csr_matrix((f["r_data"], f["r_indices"], f["r_indptr"]), shape=(n_users, n_items))
+            cooccurrence = sp.csr_matrix((f["c_data"], f["c_indices"], f["c_indptr"]), shape=(n_items, n_items))
+            cooccurrence.sort_indices()
+            state = ModelState(f["user_ids"], f["item_ids"], ratings, cooccurrence,
+                               f["norms"], float(f["trained_at"]))
+        with self._lock:
+            self._state = state
+        logger.info(f"🎯 Recommender loaded from {path}")
+        return True
+
+    def item_user_matrix(self) -> Tuple[np.ndarray, sp.csr_matrix]:
+        """Snapshot of (item ids, items x users ratings) for building item embeddings"""
+        with self._lock:
+            state = self._state
+            if state is None:
+                return np.empty(0, dtype=np.int64), sp.csr_matrix((0, 0), dtype=np.float32)
+            return state.item_ids.copy(), state.ratings.T.tocsr()
+
+    def info(self) -> Dict:
+        state = self._state
+        if state is None:
+            return {"trained": False}
+        return {
+            "trained": True,
+            "users": len(state.user_ids),
+            "items": len(state.item_ids),
+            "ratings": int(state.ratings.nnz),
+            "trained_at": state.trained_at,
+            "updates_since_training": state.updates_applied,
+        }
+
+
+# Create singleton instance
+recommender = ItemKNNRecommender()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second on average, bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats_counters: Dict[str, float] = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it (a no-op when rate <= 0)"""
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Callers queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.stats_counters["waited"] += 1
+                self.stats_counters["wait_seconds"] += wait
+                await asyncio.sleep(wait)
+                self._refill(time.monotonic())
+            self._tokens -= 1
+            self.stats_counters["acquired"] += 1
+
+    def stats(self) -> Dict:
+        return {
+            "rate": self.rate,
+            "burst": self.capacity,
+            "acquired": int(self.stats_counters["acquired"]),
+            "waited": int(self.stats_counters["waited"]),
+            "wait_seconds": round(self.stats_counters["wait_seconds"], 3),
+        }
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that the circuit breaker considers down"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Circuit open, retrying upstream in {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    closed:    calls go through; `failure_threshold` failures in a row open it
+    open:      calls fail fast with CircuitOpenError for `reset_timeout` seconds
+    half_open: one trial call goes through; success closes, failure re-opens
+
+    A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, name: str = "upstream"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.stats_counters: Dict[str, int] = {"opened": 0, "rejected": 0}
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not go upstream"""
+        if not self.failure_threshold or self.state == "closed":
+            return
+        now = time.monotonic()
+        retry_in = self.opened_at + self.reset_timeout - now
+        if retry_in <= 0:
+            # One trial call goes through; the rest keep failing fast until it reports back
+            # (or for another reset_timeout, should it never report)
+            self.state = "half_open"
+            self.opened_at = now
+            return
+        self.stats_counters["rejected"] += 1
+        raise CircuitOpenError(retry_in)
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"✅ {self.name} circuit closed, calls resumed")
+        self.failures = 0
+        self.state = "closed"
+
+    def record_failure(self):
+        self.failures += 1
+        if not self.failure_threshold or self.state == "open":
+            return
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.stats_counters["opened"] += 1
+            logger.warning(f"🔌 {self.name} circuit open after {self.failures} failures, "
+                           f"failing fast for {self.reset_timeout:g}s")
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "consecutive_failures": self.failures, **self.stats_counters}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Delay before retry number `attempt` (0-based): full-jitter exponential backoff,
+    or the server's Retry-After when it sent one"""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(cap, base * 2 ** attempt))
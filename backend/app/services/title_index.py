@@ -0,0 +1,492 @@
+import bisect
+import heapq
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[\W_]+")
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"  # typo corrections are tried with these
+# Sorts after every character, so the words starting with a prefix end at bisect(prefix + _RANGE_END)
+_RANGE_END = "\U0010ffff"
+
+TOP_PREFIX_LENGTH = 4    # prefixes this short keep a ready-made list of their most popular titles
+TOP_K = 32               # titles kept per short prefix
+MAX_RANGE_TOKENS = 1024  # wider prefix ranges are answered from the short-prefix lists
+MAX_SCAN = 5000          # candidate titles checked per query
+MAX_INTERSECT = 60000    # postings entries intersected when no single word is selective
+PREFIX_BONUS = 1.5       # the title starts with the query
+RATED_BOOST = 1.0        # someone here rated it
+TYPO_PENALTY = 1.0       # per query word matched with one edit
+
+
+def normalize_title(title: str) -> Tuple[str, ...]:
+    """Lowercase, accent-free words ("Amélie (2001)" -> ("amelie", "2001"))"""
+    decomposed = unicodedata.normalize("NFKD", title)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return tuple(_SEPARATORS.sub(" ", folded).split())
+
+
+def edits1(word: str) -> Set[str]:
+    """Every string one delete, transpose, replace or insert away from `word`"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = {a + b[1:] for a, b in splits if b}
+    transposes = {a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1}
+    replaces = {a + c + b[1:] for a, b in splits if b for c in _ALPHABET}
+    inserts = {a + c + b for a, b in splits for c in _ALPHABET}
+    candidates = deletes | transposes | replaces | inserts
+    candidates.discard(word)
+    candidates.discard("")
+    return candidates
+
+
+class TitleDoc(NamedTuple):
+    """An indexed title. Immutable tuples of plain values are left alone by the
+    garbage collector, which would otherwise walk a million docs on every full
+    collection; the postings are arrays for the same reason."""
+    tmdb_id: int
+    title: str
+    year: Optional[int]
+    poster: Optional[str]
+    popularity: float
+    rated: bool
+    key: str  # the normalized words padded with spaces (" star wars "): word and prefix checks are substring searches
+    weight: float
+
+    @classmethod
+    def create(cls, tmdb_id: int, title: str, year: Optional[int], poster: Optional[str],
+               popularity: float, rated: bool) -> "TitleDoc":
+        key = " " + " ".join(normalize_title(title)) + " "
+        weight = math.log1p(max(popularity, 0.0)) + (RATED_BOOST if rated else 0.0)
+        return cls(tmdb_id, title, year, poster, popularity, rated, key, weight)
+
+    @property
+    def tokens(self) -> List[str]:
+        return self.key.split()
+
+
+class _Term:
+    """One query word, resolved against the vocabulary"""
+    __slots__ = ("text", "prefix", "alternatives", "tokens", "typo", "size", "needles")
+
+    def __init__(self, text: str, prefix: bool, alternatives: Tuple[str, ...],
+                 tokens: Optional[List[str]], typo: bool, size: int):
+        self.text = text
+        self.prefix = prefix
+        self.alternatives = alternatives  # the word, or its one-edit corrections
+        self.tokens = tokens              # vocabulary words it matches, None when too many to list
+        self.typo = typo
+        self.size = size                  # titles it matches (estimated when tokens is None)
+        # Substrings of TitleDoc.key that mean a title has the word (or a word starting with it)
+        self.needles = tuple(f" {a}" if prefix else f" {a} " for a in alternatives)
+
+    def matches(self, token: str) -> bool:
+        if self.prefix:
+            return token.startswith(self.alternatives)
+        return token in self.alternatives
+
+
+class TitleIndex:
+    """In-process typeahead over locally known movie titles.
+
+    An inverted index from normalized title words to the titles containing them,
+    each postings list ordered by weight (log popularity, plus a boost for movies
+    rated here). Completed query words must match a title word exactly, the word
+    being typed matches as a prefix through a sorted vocabulary. A query scans
+    the postings of its most selective word in weight order and stops after
+    enough matches, so its cost does not grow with the corpus. Prefixes of up to
+    TOP_PREFIX_LENGTH characters keep their TOP_K heaviest titles ready, so one-
+    or two-letter queries never touch a long postings list. A word with no
+    match is retried with its one-edit corrections (typos) at a score penalty.
+
+    Titles are added one at a time as TMDB responses and ratings come in, or in
+    bulk by load(), which builds off to the side and swaps in.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: Dict[int, TitleDoc] = {}
+        self._postings: Dict[str, array] = {}  # word -> tmdb ids, heaviest first
+        self._vocab: List[str] = []                # sorted words, for prefix ranges
+        self._top: Dict[str, array] = {}       # short prefix -> heaviest TOP_K tmdb ids
+        self.built_at: Optional[float] = None
+        self.stats_counters: Dict[str, int] = {"queries": 0, "typo_queries": 0, "inserts": 0, "updates": 0}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # Ordering: heavier first, ties by tmdb id
+    def _position(self, ranked: array, weight: float, tmdb_id: int) -> int:
+        docs = self._docs
+        lo, hi = 0, len(ranked)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = docs[ranked[mid]]
+            if other.weight > weight or (other.weight == weight and other.tmdb_id < tmdb_id):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def _short_prefixes(tokens: Iterable[str]) -> Set[str]:
+        return {token[:n] for token in tokens for n in range(1, min(len(token), TOP_PREFIX_LENGTH) + 1)}
+
+    def _link(self, doc: TitleDoc):
+        """Insert a doc into the postings and short-prefix lists"""
+        for token in set(doc.tokens):
+            ranked = self._postings.get(token)
+            if ranked is None:
+                ranked = self._postings[token] = array("q")
+                bisect.insort(self._vocab, token)
+            ranked.insert(self._position(ranked, doc.weight, doc.tmdb_id), doc.tmdb_id)
+        for prefix in self._short_prefixes(doc.tokens):
+            ranked = self._top.get(prefix)
+            if ranked is None:
+                ranked = self._top[prefix] = array("q")
+            position = self._position(ranked, doc.weight, doc.tmdb_id)
+            if position < TOP_K:
+                ranked.insert(position, doc.tmdb_id)
+                del ranked[TOP_K:]
+
+    def _unlink(self, doc: TitleDoc):
+        """Remove a doc from the postings and short-prefix lists (its weight must be the one it was linked with)"""
+        for token in set(doc.tokens):
+            ranked = self._postings[token]
+            del ranked[self._position(ranked, doc.weight, doc.tmdb_id)]
+            if not ranked:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+        for prefix in self._short_prefixes(doc.tokens):
+            ranked = self._top.get(prefix)
+            if ranked:
+                position = self._position(ranked, doc.weight, doc.tmdb_id)
+                if position < len(ranked) and ranked[position] == doc.tmdb_id:
+                    del ranked[position]
+            # A short list refills as titles are added or re-ranked; load() rebuilds them fully
+
+    def add(self, tmdb_id: int, title: str, popularity: float = 0.0, year: Optional[int] = None,
+            poster: Optional[str] = None, rated: bool = False):
+        """Index a title, or update it (a known movie keeps its year, poster and rated flag unless given)"""
+        if not title or not tmdb_id:
+            return
+        with self._lock:
+            existing = self._docs.get(tmdb_id)
+            if existing is not None:
+                popularity = popularity or existing.popularity
+                year = year or existing.year
+                poster = poster or existing.poster
+                rated = rated or existing.rated
+                if (existing.title == title and existing.popularity == popularity and existing.rated == rated
+                        and existing.year == year and existing.poster == poster):
+                    return
+                self._unlink(existing)
+                self.stats_counters["updates"] += 1
+            else:
+                self.stats_counters["inserts"] += 1
+            doc = TitleDoc.create(tmdb_id, title, year, poster, popularity or 0.0, rated)
+            self._docs[tmdb_id] = doc
+            if doc.key.strip():
+                self._link(doc)
+
+    def add_tmdb_movies(self, movies: Iterable[Dict]):
+        """Index TMDB list/search results or formatted movie details"""
+        for movie in movies:
+            if movie.get("adult"):
+                continue
+            self.add(
+                movie.get("id") or movie.get("tmdb_id"),
+                movie.get("title"),
+                movie.get("popularity") or 0.0,
+                _year(movie.get("release_date")),
+                movie.get("poster_path") or movie.get("poster_url"),
+            )
+
+    def on_tmdb_response(self, endpoint: str, data: Dict):
+        """TMDBService response listener: learn the titles in every fetched page"""
+        if isinstance(data.get("results"), list):
+            self.add_tmdb_movies(data["results"])
+        elif endpoint.startswith("movie/") and data.get("id") and data.get("title"):
+            self.add_tmdb_movies([data])
+
+    def apply_event(self, event):
+        """Rating event subscriber: a rated movie becomes suggestable and gets the rated boost"""
+        if event.rating is not None and event.movie_title:
+            self.add(event.tmdb_movie_id, event.movie_title, poster=event.movie_poster, rated=True)
+
+    def load(self, entries: Iterable[Tuple[int, str, float, Optional[int], Optional[str], bool]]):
+        """Bulk build from (tmdb_id, title, popularity, year, poster, rated) rows and swap it in
+
+        Built without holding the lock, so incremental adds and queries carry on;
+        titles added meanwhile are carried over into the new index.
+        """
+        started = time.time()
+        fresh = TitleIndex()
+        docs = fresh._docs
+        for tmdb_id, title, popularity, year, poster, rated in entries:
+            if not title or not tmdb_id:
+                continue
+            existing = docs.get(tmdb_id)
+            if existing is not None:
+                # The same movie from the catalog and from ratings
+                popularity = popularity or existing.popularity
+                year = year or existing.year
+                poster = poster or existing.poster
+                rated = rated or existing.rated
+            docs[tmdb_id] = TitleDoc.create(tmdb_id, title, year, poster, popularity or 0.0, rated)
+
+        # Visiting docs heaviest first leaves every list in weight order without sorting each
+        postings, top = fresh._postings, fresh._top
+        for doc in sorted(docs.values(), key=lambda d: (-d.weight, d.tmdb_id)):
+            for token in set(doc.tokens):
+                ranked = postings.get(token)
+                if ranked is None:
+                    ranked = postings[token] = array("q")
+                ranked.append(doc.tmdb_id)
+            for prefix in self._short_prefixes(doc.tokens):
+                ranked = top.get(prefix)
+                if ranked is None:
+                    ranked = top[prefix] = array("q")
+                if len(ranked) < TOP_K:
+                    ranked.append(doc.tmdb_id)
+        fresh._vocab = sorted(postings)
+
+        with self._lock:
+            for tmdb_id, doc in self._docs.items():
+                if tmdb_id not in docs:
+                    fresh.add(tmdb_id, doc.title, doc.popularity, doc.year, doc.poster, doc.rated)
+                elif doc.rated and not docs[tmdb_id].rated:
+                    fresh.add(tmdb_id, doc.title, rated=True)
+            self._docs, self._postings, self._vocab, self._top = fresh._docs, fresh._postings, fresh._vocab, fresh._top
+            self.built_at = time.time()
+        logger.info(f"🔤 Title index built: {len(docs)} titles, {len(fresh._vocab)} words in {time.time() - started:.1f}s")
+
+    def load_from_db(self, db):
+        """Bulk build from the catalog and the titles stored with ratings (runs in a worker thread)"""
+        from sqlalchemy import func
+
+        from app.models.movie import Movie
+        from app.models.rating import Rating
+
+        catalog = db.query(Movie.tmdb_id, Movie.title, Movie.popularity, Movie.release_date, Movie.poster_path)
+        rated = (db.query(Rating.tmdb_movie_id, func.max(Rating.movie_title), func.max(Rating.movie_poster))
+                 .filter(Rating.movie_title.isnot(None))
+                 .group_by(Rating.tmdb_movie_id))
+
+        def rows():
+            for tmdb_id, title, popularity, release_date, poster_path in catalog.yield_per(10000):
+                yield tmdb_id, title, popularity or 0.0, release_date.year if release_date else None, poster_path, False
+            for tmdb_id, title, poster in rated.yield_per(10000):
+                yield tmdb_id, title, 0.0, None, poster, True
+
+        self.load(rows())
+
+    def _resolve(self, text: str, prefix: bool) -> Optional[_Term]:
+        """Match a query word against the vocabulary, falling back to one-edit corrections"""
+        tokens = self._expand(text, prefix)
+        if tokens is None or tokens:
+            return _Term(text, prefix, (text,), tokens, False, self._count(tokens))
+        if len(text) < settings.SUGGEST_TYPO_MIN_LENGTH:
+            return None
+
+        alternatives, tokens = [], []
+        for variant in edits1(text):
+            matched = self._expand(variant, prefix)
+            if matched is None or matched:
+                alternatives.append(variant)
+                if tokens is not None:
+                    tokens = None if matched is None else tokens + matched
+        if not alternatives:
+            return None
+        if tokens is not None and len(tokens) > MAX_RANGE_TOKENS:
+            tokens = None
+        return _Term(text, prefix, tuple(alternatives), tokens, True, self._count(tokens))
+
+    def _expand(self, text: str, prefix: bool) -> Optional[List[str]]:
+        """Vocabulary words for one query word ([] for none, None for more than MAX_RANGE_TOKENS)"""
+        if not prefix:
+            return [text] if text in self._postings else []
+        lo = bisect.bisect_left(self._vocab, text)
+        hi = bisect.bisect_left(self._vocab, text + _RANGE_END, lo)
+        if hi - lo > MAX_RANGE_TOKENS:
+            return None
+        return self._vocab[lo:hi]
+
+    def _rank_key(self, tmdb_id: int) -> Tuple[float, int]:
+        return -self._docs[tmdb_id].weight, tmdb_id
+
+    def _candidates(self, term: _Term) -> Tuple[Iterable[int], bool]:
+        """tmdb ids that may match a term, and whether they come heaviest first
+
+        A word starting too many vocabulary words only gets the heaviest titles
+        of its short prefixes; candidates are checked against every term anyway.
+        """
+        if term.tokens is not None:
+            lists = [self._postings[token] for token in term.tokens]
+            if len(lists) == 1:
+                return lists[0], True
+            # Lazily, so a query that finds its matches early only pops a few; a title
+            # under two of the words comes out twice in a row
+            merged = heapq.merge(*lists, key=self._rank_key)
+            return (tmdb_id for tmdb_id, _ in itertools.groupby(merged)), True
+        lists = [self._top.get(alternative[:TOP_PREFIX_LENGTH], []) for alternative in term.alternatives]
+        if len(lists) == 1:
+            return lists[0], True
+        return itertools.chain.from_iterable(lists), False
+
+    def _count(self, tokens: Optional[List[str]]) -> int:
+        if tokens is None:
+            # Only short prefixes start that many words, and they start a good share of all titles
+            return len(self._docs) // 4
+        return sum(len(self._postings[token]) for token in tokens)
+
+    def _expected_matches(self, terms: List[_Term], driver: _Term) -> float:
+        """Matches expected in the first MAX_SCAN driver candidates, taking the words as independent"""
+        expected = float(MAX_SCAN)
+        for term in terms:
+            if term is not driver:
+                expected *= term.size / max(len(self._docs), 1)
+        return expected
+
+    def _intersect(self, terms: List[_Term]) -> Optional[Set[int]]:
+        """tmdb ids in the postings of the rarest terms, as many as fit in MAX_INTERSECT entries
+
+        None when fewer than two fit; the terms left out are checked by _scan.
+        """
+        listed = sorted((term for term in terms if term.tokens is not None), key=attrgetter("size"))
+        if len(listed) < 2 or listed[0].size + listed[1].size > MAX_INTERSECT:
+            return None
+        matching = set(itertools.chain.from_iterable(self._postings[token] for token in listed[0].tokens))
+        budget = MAX_INTERSECT - listed[0].size
+        for term in listed[1:]:
+            if term.size > budget:
+                break
+            budget -= term.size
+            matching.intersection_update(itertools.chain.from_iterable(self._postings[token] for token in term.tokens))
+        return matching
+
+    def _scan(self, candidates: Iterable[int], ordered: bool, terms: List[_Term],
+              limit: int, found: Dict[int, TitleDoc]):
+        """Collect the candidates matching every term into `found`, by tmdb id"""
+        single = [term.needles[0] for term in terms if len(term.needles) == 1]
+        multiple = [term.needles for term in terms if len(term.needles) > 1]
+        docs = self._docs
+        for tmdb_id in itertools.islice(candidates, MAX_SCAN):
+            doc = docs[tmdb_id]
+            if _has_all(doc.key, single, multiple):
+                found[tmdb_id] = doc
+                # Heaviest first: past this only the prefix bonus could lift a later title above these
+                if ordered and len(found) >= limit * 4:
+                    break
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict]:
+        """Best matching titles for a partially typed query, as dicts with a score"""
+        words = normalize_title(query)
+        if not words or limit <= 0:
+            return []
+        # The last word is still being typed unless the query ends in a separator
+        last_is_prefix = query[-1:].isalnum()
+
+        with self._lock:
+            self.stats_counters["queries"] += 1
+            terms = []
+            for i, word in enumerate(words):
+                prefix = last_is_prefix and i == len(words) - 1
+                if any(term.text == word and term.prefix == prefix for term in terms):
+                    continue
+                term = self._resolve(word, prefix)
+                if term is None:
+                    return []
+                terms.append(term)
+            typos = sum(term.typo for term in terms)
+            if typos:
+                self.stats_counters["typo_queries"] += 1
+            penalty = TYPO_PENALTY * typos
+
+            found: Dict[int, TitleDoc] = {}
+            # Merging many postings lists costs more per candidate than walking one
+            driver = min(terms, key=lambda term: term.size * (1 if term.tokens and len(term.tokens) == 1 else 4))
+            short = [term for term in terms if term.prefix and len(term.alternatives) == 1
+                     and len(term.text) <= TOP_PREFIX_LENGTH and term.text in self._top]
+            if short:
+                # The heaviest titles for the word being typed are often all that's needed
+                self._scan(self._top[short[0].text], True, terms, limit, found)
+            if len(found) < limit:
+                matching = None
+                if driver.size > limit * 4 and self._expected_matches(terms, driver) < limit * 20:
+                    # Common words that rarely meet ("home ins"): walking one postings list would check
+                    # many titles per match, intersecting them (in C) is cheaper
+                    matching = self._intersect(terms)
+                if matching is not None and len(matching) <= MAX_SCAN:
+                    self._scan(matching, False, terms, limit, found)
+                else:
+                    self._scan(*self._candidates(driver), terms, limit, found)
+
+        # Only titles within PREFIX_BONUS of the limit-th heaviest can make the cut
+        heaviest = sorted(found.values(), key=attrgetter("weight"), reverse=True)
+        cutoff = heaviest[limit - 1].weight - PREFIX_BONUS if len(heaviest) > limit else float("-inf")
+        if typos:
+            def leads(doc: TitleDoc) -> bool:
+                tokens = doc.tokens
+                return len(tokens) >= len(terms) and all(term.matches(token) for term, token in zip(terms, tokens))
+        else:
+            # The title starts with the query as typed
+            lead = " " + " ".join(words) + ("" if last_is_prefix else " ")
+
+            def leads(doc: TitleDoc) -> bool:
+                return doc.key.startswith(lead)
+        ranked = sorted(
+            ((doc.weight - penalty + (PREFIX_BONUS if leads(doc) else 0.0), doc)
+             for doc in itertools.takewhile(lambda doc: doc.weight >= cutoff, heaviest)),
+            key=lambda pair: (-pair[0], pair[1].tmdb_id)
+        )
+        return [{
+            "tmdb_id": doc.tmdb_id,
+            "title": doc.title,
+            "year": doc.year,
+            "poster": doc.poster,
+            "score": round(score, 3),
+        } for score, doc in ranked[:limit]]
+
+    def stats(self) -> Dict:
+        return {
+            "titles": len(self._docs),
+            "words": len(self._vocab),
+            "built_at": self.built_at,
+            **self.stats_counters,
+        }
+
+
+def _has_all(key: str, single: List[str], multiple: List[Tuple[str, ...]]) -> bool:
+    """Whether a TitleDoc.key contains every needle in `single` and one of each group in `multiple`"""
+    # Plain loops: this runs for thousands of candidates per query, all() over a generator is twice as slow
+    for needle in single:
+        if needle not in key:
+            return False
+    for needles in multiple:
+        for needle in needles:
+            if needle in key:
+                break
+        else:
+            return False
+    return True
+
+
+def _year(release_date) -> Optional[int]:
+    if isinstance(release_date, str) and len(release_date) >= 4 and release_date[:4].isdigit():
+        return int(release_date[:4])
+    return None
+
+
+# Create singleton instance
+title_index = TitleIndex()
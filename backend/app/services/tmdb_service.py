@@ -1,105 +1,496 @@
-import requests
+import asyncio
+import httpx
+from datetime import date, timedelta
 import os
-from typing import List, Dict, Optional
+import time
+from typing import Callable, List, Dict, Optional, Set, Tuple
 import logging
+from urllib.parse import urlencode
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.http_cache import note_source_time
+from app.core.metrics import metrics
+from app.core.profiling import record_span
+from app.schemas.movie import MovieSummary
+from app.services.cache import TieredCache
+from app.services.resilience import CircuitBreaker, CircuitOpenError, TokenBucket, backoff_delay, parse_retry_after
+from app.services.singleflight import SingleFlight
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+upstream_seconds = metrics.histogram(
+    "tmdb_request_duration_seconds", "TMDB call time by endpoint family and HTTP status (or timeout/error)",
+    ["family", "status"]
+)
+
+# TMDB movie genre ids
+GENRE_NAMES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
+    80: "Crime", 99: "Documentary", 18: "Drama", 10751: "Family",
+    14: "Fantasy", 36: "History", 27: "Horror", 10402: "Music",
+    9648: "Mystery", 10749: "Romance", 878: "Science Fiction",
+    10770: "TV Movie", 53: "Thriller", 10752: "War", 37: "Western"
+}
+
+# Precomputed genre lookup: lowercase names, common aliases and numeric ids
+GENRE_IDS_BY_NAME = {name.lower(): genre_id for genre_id, name in GENRE_NAMES.items()}
+GENRE_IDS_BY_NAME.update({"sci-fi": 878, "scifi": 878, "science-fiction": 878, "tv": 10770, "kids": 10751})
+GENRE_IDS_BY_NAME.update({str(genre_id): genre_id for genre_id in GENRE_NAMES})
+
+# Categories TMDB discover can reproduce, so genre filters are applied upstream.
+# Trending has no discover equivalent and is filtered locally.
+CATEGORY_DISCOVER_SORT = {
+    "popular": "popularity.desc",
+    "top_rated": "vote_average.desc",
+    "now_playing": "popularity.desc",
+    "upcoming": "popularity.desc",
+}
+
+# Upstream list endpoint behind each category (trending uses the daily window)
+CATEGORY_ENDPOINTS = {
+    "popular": "movie/popular",
+    "trending": "trending/movie/day",
+    "now_playing": "movie/now_playing",
+    "upcoming": "movie/upcoming",
+    "top_rated": "movie/top_rated",
+}
+
+def resolve_genre_ids(genre: str) -> List[int]:
+    """Resolve a comma-separated list of genre names/ids to TMDB genre ids
+    
+    Names are matched case-insensitively; a name that is not exact matches
+    every genre containing it (e.g. "sci" -> Science Fiction).
+    """
+    genre_ids = []
+    for term in (t.strip().lower() for t in genre.split(",")):
+        if not term:
+            continue
+        if term in GENRE_IDS_BY_NAME:
+            matches = [GENRE_IDS_BY_NAME[term]]
+        else:
+            matches = [genre_id for genre_id, name in GENRE_NAMES.items() if term in name.lower()]
+        genre_ids.extend(g for g in matches if g not in genre_ids)
+    return genre_ids
+
+def genres_match(movie_genre_ids: List[int], genre_ids: List[int], match_all: bool = False) -> bool:
+    """Check a movie's genres against a filter (any genre, or all of them)"""
+    if match_all:
+        return all(g in movie_genre_ids for g in genre_ids)
+    return any(g in movie_genre_ids for g in genre_ids)
+
 class TMDBService:
     def __init__(self):
         self.api_key = os.getenv("TMDB_API_KEY")
-        self.base_url = "https://api.themoviedb.org/3"
+        self.base_url = settings.TMDB_BASE_URL.rstrip("/")
         self.image_base_url = "https://image.tmdb.org/t/p/w500"
         
-        # Debug logging
-        print(f"🔑 TMDB_API_KEY loaded: {bool(self.api_key)}")
-        if self.api_key:
-            print(f"🔑 Key starts with: {self.api_key[:10]}...")
+        # Shared async client (keep-alive pool) and concurrency limit, created lazily
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Response cache, TTLs per endpoint family
+        self.cache = TieredCache(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            redis_url=settings.REDIS_URL if settings.CACHE_REDIS_ENABLED else None,
+            key_prefix="cinematch:tmdb:",
+            stale_ttl=settings.CACHE_STALE_TTL
+        )
+        self.cache_ttls = {
+            "list": settings.CACHE_TTL_LIST,
+            "details": settings.CACHE_TTL_DETAILS,
+            "credits": settings.CACHE_TTL_CREDITS,
+            "search": settings.CACHE_TTL_SEARCH,
+        }
+        
+        # Concurrent identical requests share one upstream call
+        self._inflight = SingleFlight()
+        
+        # Stay under the TMDB quota, and stop calling TMDB while it is failing
+        self.rate_limiter = TokenBucket(settings.TMDB_RATE_LIMIT, settings.TMDB_RATE_BURST)
+        self.breaker = CircuitBreaker(settings.TMDB_BREAKER_THRESHOLD, settings.TMDB_BREAKER_RESET, name="TMDB")
+        self.upstream_counters: Dict[str, int] = {"requests": 0, "retries": 0, "failures": 0, "stale_served": 0}
+        
+        # Called with (endpoint, data) for every successful fetch, e.g. to index the titles seen
+        self.response_listeners: List[Callable[[str, Dict], None]] = []
+        
+        # Keys kept warm by the prefetcher, and how often requests found them cached
+        self.hot_keys: Set[str] = set()
+        self.hot_counters: Dict[str, int] = {"hits": 0, "misses": 0}
         
         if not self.api_key:
             logger.warning("TMDB_API_KEY not found. Using sample data.")
     
-    def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
-        """Make request to TMDB API"""
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared async HTTP client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.TMDB_TIMEOUT, connect=settings.TMDB_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.TMDB_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.TMDB_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                http2=settings.TMDB_HTTP2 and _h2_available()
+            )
+            self._semaphore = asyncio.Semaphore(settings.TMDB_MAX_CONCURRENCY)
+        return self._client
+    
+    async def aclose(self):
+        """Close the HTTP client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.cache.close()
+    
+    async def _fetch(self, endpoint: str, params: Dict) -> Dict:
+        """Fetch from TMDB within the rate limit, retrying 429s, 5xx and connection errors
+        
+        Timeouts are not retried: a hung upstream would hold callers for several timeouts.
+        Raises CircuitOpenError without calling TMDB while the breaker is open,
+        and httpx.HTTPError once the retries are used up.
+        """
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    # Checked here so callers queued while TMDB went down fail fast too
+                    self.breaker.before_call()
+                    await self.rate_limiter.acquire()
+                    self.upstream_counters["requests"] += 1
+                    response = await self._get(client, endpoint, params)
+                response.raise_for_status()
+                self.breaker.record_success()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                if status_code != 429 and status_code < 500:
+                    # A 404 or 401 is about this request, TMDB itself is fine
+                    self.breaker.record_success()
+                    raise
+                error, retry_after = e, parse_retry_after(e.response.headers.get("Retry-After"))
+            except httpx.TimeoutException:
+                self.upstream_counters["failures"] += 1
+                self.breaker.record_failure()
+                raise
+            except httpx.TransportError as e:
+                error, retry_after = e, None
+            
+            delay = backoff_delay(attempt, settings.TMDB_RETRY_BACKOFF, settings.TMDB_RETRY_MAX_DELAY, retry_after)
+            if attempt >= settings.TMDB_MAX_RETRIES or delay > settings.TMDB_RETRY_MAX_DELAY:
+                break
+            attempt += 1
+            self.upstream_counters["retries"] += 1
+            await asyncio.sleep(delay)
+        
+        self.upstream_counters["failures"] += 1
+        self.breaker.record_failure()
+        raise error
+    
+    async def _get(self, client: httpx.AsyncClient, endpoint: str, params: Dict) -> httpx.Response:
+        """One upstream call, timed into tmdb_request_duration_seconds and the request's profile"""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await client.get(f"/{endpoint}", params={**params, "api_key": self.api_key})
+            status = str(response.status_code)
+            return response
+        except httpx.TimeoutException:
+            status = "timeout"
+            raise
+        finally:
+            finished = time.perf_counter()
+            upstream_seconds.observe(finished - started, endpoint_family(endpoint), status)
+            record_span("tmdb", f"{endpoint} {status}", started, finished)
+    
+    async def _make_request(self, endpoint: str, params: Dict = None,
+                            transform: Optional[Callable[[Dict], Dict]] = None, raise_errors: bool = False) -> Dict:
+        """Make request to TMDB API (cached). Results are shared, treat them as read-only
+        
+        `transform` is applied to a successful response before it is cached; with
+        `raise_errors` a failure with no stale copy re-raises instead of giving an empty page.
+        """
         if not self.api_key:
             return {"results": [], "total_pages": 0, "total_results": 0}
             
-        if params is None:
-            params = {}
+        params = params or {}
+        cache_key = response_cache_key(endpoint, params)
+        if settings.CACHE_ENABLED:
+            cached = await self.cache.get_entry(cache_key)
+            if cache_key in self.hot_keys:
+                self.hot_counters["hits" if cached is not None else "misses"] += 1
+            if cached is not None:
+                # Fetched one TTL before it expires (for Last-Modified)
+                note_source_time(cached.expires_at - self.cache_ttls[endpoint_family(endpoint)])
+                return cached.value
         
-        params['api_key'] = self.api_key
-        url = f"{self.base_url}/{endpoint}"
+        return await self._fetch_or_stale(endpoint, params, cache_key, transform, raise_errors)
+    
+    async def _fetch_or_stale(self, endpoint: str, params: Dict, cache_key: str,
+                              transform: Optional[Callable[[Dict], Dict]] = None, raise_errors: bool = False) -> Dict:
+        """Fetch a response that is not cached, falling back to the expired copy on failure
         
+        Without a copy, failures give an empty page, or re-raise the error with `raise_errors`.
+        """
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"TMDB API request failed: {e}")
-            return {"results": [], "total_pages": 0, "total_results": 0}
+            data = await self._inflight.do(
+                cache_key, lambda: self._fetch_and_cache(endpoint, params, cache_key, transform)
+            )
+            note_source_time(time.time())
+            return data
+        except CircuitOpenError as e:
+            # Already logged when the breaker opened
+            logger.debug(f"TMDB API request skipped: {endpoint}: {e}")
+            error = e
+        except httpx.HTTPStatusError as e:
+            logger.error(f"TMDB API request failed: {endpoint} returned {e.response.status_code}")
+            error = e
+        except httpx.HTTPError as e:
+            logger.error(f"TMDB API request failed: {endpoint}: {e!r}")
+            error = e
+        
+        # Serve the expired copy, if there is one, rather than an empty page
+        if settings.CACHE_ENABLED:
+            stale = await self.cache.get_stale(cache_key)
+            if stale is not None:
+                self.upstream_counters["stale_served"] += 1
+                return stale
+        if raise_errors:
+            raise error
+        return {"results": [], "total_pages": 0, "total_results": 0}
+    
+    async def _fetch_and_cache(self, endpoint: str, params: Dict, cache_key: str,
+                               transform: Optional[Callable[[Dict], Dict]] = None) -> Dict:
+        """Fetch from TMDB and cache the response (failures are not cached)"""
+        data = await self._fetch(endpoint, params)
+        if transform is not None:
+            data = transform(data)
+        if settings.CACHE_ENABLED:
+            await self.cache.set(cache_key, data, self.cache_ttls[endpoint_family(endpoint)])
+        for listener in self.response_listeners:
+            try:
+                listener(endpoint, data)
+            except Exception as e:
+                logger.error(f"TMDB response listener failed for {endpoint}: {e}")
+        return data
+    
+    async def refresh(self, endpoint: str, params: Dict) -> Dict:
+        """Fetch and re-cache a response whether or not it is cached
+        
+        Raises httpx.HTTPError on failure, or CircuitOpenError while TMDB is considered down.
+        """
+        cache_key = response_cache_key(endpoint, params)
+        return await self._inflight.do(cache_key, lambda: self._fetch_and_cache(endpoint, params, cache_key))
+    
+    def upstream_stats(self) -> Dict:
+        """Rate limiter, circuit breaker and retry counters"""
+        return {
+            **self.upstream_counters,
+            "rate_limiter": self.rate_limiter.stats(),
+            "breaker": self.breaker.stats(),
+        }
     
-    def get_popular_movies(self, page: int = 1) -> Dict:
+    async def get_popular_movies(self, page: int = 1) -> Dict:
         """Get popular movies"""
-        return self._make_request("movie/popular", {"page": page})
+        return await self._make_request("movie/popular", {"page": page})
     
-    def get_trending_movies(self, time_window: str = "day", page: int = 1) -> Dict:
+    async def get_trending_movies(self, time_window: str = "day", page: int = 1) -> Dict:
         """Get trending movies (day/week)"""
-        return self._make_request(f"trending/movie/{time_window}", {"page": page})
+        return await self._make_request(f"trending/movie/{time_window}", {"page": page})
     
-    def get_now_playing_movies(self, page: int = 1) -> Dict:
+    async def get_now_playing_movies(self, page: int = 1) -> Dict:
         """Get now playing movies"""
-        return self._make_request("movie/now_playing", {"page": page})
+        return await self._make_request("movie/now_playing", {"page": page})
     
-    def get_upcoming_movies(self, page: int = 1) -> Dict:
+    async def get_upcoming_movies(self, page: int = 1) -> Dict:
         """Get upcoming movies"""
-        return self._make_request("movie/upcoming", {"page": page})
+        return await self._make_request("movie/upcoming", {"page": page})
     
-    def get_top_rated_movies(self, page: int = 1) -> Dict:
+    async def get_top_rated_movies(self, page: int = 1) -> Dict:
         """Get top rated movies"""
-        return self._make_request("movie/top_rated", {"page": page})
+        return await self._make_request("movie/top_rated", {"page": page})
     
-    def search_movies(self, query: str, page: int = 1) -> Dict:
+    async def get_category_movies(self, category: str, page: int = 1,
+                                  genre_ids: Optional[List[int]] = None, match_all: bool = False) -> Dict:
+        """Get a category page, pushing a genre filter down to discover/movie where possible"""
+        if genre_ids and category in CATEGORY_DISCOVER_SORT:
+            # TMDB: comma = AND, pipe = OR
+            filters = {
+                "sort_by": CATEGORY_DISCOVER_SORT[category],
+                "with_genres": ("," if match_all else "|").join(str(g) for g in genre_ids),
+            }
+            today = date.today()
+            if category == "top_rated":
+                filters["vote_count.gte"] = settings.CATALOG_TOP_RATED_MIN_VOTES
+            elif category == "now_playing":
+                filters["primary_release_date.gte"] = (today - timedelta(days=settings.CATALOG_NOW_PLAYING_DAYS)).isoformat()
+                filters["primary_release_date.lte"] = today.isoformat()
+            elif category == "upcoming":
+                filters["primary_release_date.gte"] = (today + timedelta(days=1)).isoformat()
+            return await self.discover_movies(page, **filters)
+        
+        if category == "trending":
+            return await self.get_trending_movies("day", page)
+        elif category == "now_playing":
+            return await self.get_now_playing_movies(page)
+        elif category == "upcoming":
+            return await self.get_upcoming_movies(page)
+        elif category == "top_rated":
+            return await self.get_top_rated_movies(page)
+        return await self.get_popular_movies(page)
+    
+    async def search_movies(self, query: str, page: int = 1) -> Dict:
         """Search movies by title"""
-        return self._make_request("search/movie", {"query": query, "page": page})
+        return await self._make_request("search/movie", {"query": query, "page": page})
     
-    def get_movies_by_genre(self, genre_id: int, page: int = 1) -> Dict:
+    async def get_movies_by_genre(self, genre_id: int, page: int = 1) -> Dict:
         """Get movies by genre ID"""
-        return self._make_request("discover/movie", {
-            "with_genres": genre_id,
-            "page": page,
-            "sort_by": "popularity.desc"
-        })
+        return await self.discover_movies(page, with_genres=genre_id, sort_by="popularity.desc")
+    
+    async def discover_movies(self, page: int = 1, **filters) -> Dict:
+        """Discover movies with TMDB filters (sort_by, with_genres, ...)"""
+        return await self._make_request("discover/movie", {**filters, "page": page})
     
-    def get_movie_details(self, movie_id: int) -> Dict:
+    async def get_movie_details(self, movie_id: int, raise_errors: bool = False) -> Dict:
         """Get detailed movie information"""
-        return self._make_request(f"movie/{movie_id}")
+        return await self._make_request(f"movie/{movie_id}", raise_errors=raise_errors)
     
-    def get_movie_credits(self, movie_id: int) -> Dict:
+    async def get_movie_credits(self, movie_id: int) -> Dict:
         """Get movie cast and crew"""
-        return self._make_request(f"movie/{movie_id}/credits")
+        return await self._make_request(f"movie/{movie_id}/credits")
     
-    def format_movie_data(self, tmdb_movie: Dict) -> Dict:
-        """Convert TMDB movie data to our format"""
+    async def get_movie_with_credits(self, movie_id: int, raise_errors: bool = False) -> Dict:
+        """Get movie details merged with credits, slimmed to the fields the detail page serves
+        
+        In "append" mode this is one upstream request (append_to_response=credits);
+        in "parallel" mode details and credits are fetched concurrently. With
+        `raise_errors` a failed details request raises instead of giving an empty dict.
+        """
+        if settings.TMDB_DETAILS_MODE == "parallel":
+            movie_data, credits_data = await asyncio.gather(
+                self.get_movie_details(movie_id, raise_errors), self.get_movie_credits(movie_id)
+            )
+            if not movie_data.get("id"):
+                return movie_data
+            return self.format_movie_details({**movie_data, "credits": credits_data})
+        
+        return await self._make_request(
+            f"movie/{movie_id}", {"append_to_response": "credits"}, transform=self.format_movie_details,
+            raise_errors=raise_errors
+        )
+    
+    async def get_movies_with_credits(self, movie_ids: List[int], concurrency: Optional[int] = None,
+                                      store: bool = True) -> Tuple[Dict[int, Dict], Dict[int, str]]:
+        """Movie details with credits for many movies: (movies by id, error code by id)
+        
+        Cached movies are looked up together (one Redis MGET); the rest are fetched
+        with at most `concurrency` upstream requests in flight for this batch, and
+        cached unless `store` is False (background jobs, which would evict hot entries).
+        Error codes: "not_found", "unavailable" (TMDB down or not configured) and "upstream_error".
+        In "parallel" details mode each movie goes through get_movie_with_credits instead.
+        """
+        concurrency = concurrency or settings.TMDB_BATCH_CONCURRENCY
+        movies: Dict[int, Dict] = {}
+        errors: Dict[int, str] = {}
+        if not self.api_key:
+            return movies, {movie_id: "unavailable" for movie_id in movie_ids}
+        parallel = settings.TMDB_DETAILS_MODE == "parallel"
+        params = {"append_to_response": "credits"}
+        keys = {movie_id: response_cache_key(f"movie/{movie_id}", params) for movie_id in movie_ids}
+        
+        if settings.CACHE_ENABLED and not parallel:
+            cached = await self.cache.get_entries(list(keys.values()))
+            for movie_id, key in keys.items():
+                entry = cached.get(key)
+                if entry is not None:
+                    note_source_time(entry.expires_at - self.cache_ttls["details"])
+                    movies[movie_id] = entry.value
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(movie_id: int):
+            async with semaphore:
+                try:
+                    if parallel:
+                        movie = await self.get_movie_with_credits(movie_id, raise_errors=True)
+                        if not movie.get("id"):
+                            errors[movie_id] = "upstream_error"
+                            return
+                    elif store:
+                        movie = await self._fetch_or_stale(
+                            f"movie/{movie_id}", params, keys[movie_id], self.format_movie_details, raise_errors=True
+                        )
+                    else:
+                        movie = self.format_movie_details(await self._fetch(f"movie/{movie_id}", params))
+                    movies[movie_id] = movie
+                except CircuitOpenError:
+                    errors[movie_id] = "unavailable"
+                except httpx.HTTPStatusError as e:
+                    errors[movie_id] = "not_found" if e.response.status_code == 404 else "upstream_error"
+                except httpx.HTTPError:
+                    errors[movie_id] = "upstream_error"
+                except Exception as e:
+                    logger.error(f"Error fetching movie {movie_id} for a batch: {e}")
+                    errors[movie_id] = "upstream_error"
+        
+        await asyncio.gather(*(fetch(movie_id) for movie_id in movie_ids if movie_id not in movies))
+        return movies, errors
+    
+    def format_movie_details(self, movie_data: Dict) -> Dict:
+        """Convert TMDB movie details (with appended credits) to our detail format"""
+        credits_data = movie_data.get("credits") or {}
+        
+        # Find director
+        crew = credits_data.get("crew", [])
+        director = next((person["name"] for person in crew if person.get("job") == "Director"), "Unknown")
+        
         return {
-            "tmdb_id": tmdb_movie.get("id"),
-            "title": tmdb_movie.get("title", "Unknown Title"),
-            "overview": tmdb_movie.get("overview", "No overview available"),
-            "genre": self._get_primary_genre(tmdb_movie.get("genre_ids", [])),
-            "release_date": tmdb_movie.get("release_date"),
-            "poster_url": self._get_full_image_url(tmdb_movie.get("poster_path")),
-            "backdrop_url": self._get_full_image_url(tmdb_movie.get("backdrop_path")),
-            "average_rating": round(tmdb_movie.get("vote_average", 0), 1),
-            "rating_count": tmdb_movie.get("vote_count", 0),
-            "popularity": tmdb_movie.get("popularity", 0),
-            "adult": tmdb_movie.get("adult", False),
-            "original_language": tmdb_movie.get("original_language"),
-            "original_title": tmdb_movie.get("original_title")
+            "id": movie_data["id"],
+            "title": movie_data["title"],
+            "overview": movie_data["overview"],
+            "genres": [g["name"] for g in movie_data.get("genres", [])],
+            "release_date": movie_data.get("release_date"),
+            "runtime": movie_data.get("runtime"),
+            "poster_url": self._get_full_image_url(movie_data.get("poster_path")),
+            "backdrop_url": self._get_full_image_url(movie_data.get("backdrop_path")),
+            "vote_average": movie_data.get("vote_average"),
+            "vote_count": movie_data.get("vote_count"),
+            "popularity": movie_data.get("popularity"),
+            "director": director,
+            "cast": [person["name"] for person in credits_data.get("cast", [])[:5]],  # Top 5 cast
+            "production_companies": [c["name"] for c in movie_data.get("production_companies", [])[:3]],
+            "budget": movie_data.get("budget"),
+            "revenue": movie_data.get("revenue"),
+            "status": movie_data.get("status"),
+            "tagline": movie_data.get("tagline")
         }
     
+    def movie_summary(self, tmdb_movie: Dict) -> MovieSummary:
+        """Convert TMDB movie data to our list item format"""
+        return MovieSummary(
+            tmdb_movie.get("id"),
+            tmdb_movie.get("title", "Unknown Title"),
+            tmdb_movie.get("overview", "No overview available"),
+            self._get_primary_genre(tmdb_movie.get("genre_ids", [])),
+            tmdb_movie.get("genre_ids", []),
+            tmdb_movie.get("release_date"),
+            self._get_full_image_url(tmdb_movie.get("poster_path")),
+            self._get_full_image_url(tmdb_movie.get("backdrop_path")),
+            round(tmdb_movie.get("vote_average", 0), 1),
+            tmdb_movie.get("vote_count", 0),
+            tmdb_movie.get("popularity", 0),
+            tmdb_movie.get("adult", False),
+            tmdb_movie.get("original_language"),
+            tmdb_movie.get("original_title"),
+        )
+    
+    def format_movie_data(self, tmdb_movie: Dict) -> Dict:
+        """Convert TMDB movie data to our format, as a dict"""
+        return self.movie_summary(tmdb_movie).to_dict()
+    
     def _get_full_image_url(self, image_path: str) -> Optional[str]:
         """Get full image URL"""
         if not image_path:
@@ -108,18 +499,33 @@ class TMDBService:
     
     def _get_primary_genre(self, genre_ids: List[int]) -> str:
         """Get primary genre name from genre IDs"""
-        genre_map = {
-            28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy",
-            80: "Crime", 99: "Documentary", 18: "Drama", 10751: "Family",
-            14: "Fantasy", 36: "History", 27: "Horror", 10402: "Music",
-            9648: "Mystery", 10749: "Romance", 878: "Science Fiction",
-            10770: "TV Movie", 53: "Thriller", 10752: "War", 37: "Western"
-        }
-        
         if not genre_ids:
             return "Unknown"
         
-        return genre_map.get(genre_ids[0], "Unknown")
+        return GENRE_NAMES.get(genre_ids[0], "Unknown")
+
+def endpoint_family(endpoint: str) -> str:
+    """Classify a TMDB endpoint as list, details, credits or search (for cache TTLs)"""
+    if endpoint.startswith("search/"):
+        return "search"
+    if endpoint.endswith("/credits"):
+        return "credits"
+    parts = endpoint.split("/")
+    if parts[0] == "movie" and len(parts) == 2 and parts[1].isdigit():
+        return "details"
+    return "list"
+
+def response_cache_key(endpoint: str, params: Dict) -> str:
+    """Stable cache key for an endpoint and its params (never includes the API key)"""
+    return f"{endpoint}?{urlencode(sorted(params.items()))}"
+
+def _h2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
 
 # Create singleton instance
 tmdb_service = TMDBService()
\ No newline at end of file
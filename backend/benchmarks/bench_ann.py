@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the similar-movies ANN index: recall@k and latency against exact search.
+
+Movies get synthetic genres and overviews drawn from a handful of topics, and
+Zipf-distributed ratings, then go through the same embedding pipeline as
+build_similar_index.py.
+
+    python benchmarks/bench_ann.py --movies 100000 --ratings 500000
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from bench_recommender import synthetic_ratings
+from common import percentile
+
+TOPICS = [
+    "space alien planet ship crew galaxy war",
+    "love wedding romance heart paris summer",
+    "murder detective police crime city secret",
+    "ghost house haunted night terror curse",
+    "family dog kids school adventure holiday",
+    "king kingdom sword dragon magic quest",
+    "band music singer tour dream stage",
+    "soldier battle army mission escape enemy",
+]
+
+
+def synthetic_movies(count: int, seed: int = 3):
+    from app.services.tmdb_service import GENRE_NAMES
+
+    rng = np.random.default_rng(seed)
+    genre_ids = sorted(GENRE_NAMES)
+    movies = []
+    for tmdb_id in range(1, count + 1):
+        topic = TOPICS[rng.integers(len(TOPICS))].split()
+        words = rng.choice(topic, size=12).tolist() + [f"word{w}" for w in rng.integers(0, 5000, size=6)]
+        movies.append({
+            "tmdb_id": tmdb_id,
+            "title": f"Movie {tmdb_id}",
+            "overview": " ".join(words),
+            "genre_ids": rng.choice(genre_ids, size=rng.integers(1, 4), replace=False).tolist(),
+        })
+    return movies
+
+
+def main(movies_count: int, users: int, ratings_count: int, queries: int, k: int):
+    import scipy.sparse as sp
+
+    from app.services.ann_index import IVFIndex
+    from app.services.embeddings import build_movie_embeddings
+
+    user_ids, item_ids, ratings = synthetic_ratings(users, movies_count, ratings_count)
+    items, item_cols = np.unique(item_ids, return_inverse=True)
+    item_user = sp.csr_matrix((ratings, (item_cols, user_ids - 1)), shape=(len(items), users))
+
+    started = time.perf_counter()
+    tmdb_ids, vectors = build_movie_embeddings(synthetic_movies(movies_count), items, item_user)
+    print(f"embed: {len(tmdb_ids)} movies x {vectors.shape[1]} dims in {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    index = IVFIndex().build(tmdb_ids, vectors)
+    print(f"build: {len(index.centroids)} lists in {time.perf_counter() - started:.1f} s")
+
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path)
+        index = IVFIndex()
+        started = time.perf_counter()
+        index.load(path, mmap=True)
+        print(f"mmap load: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        query_ids = np.random.default_rng(5).choice(tmdb_ids, size=queries, replace=False)
+        query_vectors = np.stack([index.vector(int(m)) for m in query_ids])
+
+        latencies = []
+        truth = []
+        for vector in query_vectors:
+            t = time.perf_counter()
+            ids, _ = index.exact_search(vector, k)
+            latencies.append(time.perf_counter() - t)
+            truth.append(set(ids[0].tolist()))
+        print(f"\nexact          recall@{k} 1.000   p50 {percentile(latencies, 50) * 1000:6.2f} ms   "
+              f"p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+
+        for nprobe in (1, 2, 4, 8, 16, 32):
+            latencies = []
+            hits = 0
+            for vector, expected in zip(query_vectors, truth):
+                t = time.perf_counter()
+                ids, _ = index.search(vector, k, nprobe)
+                latencies.append(time.perf_counter() - t)
+                hits += len(expected & set(ids[0].tolist()))
+            started = time.perf_counter()
+            index.search(query_vectors, k, nprobe)
+            batch_ms = (time.perf_counter() - started) * 1000 / queries
+            print(f"ivf nprobe={nprobe:<3} recall@{k} {hits / (k * queries):.3f}   "
+                  f"p50 {percentile(latencies, 50) * 1000:6.2f} ms   p99 {percentile(latencies, 99) * 1000:6.2f} ms   "
+                  f"batched {batch_ms:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+    main(args.movies, args.users, args.ratings, args.queries, args.k)
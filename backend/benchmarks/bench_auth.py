@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Load test authenticated endpoints with and without the auth cache.
+
+Starts the backend under uvicorn twice (AUTH_CACHE_ENABLED=false, then true),
+logs in a handful of users and hammers GET /auth/me (auth only) and
+GET /ratings/my-ratings (auth + a small read) with concurrent clients.
+Then times the get_current_user dependency alone, in-process, which is what
+the cache removes from every authenticated request.
+
+    python benchmarks/bench_auth.py --requests 5000 --concurrency 32
+"""
+import argparse
+import asyncio
+
+import httpx
+
+from bench_tmdb_client import run_callers
+from common import auth_headers, report, run_api
+
+
+async def load(base_url: str, path: str, users, total: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def fetch(i: int):
+            response = await client.get(path, headers=users[i % len(users)])
+            response.raise_for_status()
+        return await run_callers(fetch, total, concurrency)
+
+
+def main(total: int, concurrency: int, user_count: int):
+    for enabled in ("false", "true"):
+        with run_api(env={"AUTH_CACHE_ENABLED": enabled}) as (base_url, _):
+            users = [auth_headers(base_url, f"bench{i}") for i in range(user_count)]
+            for path in ("/api/v1/auth/me", "/api/v1/ratings/my-ratings?limit=20"):
+                asyncio.run(load(base_url, path, users, concurrency * 5, concurrency))  # Warm up
+                latencies, elapsed = asyncio.run(load(base_url, path, users, total, concurrency))
+                report(f"cache={enabled:<5} {path.split('?')[0].split('/')[-1]}", latencies, elapsed)
+    dependency_cost(user_count)
+
+
+def dependency_cost(user_count: int, calls: int = 20000):
+    """Mean time of the get_current_user dependency per call, with and without the cache"""
+    import os
+    import tempfile
+    import time
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'auth_bench.db')}"
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.api.deps import get_current_user
+    from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+    from app.core.security import create_access_token
+    from app.database.init_db import init_database
+    from app.models.user import User
+    from app.services.auth_cache import auth_cache
+
+    init_database()
+    db = SessionLocal()
+    db.add_all([User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password="x")
+                for i in range(user_count)])
+    db.commit()
+    tokens = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": f"bench{i}"}))
+              for i in range(user_count)]
+    db.close()
+
+    async def run(async_db):
+        started = time.perf_counter()
+        for i in range(calls):
+            await get_current_user(tokens[i % user_count], async_db)
+        return (time.perf_counter() - started) / calls
+
+    async def compare():
+        async with AsyncSessionLocal() as async_db:
+            for enabled in (False, True):
+                auth_cache.enabled = enabled
+                await run(async_db)  # Warm up
+                print(f"get_current_user, cache={str(enabled).lower():<5} {await run(async_db) * 1e6:8.1f} us/call")
+        await async_engine.dispose()
+
+    asyncio.run(compare())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=10)
+    args = parser.parse_args()
+    main(args.requests, args.concurrency, args.users)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local movie catalog: sync from a fake TMDB source, then list pages.
+
+Uses a throwaway SQLite database and an in-process fake data source, so no
+network or TMDB key is needed.
+
+    python benchmarks/bench_catalog.py --movies 100000 --pages 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "catalog_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from common import percentile  # noqa: E402  (sets up sys.path)
+
+GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 53, 10752, 37]
+
+
+class FakeTMDBSource:
+    """In-process stand-in for TMDBService's list methods"""
+
+    def __init__(self, movie_count: int, page_size: int = 20):
+        self.movie_count = movie_count
+        self.page_size = page_size
+        self.total_pages = movie_count // page_size
+
+    def _movie(self, movie_id: int) -> dict:
+        rng = random.Random(movie_id)
+        return {
+            "id": movie_id,
+            "title": f"Fake Movie {movie_id}",
+            "overview": "An overview.",
+            "genre_ids": rng.sample(GENRE_IDS, rng.randint(1, 3)),
+            "release_date": f"{rng.randint(1960, 2027)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "poster_path": f"/p{movie_id}.jpg",
+            "backdrop_path": None,
+            "popularity": rng.uniform(0, 1000),
+            "vote_average": round(rng.uniform(1, 10), 1),
+            "vote_count": rng.randint(0, 30000),
+            "adult": False,
+            "original_language": "en",
+        }
+
+    async def _page(self, page: int) -> dict:
+        start = (page - 1) * self.page_size + 1
+        results = [self._movie(i) for i in range(start, min(start + self.page_size, self.movie_count + 1))]
+        return {"page": page, "results": results, "total_pages": self.total_pages,
+                "total_results": self.movie_count}
+
+    async def get_popular_movies(self, page=1): return await self._page(page)
+    async def get_trending_movies(self, time_window="day", page=1): return await self._page(page)
+    async def get_now_playing_movies(self, page=1): return await self._page(page)
+    async def get_upcoming_movies(self, page=1): return await self._page(page)
+    async def get_top_rated_movies(self, page=1): return await self._page(page)
+    async def discover_movies(self, page=1, **filters): return await self._page(page)
+
+
+async def main(movie_count: int, pages: int):
+    from app.core.database import SessionLocal, engine
+    from app.database.init_db import init_database
+    from app.services.catalog_service import CatalogSync, list_movies
+
+    init_database()
+    source = FakeTMDBSource(movie_count)
+    sync = CatalogSync(source=source, pages_per_category=1, discover_pages=source.total_pages)
+
+    started = time.perf_counter()
+    await sync.sync_once()
+    print(f"synced {movie_count} movies in {time.perf_counter() - started:.1f} s")
+
+    db = SessionLocal()
+    for category, genre_id in [("popular", None), ("top_rated", None), ("popular", [27])]:
+        latencies, cursor = [], None
+        for _ in range(pages):
+            t = time.perf_counter()
+            result = list_movies(db, category, genre_id, cursor=cursor)
+            latencies.append(time.perf_counter() - t)
+            cursor = result["next_cursor"]
+            if cursor is None:
+                break
+        label = f"{category}" + (f" genre={genre_id[0]}" if genre_id else "")
+        print(f"{label:<22} {len(latencies):>4} pages   p50 {percentile(latencies, 50) * 1000:6.2f} ms   "
+              f"p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+    db.close()
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--pages", type=int, default=200, help="keyset pages to walk per category")
+    args = parser.parse_args()
+    asyncio.run(main(args.movies, args.pages))
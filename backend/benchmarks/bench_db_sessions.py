@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Sync vs async database sessions, side by side in one server.
+
+Serves the real (async session) rating routes next to sync copies of them that
+use SessionLocal in the threadpool, as all routes did before, and load tests:
+
+  * GET  my-ratings?limit=20  - keyset page read
+  * POST ratings              - single-rating upsert
+
+    python benchmarks/bench_db_sessions.py --requests 3000 --concurrency 32
+
+The same module is the uvicorn app (`bench_db_sessions:app`).
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime
+from typing import List
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from bench_tmdb_client import run_callers
+from common import BENCH_DIR, auth_headers, report, run_api
+
+from app.api.deps import get_current_user
+from app.api.v1.ratings import MY_RATINGS_COLUMNS, RATING_UPSERT
+from app.core.database import get_db
+from app.main import app
+from app.models.rating import Rating
+from app.schemas.rating import RatingCreate, RatingResponse
+
+
+@app.get("/bench/sync/my-ratings", response_model=List[RatingResponse])
+def sync_my_ratings(limit: int = 20, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+    rows = (db.query(*MY_RATINGS_COLUMNS).filter(Rating.user_id == current_user.id)
+            .order_by(Rating.created_at.desc(), Rating.id.desc()).limit(limit).all())
+    return [row._asdict() for row in rows]
+
+
+@app.post("/bench/sync/ratings", response_model=RatingResponse)
+def sync_create_rating(rating: RatingCreate, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+    saved = db.execute(RATING_UPSERT, {**rating.model_dump(), "user_id": current_user.id,
+                                       "now": datetime.utcnow()}).mappings().one()
+    db.commit()
+    return saved
+
+
+async def load(base_url: str, method: str, path: str, users, total: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def call(i: int):
+            if method == "GET":
+                response = await client.get(path, headers=users[i % len(users)])
+            else:
+                response = await client.post(path, headers=users[i % len(users)],
+                                             json={"tmdb_movie_id": i, "rating": 4.0, "movie_title": "Bench"})
+            response.raise_for_status()
+        return await run_callers(call, total, concurrency)
+
+
+def main(total: int, concurrency: int, user_count: int):
+    env = {"PYTHONPATH": BENCH_DIR, "BCRYPT_ROUNDS": "4"}
+    with run_api(env=env, app="bench_db_sessions:app") as (base_url, _):
+        users = [auth_headers(base_url, f"bench{i}") for i in range(user_count)]
+        for method, name, sync_path, async_path in (
+            ("GET", "my-ratings", "/bench/sync/my-ratings?limit=20", "/api/v1/ratings/my-ratings?limit=20"),
+            ("POST", "rate", "/bench/sync/ratings", "/api/v1/ratings/"),
+        ):
+            for mode, path in (("sync", sync_path), ("async", async_path)):
+                asyncio.run(load(base_url, method, path, users, concurrency * 5, concurrency))  # Warm up
+                latencies, elapsed = asyncio.run(load(base_url, method, path, users, total, concurrency))
+                report(f"{mode:<5} {name}", latencies, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=8)
+    args = parser.parse_args()
+    main(args.requests, args.concurrency, args.users)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark genre filtering: upstream TMDB calls per delivered movie.
+
+Compares the old approach (fetch one category page, keep movies whose
+*primary* genre matches, let the client page until the grid is full) with
+discover/movie pushdown and with the local-filter fill mode used for trending.
+
+    python benchmarks/bench_genre_filter.py --genre Horror --want 20
+"""
+import argparse
+import os
+
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["CATALOG_ENABLED"] = "false"
+
+from common import run_stub, stub_request_count
+
+
+def main(genre: str, want: int, latency_ms: float):
+    with run_stub(latency_ms=latency_ms) as base_url:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services.tmdb_service import tmdb_service, resolve_genre_ids
+
+        with TestClient(app) as client:
+            def measure(label, collect):
+                before = stub_request_count(base_url)
+                delivered = collect()
+                calls = stub_request_count(base_url) - before
+                print(f"{label:<34} {delivered:>4} movies  {calls:>4} upstream calls  "
+                      f"{calls / max(delivered, 1):.2f} calls/movie")
+
+            def old_client_paging():
+                # Old endpoint behaviour: primary-genre post-filter, one TMDB page per request
+                delivered, page = 0, 1
+                while delivered < want and page <= 50:
+                    items = client.get("/api/v1/movies/", params={"category": "popular", "page": page}).json()["items"]
+                    delivered += sum(1 for m in items if genre.lower() in m["genre"].lower())
+                    page += 1
+                return delivered
+
+            def pushdown():
+                data = client.get("/api/v1/movies/", params={
+                    "category": "popular", "genre": genre, "min_results": want}).json()
+                return len(data["items"])
+
+            def trending_fill():
+                data = client.get("/api/v1/movies/", params={
+                    "category": "trending", "genre": genre, "min_results": want}).json()
+                return len(data["items"])
+
+            print(f"genre={genre} -> ids {resolve_genre_ids(genre)}, want {want} movies")
+            measure("old: primary-genre post-filter", old_client_paging)
+            measure("new: discover pushdown", pushdown)
+            measure("new: trending + concurrent fill", trending_fill)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--genre", default="Horror")
+    parser.add_argument("--want", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    main(args.genre, args.want, args.latency_ms)
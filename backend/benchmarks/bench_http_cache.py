@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark frontend-style re-polling of movie pages with and without ETag revalidation.
+
+Starts the backend against the TMDB stub and polls category pages and movie
+detail pages with concurrent clients: once downloading full bodies every time,
+once sending If-None-Match with the ETag from the previous response (what a
+browser does for a stale cached response). Reports throughput, latency and
+bytes on the wire.
+
+    python benchmarks/bench_http_cache.py --requests 3000 --concurrency 32
+"""
+import argparse
+import asyncio
+
+import httpx
+
+from bench_tmdb_client import run_callers
+from common import report, run_api, run_stub
+
+CATEGORIES = ("popular", "trending", "now_playing", "upcoming", "top_rated")
+
+
+async def poll(base_url: str, paths, total: int, concurrency: int, revalidate: bool):
+    etags = {}
+    downloaded = 0
+    statuses = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def fetch(i: int):
+            nonlocal downloaded
+            path = paths[i % len(paths)]
+            headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+            response = await client.get(path, headers=headers)
+            downloaded += response.num_bytes_downloaded
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if "etag" in response.headers:
+                etags[path] = response.headers["etag"]
+        latencies, elapsed = await run_callers(fetch, total, concurrency)
+    return latencies, elapsed, downloaded, statuses
+
+
+def main(total: int, concurrency: int):
+    paths = [f"/api/v1/movies/?category={c}&page={p}" for c in CATEGORIES for p in range(1, 4)]
+    paths += [f"/api/v1/movies/{movie_id}" for movie_id in range(100, 130)]
+    with run_stub(latency_ms=50) as stub_url:
+        env = {"TMDB_API_KEY": "benchmark", "TMDB_BASE_URL": f"{stub_url}/3", "CACHE_REDIS_ENABLED": "false",
+               "CATALOG_ENABLED": "false", "PREFETCH_ENABLED": "false"}
+        with run_api(env=env) as (base_url, _):
+            asyncio.run(poll(base_url, paths, len(paths) * 2, concurrency, False))  # Warm the TMDB cache
+            for revalidate in (False, True):
+                latencies, elapsed, downloaded, statuses = asyncio.run(
+                    poll(base_url, paths, total, concurrency, revalidate))
+                report(f"if-none-match={str(revalidate).lower()}", latencies, elapsed)
+                print(f"{'':<28} {downloaded / 1024:9.1f} KiB downloaded   statuses {statuses}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    main(args.requests, args.concurrency)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Login throughput under concurrent load, and what a login burst does to other routes.
+
+Runs the backend with bcrypt on the threadpool (PASSWORD_HASH_WORKERS=0, how
+login used to run) and on the dedicated process pool. In each, a burst of
+concurrent logins runs while a second client measures GET /ratings/my-ratings
+latency. A last run uses a tiny queue to show the 503 + Retry-After backpressure.
+
+    python benchmarks/bench_login.py --logins 400 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from bench_tmdb_client import run_callers
+from common import auth_headers, percentile, report, run_api
+
+PASSWORD = "bench-password"
+
+
+async def burst(base_url: str, users: int, logins: int, concurrency: int, reader_headers: dict):
+    statuses = {}
+    reads = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=concurrency + 4)) as client:
+        async def login(i: int):
+            try:
+                response = await client.post("/api/v1/auth/login",
+                                             data={"username": f"bench{i % users}", "password": PASSWORD})
+                status = response.status_code
+            except httpx.TransportError:  # e.g. a keep-alive connection the server just closed
+                status = "error"
+            statuses[status] = statuses.get(status, 0) + 1
+
+        async def reader():
+            while not done.is_set():
+                started = time.perf_counter()
+                try:
+                    (await client.get("/api/v1/ratings/my-ratings?limit=20", headers=reader_headers)).raise_for_status()
+                    reads.append(time.perf_counter() - started)
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.01)
+
+        read_task = asyncio.create_task(reader())
+        latencies, elapsed = await run_callers(login, logins, concurrency)
+        done.set()
+        await read_task
+    return latencies, elapsed, statuses, reads
+
+
+def main(logins: int, concurrency: int, users: int, rounds: int):
+    runs = [
+        ("threadpool", {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_MAX_QUEUE": "100000"}),
+        ("process pool", {"PASSWORD_HASH_WORKERS": str(os.cpu_count() or 1), "PASSWORD_HASH_MAX_QUEUE": "100000"}),
+        ("pool, queue=8", {"PASSWORD_HASH_WORKERS": str(os.cpu_count() or 1), "PASSWORD_HASH_MAX_QUEUE": "8"}),
+    ]
+    for label, env in runs:
+        with run_api(env={**env, "BCRYPT_ROUNDS": str(rounds), "ADMIN_USERNAMES": "reader"}) as (base_url, _):
+            reader_headers = auth_headers(base_url, "reader", PASSWORD)
+            for i in range(users):
+                auth_headers(base_url, f"bench{i}", PASSWORD)
+            latencies, elapsed, statuses, reads = asyncio.run(
+                burst(base_url, users, logins, concurrency, reader_headers))
+            ok = statuses.get(200, 0)
+            report(f"{label} logins", latencies, elapsed)
+            print(f"{'':<28} {ok / elapsed:>9.1f} ok/s     statuses {statuses}   "
+                  f"my-ratings during burst p50 {percentile(reads, 50) * 1000:.1f} ms "
+                  f"p99 {percentile(reads, 99) * 1000:.1f} ms")
+            print(f"{'':<28} {httpx.get(f'{base_url}/api/v1/auth/hasher/stats', headers=reader_headers).json()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_ROUNDS (12 is the production default)")
+    args = parser.parse_args()
+    main(args.logins, args.concurrency, args.users, args.rounds)
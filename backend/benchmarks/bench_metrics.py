@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Measure what the /metrics instrumentation costs.
+
+Starts the backend under uvicorn with METRICS_ENABLED=false, then true, and
+loads a route that does almost nothing (GET /movies/categories/all, so the
+middleware is a large share of the work) and one that authenticates and
+queries the database (GET /ratings/my-ratings, which also times its
+statements). Then times the primitives in-process: a histogram observation
+and a full /metrics render.
+
+    python benchmarks/bench_metrics.py --requests 3000 --concurrency 32
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from bench_tmdb_client import run_callers
+from common import auth_headers, report, run_api
+
+PATHS = ("/api/v1/movies/categories/all", "/api/v1/ratings/my-ratings?limit=20")
+
+
+async def load(base_url: str, path: str, headers: dict, total: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, headers=headers,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def fetch(i: int):
+            response = await client.get(path)
+            response.raise_for_status()
+        return await run_callers(fetch, total, concurrency)
+
+
+def main(total: int, concurrency: int):
+    for enabled in ("false", "true"):
+        with run_api(env={"METRICS_ENABLED": enabled}) as (base_url, _):
+            headers = auth_headers(base_url)
+            for path in PATHS:
+                asyncio.run(load(base_url, path, headers, concurrency * 5, concurrency))  # Warm up
+                latencies, elapsed = asyncio.run(load(base_url, path, headers, total, concurrency))
+                report(f"metrics={enabled:<5} {path.split('?')[0].split('/')[-1]}", latencies, elapsed)
+            if enabled == "true":
+                body = httpx.get(f"{base_url}/metrics").text
+                print(f"/metrics: {len(body.splitlines())} lines, {len(body) / 1024:.1f} KiB")
+    primitives()
+
+
+def primitives(calls: int = 200000):
+    from app.core.metrics import Histogram, metrics
+
+    histogram = Histogram("bench_seconds", "benchmark", ["method", "route", "status"])
+    started = time.perf_counter()
+    for i in range(calls):
+        histogram.observe(i % 100 / 1000, "GET", "/api/v1/movies/{movie_id}", "200")
+    print(f"\nhistogram observe: {(time.perf_counter() - started) / calls * 1e9:.0f} ns")
+
+    started = time.perf_counter()
+    for _ in range(100):
+        metrics.render()
+    print(f"render (this process's metrics): {(time.perf_counter() - started) / 100 * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    main(args.requests, args.concurrency)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading metadata for a page of rated movies: per-id GETs vs POST /movies/batch.
+
+Starts the backend against the TMDB stub and loads --movies movie details the
+way the dashboard would: one GET /movies/{id} per movie with a browser's six
+connections per host, or a single POST /movies/batch. Cold runs use movies
+nobody asked for yet (every one is a TMDB call), warm runs repeat them from
+the cache. A few ids that TMDB does not know show up as per-id errors.
+
+    python benchmarks/bench_movie_batch.py --movies 100 --pages 10
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from common import percentile, run_api, run_stub
+
+BROWSER_CONNECTIONS = 6
+MISSING = 10000000  # The stub answers 404 from here on
+
+
+async def per_id(client: httpx.AsyncClient, ids):
+    semaphore = asyncio.Semaphore(BROWSER_CONNECTIONS)
+
+    async def get(movie_id):
+        async with semaphore:
+            return await client.get(f"/api/v1/movies/{movie_id}")
+
+    responses = await asyncio.gather(*(get(movie_id) for movie_id in ids))
+    return sum(response.status_code == 200 for response in responses), len(responses)
+
+
+async def batch(client: httpx.AsyncClient, ids):
+    body = (await client.post("/api/v1/movies/batch", json={"ids": ids})).json()
+    return len(body["items"]), 1
+
+
+async def load_pages(base_url: str, pages, load):
+    latencies, found, requests = [], 0, 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=60,
+                                 limits=httpx.Limits(max_connections=BROWSER_CONNECTIONS)) as client:
+        for ids in pages:
+            started = time.perf_counter()
+            page_found, page_requests = await load(client, ids)
+            latencies.append(time.perf_counter() - started)
+            found += page_found
+            requests += page_requests
+    return latencies, found, requests
+
+
+def main(movies: int, pages: int, latency_ms: float):
+    with run_stub(latency_ms=latency_ms) as stub_url:
+        env = {"TMDB_API_KEY": "benchmark", "TMDB_BASE_URL": f"{stub_url}/3", "CACHE_REDIS_ENABLED": "false",
+               "CATALOG_ENABLED": "false", "PREFETCH_ENABLED": "false", "TMDB_RATE_LIMIT": "0"}
+        with run_api(env=env) as (base_url, _):
+            print(f"{movies} movies per page, TMDB latency {latency_ms:.0f} ms\n")
+            next_id = 1
+            for label, load in (("per-id GETs", per_id), ("POST /movies/batch", batch)):
+                cold = []
+                for _ in range(pages):
+                    ids = list(range(next_id, next_id + movies - 2)) + [MISSING + next_id, MISSING + next_id + 1]
+                    next_id += movies
+                    cold.append(ids)
+                for run, page_ids in (("cold", cold), ("warm", cold)):
+                    latencies, found, requests = asyncio.run(load_pages(base_url, page_ids, load))
+                    print(f"{label:<20} {run}   p50 {percentile(latencies, 50) * 1000:8.1f} ms   "
+                          f"max {max(latencies) * 1000:8.1f} ms   {requests // pages:>4} requests/page   "
+                          f"{found // pages} movies/page")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movies", type=int, default=100, help="movies per page")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50, help="simulated TMDB latency")
+    args = parser.parse_args()
+    main(args.movies, args.pages, args.latency_ms)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie detail fetch: sequential vs parallel vs append_to_response.
+
+The response cache is disabled so every request pays the upstream latency.
+
+    python benchmarks/bench_movie_detail.py --requests 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+
+os.environ["CACHE_ENABLED"] = "false"
+
+from common import report, run_stub
+from bench_tmdb_client import run_callers
+
+
+async def main(total: int, concurrency: int, latency_ms: float):
+    with run_stub(latency_ms=latency_ms):
+        from app.core.config import settings
+        from app.services.tmdb_service import TMDBService
+
+        service = TMDBService()
+
+        async def sequential(movie_id: int):
+            # The old endpoint: details, then credits
+            movie_data = await service.get_movie_details(movie_id)
+            credits_data = await service.get_movie_credits(movie_id)
+            return service.format_movie_details({**movie_data, "credits": credits_data})
+
+        report("sequential (2 round trips)", *await run_callers(sequential, total, concurrency))
+        for mode in ("parallel", "append"):
+            settings.TMDB_DETAILS_MODE = mode
+            report(f"{mode}", *await run_callers(service.get_movie_with_credits, total, concurrency))
+        await service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency_ms))
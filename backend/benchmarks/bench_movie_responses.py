@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie list response path: formatting, JSON encoding and compression.
+
+Takes one 20-movie TMDB page and times turning it into a response body:
+"old" builds a dict per movie and encodes the page with FastAPI's generic
+encoder (jsonable_encoder + json.dumps), "new" builds slotted MovieSummary
+items and encodes them with orjson, "grid" adds fields=tmdb_id,title,poster_url,average_rating.
+Then reports the body size with gzip and, if installed, brotli.
+
+    python benchmarks/bench_movie_responses.py --iterations 5000
+"""
+import argparse
+import json
+import time
+import zlib
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from tmdb_stub import fake_page
+
+GRID_FIELDS = ("tmdb_id", "title", "poster_url", "average_rating")
+
+
+def main(iterations: int):
+    from app.core.compression import BrotliCompressor, GzipCompressor, brotli
+    from app.schemas.movie import project
+    from app.services.tmdb_service import tmdb_service
+
+    tmdb_page = json.loads(fake_page(1, 1))
+
+    def old():
+        items = [tmdb_service.movie_summary(m).to_dict() for m in tmdb_page["results"]]
+        return JSONResponse(jsonable_encoder({"items": items, "total": 10000, "page": 1})).body
+
+    def new(fields=None):
+        items = project([tmdb_service.movie_summary(m) for m in tmdb_page["results"]], fields)
+        return ORJSONResponse({"items": items, "total": 10000, "page": 1}).body
+
+    for label, build in (("old: dicts + jsonable_encoder", old), ("new: slotted + orjson", new),
+                         ("new: fields=grid", lambda: new(GRID_FIELDS))):
+        build()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            body = build()
+        per_page = (time.perf_counter() - started) / iterations
+        sizes = f"{len(body):>6} B   gzip {len(GzipCompressor(6).finish(body)):>5} B"
+        if brotli is not None:
+            sizes += f"   br {len(BrotliCompressor(4).finish(body)):>5} B"
+        print(f"{label:<30} {per_page * 1e6:8.1f} us/page   {sizes}")
+
+    body = new()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        zlib.compress(body, 6)
+    print(f"gzip level 6 on a full page     {(time.perf_counter() - started) / iterations * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /ratings/my-ratings for a heavy user: old full load vs keyset pages vs NDJSON.
+
+Calls the handler in-process against a throwaway SQLite database and reports
+wall time and Python peak allocation (tracemalloc, measured in a separate run)
+per mode, including RatingResponse validation and JSON encoding.
+
+    python benchmarks/bench_my_ratings.py --ratings 20000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "my_ratings_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from common import BACKEND_DIR  # noqa: E402,F401  (sets up sys.path)
+
+
+def measure(label: str, fn, repeat: int = 5):
+    fn()  # Warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        count = fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {count:>6} ratings   {elapsed * 1000:8.1f} ms   peak {peak / 1e6:7.1f} MB")
+
+
+def main(count: int, page_size: int):
+    from typing import List
+
+    from fastapi import Response
+    from pydantic import TypeAdapter
+
+    from app.api.v1.ratings import get_my_ratings
+    from app.core.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+    from app.database.init_db import init_database
+    from app.models.rating import Rating
+    from app.models.user import User
+    from app.schemas.rating import RatingResponse
+    from app.services.rating_io import upsert_ratings
+
+    init_database()
+    db = SessionLocal()
+    user = User(username="heavy", email="heavy@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    upsert_ratings(db, user.id, ({"tmdb_movie_id": i, "rating": 4.0, "movie_title": f"Movie {i}",
+                                  "movie_poster": f"https://image.tmdb.org/t/p/w500/{i}.jpg"} for i in range(count)))
+    response_model = TypeAdapter(List[RatingResponse])
+    # One loop for the whole run: the async engine's pooled connections belong to it
+    loop = asyncio.new_event_loop()
+    async_db = AsyncSessionLocal()
+
+    def legacy():
+        """The old handler: every Rating entity, then RatingResponse validation and JSON"""
+        ratings = db.query(Rating).filter(Rating.user_id == user.id).all()
+        body = response_model.dump_json(response_model.validate_python(ratings, from_attributes=True))
+        db.expunge_all()
+        return len(ratings) if body else 0
+
+    def page(limit, cursor=None):
+        response = Response()
+        rows = loop.run_until_complete(get_my_ratings(response, limit, cursor, "json", user, async_db))
+        response_model.dump_json(response_model.validate_python(rows))
+        return len(rows), response.headers.get("X-Next-Cursor")
+
+    def first_page():
+        return page(page_size)[0]
+
+    def all_pages():
+        total, cursor = 0, None
+        while True:
+            count, cursor = page(1000, cursor)
+            total += count
+            if not cursor:
+                return total
+
+    def ndjson():
+        async def drain():
+            response = await get_my_ratings(Response(), 100, None, "ndjson", user, async_db)
+            total = 0
+            async for chunk in response.body_iterator:
+                total += chunk.count("\n")
+            await async_db.rollback()  # End the read, as closing the request's session would
+            return total
+        return loop.run_until_complete(drain())
+
+    measure("legacy .all() + RatingResponse", legacy)
+    measure(f"first page (limit={page_size})", first_page)
+    measure("all pages (limit=1000)", all_pages)
+    measure("ndjson stream", ndjson)
+
+    db.close()
+    loop.run_until_complete(async_db.close())
+    loop.run_until_complete(async_engine.dispose())
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ratings", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    main(args.ratings, args.page_size)
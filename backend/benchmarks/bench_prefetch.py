@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cache prefetcher: hot category page latency across cache expiries.
+
+Runs a steady stream of requests for the five categories, pages 1-5, against
+the TMDB stub with a short list TTL, once with a cold cache and no prefetcher
+and once with the prefetcher running. Reports latency, the hot-page hit ratio
+and how many calls reached the stub.
+
+    python benchmarks/bench_prefetch.py --seconds 30 --ttl 6 --latency-ms 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from common import percentile, run_stub, stub_request_count
+
+
+async def traffic(service, seconds: float, rate: float):
+    """Random hot-page requests at `rate` per second, returns latencies"""
+    from app.services.tmdb_service import CATEGORY_ENDPOINTS
+
+    rng = random.Random(7)
+    latencies = []
+
+    async def one(category: str, page: int):
+        started = time.perf_counter()
+        await service.get_category_movies(category, page)
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.create_task(one(rng.choice(list(CATEGORY_ENDPOINTS)), rng.randint(1, 5))))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def main(seconds: float, ttl: int, latency_ms: float, rate: float):
+    os.environ.update({
+        "CACHE_REDIS_ENABLED": "false",
+        "CACHE_TTL_LIST": str(ttl),
+        "PREFETCH_INTERVAL": str(max(1, ttl // 6)),
+        "PREFETCH_REFRESH_AHEAD": str(max(1, ttl // 2)),
+        "PREFETCH_JITTER": "1",
+    })
+    with run_stub(latency_ms=latency_ms) as base_url:
+        from app.services.prefetcher import CachePrefetcher
+        from app.services.tmdb_service import TMDBService
+
+        for enabled in (False, True):
+            service = TMDBService()
+            prefetcher = CachePrefetcher(source=service)
+            service.hot_keys.update(target.key for target in prefetcher.targets)
+            if enabled:
+                await prefetcher.run_once()  # Startup warm-up
+                prefetcher.start()
+            before = stub_request_count(base_url)
+            latencies = await traffic(service, seconds, rate)
+            upstream = stub_request_count(base_url) - before
+            await prefetcher.stop()
+
+            stats = prefetcher.stats()
+            print(f"prefetch={str(enabled).lower():<5} {len(latencies):>5} requests   "
+                  f"p50 {percentile(latencies, 50) * 1000:7.2f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms   "
+                  f"hit ratio {stats['hot_hit_ratio']:.3f}   upstream calls {upstream}")
+            await service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--ttl", type=int, default=6, help="CACHE_TTL_LIST for the run, seconds")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--rate", type=float, default=100, help="requests per second")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.ttl, args.latency_ms, args.rate))
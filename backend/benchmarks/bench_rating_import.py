@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk rating writes: per-item POST vs POST /ratings/batch vs streamed CSV import.
+
+Runs the backend under uvicorn on a throwaway SQLite database and talks to it
+over HTTP, so request handling and auth are included in the numbers.
+
+    python benchmarks/bench_rating_import.py --ratings 20000 --import-rows 200000
+"""
+import argparse
+import random
+import time
+
+import httpx
+
+from common import auth_headers, peak_rss_mb, run_api
+
+
+def ratings(count: int, offset: int = 0):
+    rng = random.Random(offset)
+    for movie_id in range(offset + 1, offset + count + 1):
+        yield {"tmdb_movie_id": movie_id, "rating": rng.randint(2, 10) / 2, "movie_title": f"Movie {movie_id}"}
+
+
+def csv_body(count: int, offset: int, chunk_rows: int = 1000):
+    """Letterboxd-style CSV, generated and sent a chunk at a time"""
+    yield b"tmdbID,Title,Year,Rating\n"
+    lines = []
+    for rating in ratings(count, offset):
+        lines.append(f'{rating["tmdb_movie_id"]},"{rating["movie_title"]}",2001,{rating["rating"]}\n')
+        if len(lines) == chunk_rows:
+            yield "".join(lines).encode()
+            lines = []
+    yield "".join(lines).encode()
+
+
+def main(count: int, per_item_count: int, batch_size: int, import_rows: int):
+    with run_api() as (base_url, proc):
+        headers = auth_headers(base_url)
+        with httpx.Client(base_url=f"{base_url}/api/v1/ratings", headers=headers, timeout=600) as client:
+            started = time.perf_counter()
+            for rating in ratings(per_item_count):
+                client.post("/", json=rating).raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"per-item POST        {per_item_count:>7} ratings   {per_item_count / elapsed:9.0f} ratings/s")
+
+            items = list(ratings(count, offset=1000000))
+            started = time.perf_counter()
+            for start in range(0, count, batch_size):
+                client.post("/batch", json={"ratings": items[start:start + batch_size]}).raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"batch of {batch_size:<5}       {count:>7} ratings   {count / elapsed:9.0f} ratings/s")
+
+            rss_before = peak_rss_mb(proc.pid)
+            started = time.perf_counter()
+            response = client.post("/import", params={"format": "csv"}, content=csv_body(import_rows, 2000000))
+            response.raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"streamed CSV import  {import_rows:>7} ratings   {import_rows / elapsed:9.0f} ratings/s   "
+                  f"server peak RSS {rss_before:.0f} -> {peak_rss_mb(proc.pid):.0f} MB")
+
+            started = time.perf_counter()
+            exported = 0
+            with client.stream("GET", "/export", params={"format": "csv"}) as response:
+                for line in response.iter_lines():
+                    exported += 1
+            elapsed = time.perf_counter() - started
+            print(f"streamed CSV export  {exported - 1:>7} ratings   {(exported - 1) / elapsed:9.0f} ratings/s   "
+                  f"server peak RSS {peak_rss_mb(proc.pid):.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ratings", type=int, default=20000, help="ratings sent through /batch")
+    parser.add_argument("--per-item", type=int, default=2000, help="ratings sent one POST at a time")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--import-rows", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.ratings, args.per_item, args.batch_size, args.import_rows)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark refreshing the movie titles/posters copied onto ratings: row by row vs the background job.
+
+Seeds a throwaway SQLite database with --rows ratings (popular movies get far
+more of them) whose titles are all out of date, then brings them current:
+
+  * row by row   - load each movie's ratings through the ORM and set the fields, one commit per movie
+  * refresher    - RatingMetadataRefresher: keyset batches over movie_rating_stats, CASE bulk UPDATEs
+                   of at most --max-rows rows per transaction
+
+TMDB is replaced by an in-process source that renames every movie, so only
+the database work is measured. Reports rows/s and the longest single write,
+which is how long other writers can be kept waiting.
+
+    python benchmarks/bench_rating_refresh.py --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "rating_refresh_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import numpy as np  # noqa: E402
+
+import common  # noqa: E402,F401  (sets up sys.path)
+
+USERS = 50000
+MOVIES = 20000
+
+
+class RenamingSource:
+    """Stands in for TMDBService: every movie has a new title and poster"""
+
+    def __init__(self, suffix: str):
+        self.suffix = suffix
+
+    async def get_movies_with_credits(self, movie_ids, concurrency=None, store=True):
+        return {movie_id: {"title": f"Movie {movie_id} {self.suffix}",
+                           "poster_url": f"https://image.tmdb.org/t/p/w500/{movie_id}{self.suffix}.jpg"}
+                for movie_id in movie_ids}, {}
+
+
+class WriteTimer:
+    """Longest UPDATE statement on the ratings table"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.longest = 0.0
+        self._started = None
+        event.listen(engine, "before_cursor_execute", self.before)
+        event.listen(engine, "after_cursor_execute", self.after)
+
+    def before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter() if statement.startswith("UPDATE ratings") else None
+
+    def after(self, conn, cursor, statement, parameters, context, executemany):
+        if self._started is not None:
+            self.longest = max(self.longest, time.perf_counter() - self._started)
+
+    def reset(self):
+        self.longest = 0.0
+
+
+def seed(engine, rows: int, batch_size: int = 50000) -> int:
+    from app.models.rating import Rating
+
+    rng = np.random.default_rng(13)
+    # Zipf-like movie popularity, so a few movies have tens of thousands of ratings
+    movies = np.minimum(rng.zipf(1.3, size=rows * 2), MOVIES)
+    users = rng.integers(1, USERS + 1, size=rows * 2)
+    keys = np.unique(users.astype(np.int64) * (MOVIES + 1) + movies)[:rows]
+    with engine.begin() as connection:
+        for start in range(0, len(keys), batch_size):
+            connection.execute(Rating.__table__.insert(), [
+                {"user_id": int(k // (MOVIES + 1)), "tmdb_movie_id": int(k % (MOVIES + 1)), "rating": 4.0,
+                 "movie_title": "Seeded", "movie_poster": None}
+                for k in keys[start:start + batch_size]
+            ])
+    return len(keys)
+
+
+def row_by_row(SessionLocal, source: RenamingSource) -> int:
+    from app.models.rating import MovieRatingStats, Rating
+
+    db = SessionLocal()
+    rows = 0
+    try:
+        movie_ids = [movie_id for (movie_id,) in db.query(MovieRatingStats.tmdb_movie_id).order_by(
+            MovieRatingStats.tmdb_movie_id)]
+        movies, _ = asyncio.run(source.get_movies_with_credits(movie_ids))
+        for movie_id in movie_ids:
+            for rating in db.query(Rating).filter(Rating.tmdb_movie_id == movie_id):
+                rating.movie_title = movies[movie_id]["title"]
+                rating.movie_poster = movies[movie_id]["poster_url"]
+                rows += 1
+            db.commit()
+    finally:
+        db.close()
+    return rows
+
+
+def main(rows: int, max_rows: int, batch_size: int):
+    from sqlalchemy import update
+
+    from app.core.database import SessionLocal, engine
+    from app.database.base import Base
+    from app.database.init_db import ensure_rating_indexes, ensure_rating_stats
+    from app.models.rating import MovieRatingStats
+    from app.services.rating_metadata import RatingMetadataRefresher
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    count = seed(engine, rows)
+    ensure_rating_indexes()
+    ensure_rating_stats()
+    print(f"seeded {count} ratings of {MOVIES} movies in {time.perf_counter() - started:.1f} s\n")
+    timer = WriteTimer(engine)
+
+    def report(label: str, updated: int, elapsed: float):
+        print(f"{label:<12} {updated:>9} rows in {elapsed:7.1f} s   {updated / elapsed:>9.0f} rows/s   "
+              f"longest UPDATE {timer.longest * 1000:8.1f} ms")
+
+    timer.reset()
+    started = time.perf_counter()
+    updated = row_by_row(SessionLocal, RenamingSource("v1"))
+    report("row by row", updated, time.perf_counter() - started)
+
+    refresher = RatingMetadataRefresher(source=RenamingSource("v2"), batch_size=batch_size, rate=0,
+                                        max_rows=max_rows, max_age=0)
+    with engine.begin() as connection:
+        connection.execute(update(MovieRatingStats).values(metadata_synced_at=None))
+    timer.reset()
+    started = time.perf_counter()
+    counts = asyncio.run(refresher.run_once())
+    report("refresher", counts["rows"], time.perf_counter() - started)
+
+    # A second pass with nothing changed only reads
+    with engine.begin() as connection:
+        connection.execute(update(MovieRatingStats).values(metadata_synced_at=None))
+    timer.reset()
+    started = time.perf_counter()
+    counts = asyncio.run(refresher.run_once())
+    print(f"{'unchanged':<12} {counts['movies']:>9} movies checked in {time.perf_counter() - started:.1f} s, "
+          f"{counts['rows']} rows written")
+
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--max-rows", type=int, default=5000, help="ratings per UPDATE (RATING_REFRESH_MAX_ROWS)")
+    parser.add_argument("--batch-size", type=int, default=50, help="movies per TMDB batch (RATING_REFRESH_BATCH_SIZE)")
+    args = parser.parse_args()
+    main(args.rows, args.max_rows, args.batch_size)
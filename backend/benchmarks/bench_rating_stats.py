@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark community rating reads: GROUP BY over ratings vs the maintained aggregates.
+
+Seeds a throwaway SQLite database with --rows ratings (popular movies get far
+more of them) and builds movie_rating_stats from them, then times:
+
+  * a list page's 20 movies     - GROUP BY ... WHERE tmdb_movie_id IN (...)  vs  GET /ratings/movies?ids=
+  * the Bayesian top 20         - GROUP BY over the whole table               vs  GET /ratings/movies/top
+  * the most rated 20           - same                                        vs  ?sort=count
+  * a single rating write       - create_rating with the aggregate update, for the cost on the write side
+
+and checks that two interleaved writes of the same rating count it once.
+
+    python benchmarks/bench_rating_stats.py --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "rating_stats_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import numpy as np  # noqa: E402
+
+from common import percentile  # noqa: E402  (sets up sys.path)
+
+USERS = 50000
+MOVIES = 20000
+PAGE = 20
+
+
+class BenchUser:
+    """Stands in for the authenticated user"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def seed(engine, rows: int, batch_size: int = 50000):
+    from app.models.rating import Rating
+    from app.models.user import User
+
+    rng = np.random.default_rng(11)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(1, USERS + 1)
+        ])
+        # Zipf-like movie popularity; duplicate (user, movie) pairs are dropped
+        movies = np.minimum(rng.zipf(1.3, size=rows * 2), MOVIES)
+        users = rng.integers(1, USERS + 1, size=rows * 2)
+        keys = np.unique(users.astype(np.int64) * (MOVIES + 1) + movies)[:rows]
+        rng.shuffle(keys)
+        ratings = rng.choice([1.0, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0], size=len(keys))
+        for start in range(0, len(keys), batch_size):
+            connection.execute(Rating.__table__.insert(), [
+                {"user_id": int(k // (MOVIES + 1)), "tmdb_movie_id": int(k % (MOVIES + 1)), "rating": float(r),
+                 "movie_title": "Seeded", "movie_poster": None}
+                for k, r in zip(keys[start:start + batch_size], ratings[start:start + batch_size])
+            ])
+    return len(keys)
+
+
+def timed(label: str, fn, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    print(f"{label:<34} p50 {percentile(latencies, 50) * 1000:8.2f} ms   p99 {percentile(latencies, 99) * 1000:8.2f} ms")
+
+
+async def check_interleaved_writes(user_id: int, movie_id: int) -> bool:
+    """Two create_rating calls for the same rating, the second starting while the first has read the
+    previous rating; the aggregates must count it once"""
+    from sqlalchemy import select
+
+    from app.api.v1.ratings import create_rating
+    from app.core.database import AsyncSessionLocal
+    from app.models.rating import MovieRatingStats
+    from app.schemas.rating import RatingCreate
+    from app.services.rating_stats import PREVIOUS_RATING
+
+    rating = RatingCreate(tmdb_movie_id=movie_id, rating=4.5, movie_title="Bench")
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        execute = first.execute
+
+        async def paused_execute(statement, *args, **kwargs):
+            result = await execute(statement, *args, **kwargs)
+            if statement is PREVIOUS_RATING:
+                await asyncio.sleep(0.2)  # Long enough for the second write to read too, were it not locked out
+            return result
+
+        first.execute = paused_execute
+        await asyncio.gather(create_rating(rating, BenchUser(user_id), first),
+                             create_rating(rating, BenchUser(user_id), second))
+    async with AsyncSessionLocal() as db:
+        count = await db.scalar(
+            select(MovieRatingStats.rating_count).where(MovieRatingStats.tmdb_movie_id == movie_id)
+        )
+    print(f"\ninterleaved writes of one rating: rating_count {count} ({'ok' if count == 1 else 'WRONG'})")
+    return count == 1
+
+
+def main(rows: int, repeat: int, writes: int):
+    from sqlalchemy import func, select
+
+    from app.api.v1.ratings import create_rating
+    from app.core.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+    from app.database.base import Base
+    from app.database.init_db import ensure_rating_indexes, ensure_rating_stats
+    from app.models.rating import Rating
+    from app.schemas.rating import RatingCreate
+    from app.services.rating_stats import get_movie_stats, top_movies
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    count = seed(engine, rows)
+    ensure_rating_indexes()
+    print(f"seeded {count} ratings in {time.perf_counter() - started:.1f} s")
+    started = time.perf_counter()
+    ensure_rating_stats()
+    print(f"built aggregates in {time.perf_counter() - started:.1f} s\n")
+
+    rng = np.random.default_rng(5)
+    db = SessionLocal()
+    loop = asyncio.new_event_loop()
+    async_db = AsyncSessionLocal()
+    pages = [[int(m) for m in rng.choice(np.arange(1, 2000), PAGE, replace=False)] for _ in range(repeat)]
+
+    def group_by_page():
+        ids = pages[rng.integers(len(pages))]
+        db.execute(
+            select(Rating.tmdb_movie_id, func.count(), func.avg(Rating.rating))
+            .where(Rating.tmdb_movie_id.in_(ids)).group_by(Rating.tmdb_movie_id)
+        ).all()
+
+    def group_by_top(order):
+        db.execute(
+            select(Rating.tmdb_movie_id, func.count().label("n"), func.avg(Rating.rating).label("avg"))
+            .group_by(Rating.tmdb_movie_id).order_by(order).limit(PAGE)
+        ).all()
+
+    def aggregates(coro):
+        loop.run_until_complete(coro())
+        loop.run_until_complete(async_db.rollback())  # End the read, as closing the request's session would
+
+    timed(f"page of {PAGE}, GROUP BY", group_by_page, repeat)
+    timed(f"page of {PAGE}, aggregates", lambda: aggregates(
+        lambda: get_movie_stats(async_db, pages[rng.integers(len(pages))])), repeat)
+    timed("bayesian top, GROUP BY", lambda: group_by_top(
+        ((10 * 3.0 + func.sum(Rating.rating)) / (10 + func.count())).desc()), max(3, repeat // 20))
+    timed("bayesian top, aggregates", lambda: aggregates(lambda: top_movies(async_db, "bayesian")), repeat)
+    timed("most rated, GROUP BY", lambda: group_by_top(func.count().desc()), max(3, repeat // 20))
+    timed("most rated, aggregates", lambda: aggregates(lambda: top_movies(async_db, "count")), repeat)
+
+    async def write_all():
+        latencies = []
+        for _ in range(writes):
+            user_id, movie_id = int(rng.integers(1, USERS + 1)), int(rng.integers(1, MOVIES + 1))
+            rating = RatingCreate(tmdb_movie_id=movie_id, rating=4.5, movie_title="Bench")
+            async with AsyncSessionLocal() as session:
+                t = time.perf_counter()
+                await create_rating(rating, BenchUser(user_id), session)
+                latencies.append(time.perf_counter() - t)
+        return latencies
+
+    latencies = loop.run_until_complete(write_all())
+    print(f"\n{'rating write + aggregates':<34} p50 {percentile(latencies, 50) * 1000:8.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:8.2f} ms")
+
+    counted_once = loop.run_until_complete(check_interleaved_writes(1, MOVIES + 1))
+
+    db.close()
+    loop.run_until_complete(async_db.close())
+    loop.run_until_complete(async_engine.dispose())
+    engine.dispose()
+    os.remove(DB_PATH)
+    if not counted_once:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=200, help="timed reads per query shape")
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.rows, args.repeat, args.writes)
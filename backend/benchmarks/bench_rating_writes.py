@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark rating writes against a large ratings table: SELECT-then-write vs upsert.
+
+Seeds a throwaway SQLite database with --rows ratings, then times single-rating
+writes (a mix of new ratings and re-ratings), each in its own transaction as
+the API does:
+
+  * legacy, no index  - SELECT existing, then UPDATE or INSERT, commit, refresh
+  * legacy, indexed   - the same with the (user_id, tmdb_movie_id) unique index
+  * upsert            - create_rating's single INSERT ... ON CONFLICT ... RETURNING
+
+    python benchmarks/bench_rating_writes.py --rows 1000000 --writes 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "ratings_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import numpy as np  # noqa: E402
+
+from common import percentile  # noqa: E402  (sets up sys.path)
+
+USERS = 50000
+MOVIES = 20000
+
+
+class BenchUser:
+    """Stands in for the authenticated user"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def seed(engine, rows: int, batch_size: int = 50000):
+    from app.models.rating import Rating
+
+    rng = np.random.default_rng(11)
+    # Unique (user, movie) pairs drawn without replacement from the full grid
+    keys = rng.choice(USERS * MOVIES, size=rows, replace=False)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            chunk = keys[start:start + batch_size]
+            connection.execute(Rating.__table__.insert(), [
+                {"user_id": int(k // MOVIES) + 1, "tmdb_movie_id": int(k % MOVIES) + 1, "rating": 3.0,
+                 "movie_title": "Seeded", "movie_poster": None}
+                for k in chunk
+            ])
+    return keys
+
+
+def legacy_create_rating(rating, current_user, db):
+    """create_rating as it was before the upsert"""
+    from app.models.rating import Rating
+
+    existing_rating = db.query(Rating).filter(
+        Rating.user_id == current_user.id,
+        Rating.tmdb_movie_id == rating.tmdb_movie_id
+    ).first()
+    if existing_rating:
+        existing_rating.rating = rating.rating
+        db.commit()
+        db.refresh(existing_rating)
+        return existing_rating
+    db_rating = Rating(user_id=current_user.id, tmdb_movie_id=rating.tmdb_movie_id, rating=rating.rating,
+                       movie_title=rating.movie_title, movie_poster=rating.movie_poster)
+    db.add(db_rating)
+    db.commit()
+    db.refresh(db_rating)
+    return db_rating
+
+
+def write_workload(keys: np.ndarray, count: int, seed_value: int):
+    """Half re-ratings of seeded pairs, half new pairs"""
+    rng = np.random.default_rng(seed_value)
+    existing = rng.choice(keys, size=count // 2)
+    fresh = rng.integers(0, USERS * MOVIES, size=count - count // 2)
+    workload = np.concatenate([existing, fresh])
+    rng.shuffle(workload)
+    return [(int(k // MOVIES) + 1, int(k % MOVIES) + 1) for k in workload]
+
+
+def run(label: str, write, workload):
+    from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+    from app.schemas.rating import RatingCreate
+
+    latencies = []
+
+    async def write_all_async():
+        async with AsyncSessionLocal() as db:
+            for user_id, movie_id in workload:
+                rating = RatingCreate(tmdb_movie_id=movie_id, rating=4.5, movie_title="Bench")
+                t = time.perf_counter()
+                await write(rating, BenchUser(user_id), db)
+                latencies.append(time.perf_counter() - t)
+        await async_engine.dispose()  # aiosqlite connection threads would outlive the loop
+
+    started = time.perf_counter()
+    if asyncio.iscoroutinefunction(write):
+        asyncio.run(write_all_async())
+    else:
+        db = SessionLocal()
+        for user_id, movie_id in workload:
+            rating = RatingCreate(tmdb_movie_id=movie_id, rating=4.5, movie_title="Bench")
+            t = time.perf_counter()
+            write(rating, BenchUser(user_id), db)
+            latencies.append(time.perf_counter() - t)
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<18} {len(workload):>6} writes   {len(workload) / elapsed:8.0f} writes/s   "
+          f"p50 {percentile(latencies, 50) * 1000:6.2f} ms   p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+
+
+def main(rows: int, writes: int, legacy_writes: int, synchronous: str):
+    from sqlalchemy import event
+
+    from app.api.v1.ratings import create_rating
+    from app.core.database import async_engine, engine
+    from app.database.base import Base
+    from app.database.init_db import ensure_rating_indexes
+    from app.models.rating import Rating
+    from app.models.user import User  # noqa: F401  (ratings.user_id references users)
+
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def set_synchronous(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    unique_index = next(i for i in Rating.__table__.indexes if i.name == "uq_ratings_user_movie")
+    unique_index.drop(engine)
+
+    started = time.perf_counter()
+    keys = seed(engine, rows)
+    print(f"seeded {rows} ratings in {time.perf_counter() - started:.1f} s\n")
+
+    run("legacy, no index", legacy_create_rating, write_workload(keys, legacy_writes, 1))
+
+    started = time.perf_counter()
+    ensure_rating_indexes()
+    print(f"{'':<18} built unique index in {time.perf_counter() - started:.1f} s")
+
+    run("legacy, indexed", legacy_create_rating, write_workload(keys, writes, 2))
+    run("upsert", create_rating, write_workload(keys, writes, 3))
+
+    engine.dispose()
+    os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--legacy-writes", type=int, default=200, help="writes without the index (full scans)")
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL"],
+                        help="SQLite fsync level; OFF isolates statement cost from commit cost")
+    args = parser.parse_args()
+    main(args.rows, args.writes, args.legacy_writes, args.synchronous)
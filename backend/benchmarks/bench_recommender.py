@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark the item-item recommender on synthetic ratings: fit, serve, incremental update.
+
+Item popularity follows a Zipf-like distribution, as real rating data does.
+
+    python benchmarks/bench_recommender.py --users 20000 --items 10000 --ratings 500000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common import percentile
+
+
+def synthetic_ratings(users: int, items: int, count: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, items + 1) ** 0.8
+    popularity /= popularity.sum()
+    user_ids = rng.integers(1, users + 1, size=count)
+    item_ids = rng.choice(np.arange(1, items + 1), size=count, p=popularity)
+    ratings = rng.integers(2, 11, size=count) / 2.0  # 1.0 .. 5.0 in halves
+    return user_ids, item_ids, ratings
+
+
+def main(users: int, items: int, count: int, queries: int):
+    from app.services.rating_events import RatingEvent
+    from app.services.recommender import ItemKNNRecommender
+
+    user_ids, item_ids, ratings = synthetic_ratings(users, items, count)
+    model = ItemKNNRecommender()
+    started = time.perf_counter()
+    model.fit(user_ids, item_ids, ratings)
+    print(f"fit: {count} ratings, {users} users, {items} items in {time.perf_counter() - started:.1f} s")
+
+    latencies = []
+    for user_id in np.random.default_rng(1).integers(1, users + 1, size=queries):
+        t = time.perf_counter()
+        model.recommend(int(user_id), 20)
+        latencies.append(time.perf_counter() - t)
+    print(f"recommend top-20: p50 {percentile(latencies, 50) * 1000:.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms")
+
+    # Incremental path: one rating event applied in place
+    latencies = []
+    rng = np.random.default_rng(2)
+    for user_id, item_id in zip(rng.integers(1, users + 1, size=queries), rng.integers(1, items + 1, size=queries)):
+        t = time.perf_counter()
+        model.apply_event(RatingEvent(int(user_id), int(item_id), 4.5))
+        latencies.append(time.perf_counter() - t)
+    print(f"apply rating event: p50 {percentile(latencies, 50) * 1000:.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.users, args.items, args.ratings, args.queries)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark request coalescing: upstream TMDB calls for a burst of identical requests.
+
+Fires `--concurrency` simultaneous detail+credits lookups spread over
+`--distinct` movie ids with an empty cache, and reports how many calls
+reached the stub. With single-flight this is 2 x distinct, not 2 x concurrency.
+
+    python benchmarks/bench_singleflight.py --concurrency 500 --distinct 5
+"""
+import argparse
+import asyncio
+import time
+
+from common import run_stub, stub_request_count
+
+
+async def main(concurrency: int, distinct: int, latency_ms: float):
+    with run_stub(latency_ms=latency_ms) as base_url:
+        from app.services.tmdb_service import TMDBService
+
+        service = TMDBService()
+
+        async def detail_page(movie_id: int):
+            await service.get_movie_details(movie_id)
+            await service.get_movie_credits(movie_id)
+
+        before = stub_request_count(base_url)
+        started = time.perf_counter()
+        await asyncio.gather(*(detail_page(i % distinct + 1) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        upstream = stub_request_count(base_url) - before
+
+        print(f"{concurrency} requests over {distinct} ids -> {upstream} upstream calls in {elapsed * 1000:.0f} ms")
+        print(f"coalescing: {service._inflight.stats()}")
+        await service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.distinct, args.latency_ms))
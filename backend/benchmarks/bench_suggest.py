@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark title suggestions: index build, incremental inserts and typeahead latency.
+
+Builds the title index over a synthetic corpus the size of TMDB's movie list
+(about a million titles; catalog and rated titles locally are a fraction of
+that): a few hundred common title words with Zipf frequencies plus a long
+tail of made-up words, and log-normal popularity. Then types popular titles
+keystroke by keystroke, some with a one-letter typo, and reports latency by
+query length, how often the movie is suggested, and a linear scan baseline.
+
+    python benchmarks/bench_suggest.py --titles 1000000 --queries 20000
+"""
+import argparse
+import os
+import random
+import time
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from common import percentile
+
+COMMON_WORDS = list(dict.fromkeys("""the of a and in to man love night last day life my dead world house war girl
+story black time blood king city all dark one little on for christmas american lost you from return
+big with part new home secret death life life great is lady woman star road two at game red bad boy
+shadow stone summer dragon fire wild good ghost blue sky island kill before true street killer no
+under out heart iii ii devil dream men city moon family blood paris final wolf angel beyond hunter
+rise legend lord power silent perfect last sea lost dance end first secret souls golden deep hell
+girls murder mission baby gold water empire sun brothers shadows born broken death winter""".split()))
+
+
+def synthetic_titles(count: int, seed: int = 11):
+    """(tmdb_id, title, popularity, year) rows with a realistic word and popularity distribution"""
+    rng = random.Random(seed)
+    syllables = ["ka", "ro", "mi", "ten", "sha", "lo", "ver", "dan", "el", "ra", "tor", "in", "bel", "zu",
+                 "mar", "ni", "que", "sol", "va", "gar", "ly", "o", "pen", "stri", "ax"]
+    tail = list({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(120000)})
+    common_weights = [1 / (rank + 1) for rank in range(len(COMMON_WORDS))]
+    titles = []
+    for tmdb_id in range(1, count + 1):
+        words = []
+        for _ in range(rng.choice((1, 2, 2, 3, 3, 3, 4, 4, 5, 6))):
+            draw = rng.random()
+            if draw < 0.55:
+                words.append(rng.choices(COMMON_WORDS, common_weights)[0])
+            elif draw < 0.7:
+                # Log-uniform rank: some rarer words recur a lot (names, places)
+                words.append(tail[int(len(tail) ** rng.random()) - 1])
+            else:
+                words.append(rng.choice(tail))
+        title = " ".join(words).title()
+        if rng.random() < 0.05:
+            title += f" {rng.randint(2, 4)}"
+        titles.append((tmdb_id, title, rng.lognormvariate(0.5, 1.6), rng.randint(1920, 2025)))
+    return titles
+
+
+def with_typo(rng: random.Random, text: str) -> str:
+    """Replace, drop or swap one letter inside a word of five or more letters"""
+    spots = [i for i, word in enumerate(text.split()) if len(word) >= 5]
+    if not spots:
+        return text
+    words = text.split()
+    word = words[rng.choice(spots)]
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("replace", "drop", "swap"))
+    if kind == "replace":
+        typo = word[:i] + rng.choice("aeioulnrst") + word[i + 1:]
+    elif kind == "drop":
+        typo = word[:i] + word[i + 1:]
+    else:
+        typo = word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return text.replace(word, typo, 1)
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def main(count: int, queries: int, inserts: int):
+    from app.services.title_index import TitleIndex, normalize_title
+
+    corpus = synthetic_titles(count + inserts)
+    initial, later = corpus[:count], corpus[count:]
+
+    before = rss_mb()
+    index = TitleIndex()
+    started = time.perf_counter()
+    index.load((tmdb_id, title, popularity, year, None, False) for tmdb_id, title, popularity, year in initial)
+    print(f"build: {len(index)} titles, {index.stats()['words']} words in {time.perf_counter() - started:.1f} s, "
+          f"+{rss_mb() - before:.0f} MB RSS")
+
+    started = time.perf_counter()
+    for tmdb_id, title, popularity, year in later:
+        index.add(tmdb_id, title, popularity, year)
+    elapsed = time.perf_counter() - started
+    print(f"incremental: {len(later)} inserts, {elapsed / len(later) * 1e6:.0f} µs each")
+
+    # What people type: popular titles, one keystroke at a time
+    rng = random.Random(5)
+    by_popularity = sorted(corpus, key=lambda row: -row[2])[:20000]
+    buckets = {"1-2 chars": [], "3-5 chars": [], "6+ chars": [], "typo": []}
+    found, targets, keystrokes = 0, 0, []
+    while sum(len(latencies) for latencies in buckets.values()) < queries:
+        tmdb_id, title, _, _ = rng.choice(by_popularity)
+        typed = title if rng.random() >= 0.15 else with_typo(rng, title)
+        is_typo = typed != title
+        targets += 1
+        first_hit = None
+        for n in range(1, len(typed) + 1):
+            query = typed[:n]
+            t = time.perf_counter()
+            items = index.suggest(query, 10)
+            latency = time.perf_counter() - t
+            if is_typo and query != title[:n]:
+                buckets["typo"].append(latency)
+            else:
+                buckets["1-2 chars" if n <= 2 else "3-5 chars" if n <= 5 else "6+ chars"].append(latency)
+            if first_hit is None and any(item["tmdb_id"] == tmdb_id for item in items):
+                first_hit = n
+        if first_hit is not None:
+            found += 1
+            keystrokes.append(first_hit / len(typed))
+
+    print(f"\ntypeahead over {len(index)} titles, limit 10:")
+    for label, latencies in buckets.items():
+        if latencies:
+            print(f"  {label:<10} {len(latencies):>6} queries   p50 {percentile(latencies, 50) * 1000:6.3f} ms   "
+                  f"p99 {percentile(latencies, 99) * 1000:6.3f} ms   max {max(latencies) * 1000:6.2f} ms")
+    print(f"  the movie was suggested for {found / targets:.1%} of {targets} typed titles, "
+          f"after {sum(keystrokes) / max(len(keystrokes), 1):.0%} of the title on average")
+
+    # Baseline: prefix match by scanning every normalized title
+    normalized = [(normalize_title(title), popularity) for _, title, popularity, _ in corpus]
+    latencies = []
+    for _ in range(20):
+        prefix = normalize_title(rng.choice(by_popularity)[1])[0][:3]
+        t = time.perf_counter()
+        matches = [(popularity, words) for words, popularity in normalized if any(w.startswith(prefix) for w in words)]
+        sorted(matches, key=lambda match: -match[0])[:10]
+        latencies.append(time.perf_counter() - t)
+    print(f"\nlinear scan baseline: p50 {percentile(latencies, 50) * 1000:.0f} ms per query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000, help="keystrokes to time")
+    parser.add_argument("--inserts", type=int, default=20000, help="titles added one by one after the build")
+    args = parser.parse_args()
+    main(args.titles, args.queries, args.inserts)
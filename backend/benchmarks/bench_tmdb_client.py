@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the TMDB client: blocking requests.get vs the pooled async client.
+
+Both modes run the same number of concurrent callers on one event loop
+against the local stub, which is what a uvicorn worker sees under load.
+
+    python benchmarks/bench_tmdb_client.py --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from common import report, run_stub
+
+
+async def run_callers(fetch, total: int, concurrency: int):
+    """Issue `total` fetches from `concurrency` callers, return (latencies, elapsed)"""
+    latencies = []
+    remaining = iter(range(total))
+
+    async def caller():
+        for i in remaining:
+            started = time.perf_counter()
+            await fetch(i % 500 + 1)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def main(total: int, concurrency: int, latency_ms: float):
+    with run_stub(latency_ms=latency_ms) as base_url:
+        # Import after run_stub has pointed TMDB_BASE_URL at the stub
+        from app.services.tmdb_service import TMDBService
+
+        async def blocking_fetch(page: int):
+            # What the old _make_request did: sync call, new connection every time
+            response = requests.get(f"{base_url}/3/movie/popular",
+                                    params={"page": page, "api_key": "benchmark"}, timeout=10)
+            return response.json()
+
+        service = TMDBService()
+
+        async def async_fetch(page: int):
+            return await service._make_request("movie/popular", {"page": page})
+
+        report("blocking requests.get", *await run_callers(blocking_fetch, total, concurrency))
+        report("async pooled client", *await run_callers(async_fetch, total, concurrency))
+        await service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency_ms))
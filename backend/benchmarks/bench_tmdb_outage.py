@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark tail latency while TMDB is down.
+
+Warms the cache with the category pages, lets it expire, then breaks the
+stub (--fault hang, error or ratelimit) and sends a steady stream of requests:
+mostly for those pages, plus searches that were never cached. Runs twice:
+"legacy" (no retries, no circuit breaker, no stale copies: every request waits
+for TMDB to fail) and "resilient" (the defaults). Reports latency and how many
+responses came back empty.
+
+    python benchmarks/bench_tmdb_outage.py --fault hang --timeout 10 --seconds 20
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from common import percentile, run_stub, set_stub_faults
+
+LEGACY = {"TMDB_MAX_RETRIES": 0, "TMDB_BREAKER_THRESHOLD": 0, "CACHE_STALE_TTL": 0, "TMDB_RATE_LIMIT": 0}
+
+
+async def traffic(service, seconds: float, rate: float):
+    """Requests at `rate` per second (80% cached pages, 20% new searches), returns latencies and empty count"""
+    from app.services.tmdb_service import CATEGORY_ENDPOINTS
+
+    rng = random.Random(7)
+    latencies = []
+    empty = 0
+
+    async def one(i: int):
+        nonlocal empty
+        started = time.perf_counter()
+        if rng.random() < 0.8:
+            data = await service.get_category_movies(rng.choice(list(CATEGORY_ENDPOINTS)), rng.randint(1, 5))
+        else:
+            data = await service.search_movies(f"query {i}")
+        latencies.append(time.perf_counter() - started)
+        empty += not data.get("results")
+
+    tasks = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.create_task(one(i)))
+        i += 1
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    return latencies, empty
+
+
+async def main(fault: str, seconds: float, rate: float, timeout: float, ttl: int):
+    with run_stub(latency_ms=20) as base_url:
+        from app.core.config import settings
+        from app.services.tmdb_service import TMDBService
+
+        settings.CACHE_REDIS_ENABLED = False
+        settings.CACHE_TTL_LIST = ttl
+        settings.TMDB_TIMEOUT = timeout
+        defaults = {name: getattr(settings, name) for name in LEGACY}
+
+        for label, overrides in (("legacy", LEGACY), ("resilient", defaults)):
+            for name, value in overrides.items():
+                setattr(settings, name, value)
+            set_stub_faults(base_url, "none")
+            service = TMDBService()
+            for category in ("popular", "trending", "now_playing", "upcoming", "top_rated"):
+                await asyncio.gather(*(service.get_category_movies(category, page) for page in range(1, 6)))
+            await asyncio.sleep(ttl + 0.5)  # Let every cached page expire
+
+            set_stub_faults(base_url, fault)
+            started = time.perf_counter()
+            latencies, empty = await traffic(service, seconds, rate)
+            elapsed = time.perf_counter() - started
+            upstream = service.upstream_stats()
+            print(f"{label:<10} {len(latencies):>5} requests in {elapsed:5.1f}s   "
+                  f"p50 {percentile(latencies, 50) * 1000:8.1f} ms   p99 {percentile(latencies, 99) * 1000:8.1f} ms   "
+                  f"empty {empty:>4}   stale {upstream['stale_served']:>4}   "
+                  f"upstream calls {upstream['requests']:>4}   breaker opened {upstream['breaker']['opened']}")
+            await service.aclose()
+        set_stub_faults(base_url, "none")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fault", choices=("hang", "error", "ratelimit", "flaky"), default="hang")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--rate", type=float, default=50, help="requests per second")
+    parser.add_argument("--timeout", type=float, default=10, help="TMDB_TIMEOUT for the run, seconds")
+    parser.add_argument("--ttl", type=int, default=2, help="CACHE_TTL_LIST for the run, seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.fault, args.seconds, args.rate, args.timeout, args.ttl))
@@ -0,0 +1,119 @@
+"""Shared helpers for the benchmark scripts"""
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+# Make `app` importable when running `python benchmarks/<script>.py`
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@contextlib.contextmanager
+def run_stub(port: int = 8765, latency_ms: float = 50, extra_args=()):
+    """Start the TMDB stub in a subprocess and point the backend at it"""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "tmdb_stub.py"),
+         "--port", str(port), "--latency-ms", str(latency_ms), *extra_args]
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{base_url}/__stats", timeout=0.5)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        os.environ["TMDB_BASE_URL"] = f"{base_url}/3"
+        os.environ.setdefault("TMDB_API_KEY", "benchmark")
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+@contextlib.contextmanager
+def run_api(port: int = 8001, env=None, app: str = "app.main:app"):
+    """Start the backend with uvicorn in a subprocess, on a throwaway SQLite database"""
+    db_dir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        "TMDB_API_KEY": "",
+        "RECOMMENDER_TRAIN_ON_STARTUP": "false",
+        "RECOMMENDER_MODEL_PATH": os.path.join(db_dir, "recommender.npz"),
+        **(env or {}),
+    }
+    subprocess.run([sys.executable, "-c", "from app.database.init_db import init_database; init_database()"],
+                   cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{base_url}/health", timeout=0.5)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        yield base_url, proc
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def auth_headers(base_url: str, username: str = "bench", password: str = "bench-password") -> dict:
+    """Register a user (if needed) and log in, returns the Authorization header"""
+    httpx.post(f"{base_url}/api/v1/auth/register",
+               json={"username": username, "email": f"{username}@example.com", "password": password})
+    response = httpx.post(f"{base_url}/api/v1/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident memory of a process (Linux)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def stub_request_count(base_url: str) -> int:
+    """Number of requests the stub has served so far"""
+    return httpx.get(f"{base_url}/__stats").json()["requests"]
+
+
+def set_stub_faults(base_url: str, mode: str = "none", **params):
+    """Switch the stub's fault injection mode (none, error, flaky, ratelimit, hang)"""
+    httpx.post(f"{base_url}/__faults", params={"mode": mode, **params}).raise_for_status()
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(label: str, latencies, elapsed: float):
+    """Print throughput and latency percentiles (latencies in seconds)"""
+    print(
+        f"{label:<28} {len(latencies) / elapsed:>9.1f} req/s   "
+        f"p50 {percentile(latencies, 50) * 1000:>8.1f} ms   "
+        f"p99 {percentile(latencies, 99) * 1000:>8.1f} ms"
+    )
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Local stub of the TMDB API for benchmarks.
+
+Serves deterministic fake movie data under /3 with a configurable delay, so
+the backend can be pointed at it with TMDB_BASE_URL=http://127.0.0.1:8765/3
+
+    python benchmarks/tmdb_stub.py --port 8765 --latency-ms 50
+
+Faults can be injected at startup (--fault, --error-rate) or while it runs,
+e.g. `curl -X POST "http://127.0.0.1:8765/__faults?mode=hang"`:
+
+    none       normal responses
+    error      every request fails with 503
+    flaky      a fraction (error_rate) of requests fail with 503
+    ratelimit  every request gets 429 with Retry-After: retry_after
+    hang       requests don't answer until the mode changes (or the client times out)
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+from typing import Optional
+
+from fastapi import FastAPI, Response
+import uvicorn
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "50"))
+TOTAL_PAGES = 500
+PAGE_SIZE = 20
+GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+MISSING_MOVIE_IDS = 10000000  # Movie ids from here on are 404s, like deleted TMDB entries
+
+FAULT_MODES = ("none", "error", "flaky", "ratelimit", "hang")
+
+app = FastAPI()
+stats = {"requests": 0, "faults": 0}
+faults = {"mode": "none", "error_rate": 0.5, "retry_after": 1}
+
+
+def fake_movie(movie_id: int) -> dict:
+    """Build a deterministic TMDB-shaped movie for an id"""
+    rng = random.Random(movie_id)
+    return {
+        "id": movie_id,
+        "title": f"Stub Movie {movie_id}",
+        "original_title": f"Stub Movie {movie_id}",
+        "overview": f"Overview for stub movie {movie_id}.",
+        "genre_ids": rng.sample(GENRE_IDS, rng.randint(1, 3)),
+        "release_date": f"{rng.randint(1970, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "poster_path": f"/poster{movie_id}.jpg",
+        "backdrop_path": f"/backdrop{movie_id}.jpg",
+        "vote_average": round(rng.uniform(3, 9), 1),
+        "vote_count": rng.randint(0, 20000),
+        "popularity": round(rng.uniform(1, 500), 3),
+        "adult": False,
+        "original_language": "en",
+    }
+
+
+def fake_credits(movie_id: int) -> dict:
+    """Build cast and crew for a movie"""
+    return {
+        "cast": [{"name": f"Actor {movie_id}-{i}"} for i in range(15)],
+        "crew": [{"name": f"Director {movie_id}", "job": "Director"}],
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def fake_page(seed: int, page: int) -> bytes:
+    """Build one page of a movie list"""
+    start = seed * 100000 + (page - 1) * PAGE_SIZE + 1
+    return json.dumps({
+        "page": page,
+        "results": [fake_movie(movie_id) for movie_id in range(start, start + PAGE_SIZE)],
+        "total_pages": TOTAL_PAGES,
+        "total_results": TOTAL_PAGES * PAGE_SIZE,
+    }).encode()
+
+
+def injected_fault() -> Optional[Response]:
+    """The error response for the current fault mode, if this request should fail"""
+    mode = faults["mode"]
+    if mode == "error" or (mode == "flaky" and random.random() < faults["error_rate"]):
+        return Response(status_code=503, content=b'{"status_message": "Service unavailable"}',
+                        media_type="application/json")
+    if mode == "ratelimit":
+        return Response(status_code=429, content=b'{"status_message": "Too many requests"}',
+                        media_type="application/json", headers={"Retry-After": str(faults["retry_after"])})
+    return None
+
+
+async def respond(body) -> Response:
+    """Count the request, wait the simulated upstream latency and reply with JSON"""
+    stats["requests"] += 1
+    if faults["mode"] == "hang":
+        stats["faults"] += 1
+        while faults["mode"] == "hang":  # Released when the mode changes
+            await asyncio.sleep(0.1)
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    fault = injected_fault()
+    if fault is not None:
+        stats["faults"] += 1
+        return fault
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/__stats")
+async def get_stats():
+    return {**stats, **faults}
+
+
+@app.post("/__faults")
+async def set_faults(mode: str = "none", error_rate: Optional[float] = None, retry_after: Optional[int] = None):
+    if mode not in FAULT_MODES:
+        return Response(status_code=400, content=f"mode must be one of {FAULT_MODES}")
+    faults["mode"] = mode
+    if error_rate is not None:
+        faults["error_rate"] = error_rate
+    if retry_after is not None:
+        faults["retry_after"] = retry_after
+    return faults
+
+
+@app.get("/3/movie/{category}")
+async def movie_list(category: str, page: int = 1, append_to_response: str = ""):
+    if category.isdigit():
+        if int(category) >= MISSING_MOVIE_IDS:
+            stats["requests"] += 1
+            return Response(status_code=404, media_type="application/json",
+                            content=b'{"status_message": "The resource you requested could not be found."}')
+        movie = fake_movie(int(category))
+        movie["genres"] = [{"id": g, "name": str(g)} for g in movie["genre_ids"]]
+        movie.update({"runtime": 120, "budget": 0, "revenue": 0, "status": "Released",
+                      "tagline": "", "production_companies": []})
+        if "credits" in append_to_response.split(","):
+            movie["credits"] = fake_credits(int(category))
+        return await respond(movie)
+    seeds = {"popular": 1, "now_playing": 2, "upcoming": 3, "top_rated": 4}
+    return await respond(fake_page(seeds.get(category, 9), page))
+
+
+@app.get("/3/movie/{movie_id}/credits")
+async def movie_credits(movie_id: int):
+    return await respond({"id": movie_id, **fake_credits(movie_id)})
+
+
+@app.get("/3/trending/movie/{time_window}")
+async def trending(time_window: str, page: int = 1):
+    return await respond(fake_page(5, page))
+
+
+@app.get("/3/search/movie")
+async def search(query: str = "", page: int = 1):
+    return await respond(fake_page(6 + len(query) % 3, page))
+
+
+@app.get("/3/discover/movie")
+async def discover(page: int = 1, with_genres: str = ""):
+    if not with_genres:
+        return await respond(fake_page(8, page))
+    # Like TMDB, only return movies that carry the requested genre(s)
+    wanted = [int(g) for g in with_genres.replace("|", ",").split(",")]
+    data = json.loads(fake_page(8, page))
+    for movie in data["results"]:
+        movie["genre_ids"] = list(dict.fromkeys(wanted if "," in with_genres else wanted[:1])) + movie["genre_ids"]
+    return await respond(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the TMDB stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--fault", choices=FAULT_MODES, default="none")
+    parser.add_argument("--error-rate", type=float, default=0.5, help="failure fraction in flaky mode")
+    parser.add_argument("--retry-after", type=int, default=1, help="seconds, in ratelimit mode")
+    args = parser.parse_args()
+    LATENCY_MS = args.latency_ms
+    faults.update(mode=args.fault, error_rate=args.error_rate, retry_after=args.retry_after)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Build the similar-movies ANN index from the movie catalog and the ratings table
+"""
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.ann_index import similar_index
+from app.services.embeddings import build_movie_embeddings, load_catalog_movies
+from app.services.recommender import recommender
+
+def main():
+    print("🧭 CineMatch Similar-Movies Index")
+    print("=" * 50)
+    
+    # Rating co-occurrence comes from the saved recommender model, or a fresh fit
+    db = SessionLocal()
+    try:
+        if not recommender.load(settings.RECOMMENDER_MODEL_PATH):
+            recommender.fit_from_db(db)
+        movies = list(load_catalog_movies(db))
+    finally:
+        db.close()
+    
+    item_ids, item_user = recommender.item_user_matrix()
+    if not movies and not len(item_ids):
+        print("⏭️  No catalog movies or ratings to index")
+        return False
+    
+    tmdb_ids, vectors = build_movie_embeddings(movies, item_ids, item_user)
+    similar_index.build(tmdb_ids, vectors)
+    similar_index.save(settings.SIMILAR_INDEX_PATH)
+    print(f"✅ Index saved to {settings.SIMILAR_INDEX_PATH}: {similar_index.info()}")
+    return True
+
+if __name__ == "__main__":
+    main()
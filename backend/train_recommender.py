@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Train the CineMatch recommendation model from the ratings table
+"""
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.recommender import recommender
+
+def main():
+    print("🎯 CineMatch Recommender Training")
+    print("=" * 50)
+    
+    db = SessionLocal()
+    try:
+        recommender.fit_from_db(db)
+    finally:
+        db.close()
+    
+    if not recommender.is_trained:
+        print("⏭️  No ratings to train on")
+        return False
+    
+    recommender.save(settings.RECOMMENDER_MODEL_PATH)
+    print(f"✅ Model saved to {settings.RECOMMENDER_MODEL_PATH}: {recommender.info()}")
+    return True
+
+if __name__ == "__main__":
+    main()
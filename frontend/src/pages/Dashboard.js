@@ -25,8 +25,8 @@ const Dashboard = () => {
       setRecommendations(recommendationsData.slice(0, 12)); // Show 12 recommendations
 
       // Fetch user's recent ratings
-      const ratingsData = await ratingService.getMyRatings();
-      setRecentRatings(ratingsData.slice(0, 6)); // Show 6 recent ratings
+      const ratingsData = await ratingService.getMyRatings(6);
+      setRecentRatings(await ratingService.withMovies(ratingsData)); // Show 6 recent ratings
       
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
@@ -1,4 +1,5 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
+import { Link } from 'react-router-dom';
 import { movieService } from '../services/movieService';
 import MovieGrid from '../components/Movies/MovieGrid';
 import LoadingSpinner from '../components/Common/LoadingSpinner';
@@ -15,6 +16,10 @@ const Movies = () => {
   const [totalPages, setTotalPages] = useState(1);
   const [hasMore, setHasMore] = useState(true);
   const [searchQuery, setSearchQuery] = useState('');
+  const [searchInput, setSearchInput] = useState('');
+  const [suggestions, setSuggestions] = useState([]);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+  const latestSuggest = useRef(0);
   const [selectedGenre, setSelectedGenre] = useState('');
   const [showFilters, setShowFilters] = useState(false);
   const [totalResults, setTotalResults] = useState(0);
@@ -62,15 +67,15 @@ const Movies = () => {
   ];
 
   // Fetch Movies Function
-  const fetchMovies = async (category, page, append, genre) => {
+  const fetchMovies = async (category, page, append, genre, query = searchQuery) => {
     setLoading(true);
     setError(null);
 
     try {
       let response;
       
-      if (searchQuery.trim()) {
-        response = await movieService.searchMovies(searchQuery, page || 1);
+      if (query.trim()) {
+        response = await movieService.searchMovies(query, page || 1);
       } else if (genre) {
         response = await movieService.getMoviesByGenre(genre, page || 1);
       } else {
@@ -114,19 +119,47 @@ const Movies = () => {
     setCurrentPage(1);
     setMovies([]);
     setSearchQuery('');
+    setSearchInput('');
     setSelectedGenre('');
   };
 
+  // Handle Typing: suggestions come from the local title index, TMDB is only searched on submit
+  const handleSearchInput = async (value) => {
+    setSearchInput(value);
+    const request = ++latestSuggest.current;
+
+    if (!value.trim()) {
+      setSuggestions([]);
+      return;
+    }
+
+    try {
+      const response = await movieService.suggestMovies(value);
+      // Ignore answers to keystrokes that have since been superseded
+      if (request === latestSuggest.current) {
+        setSuggestions(response.items || []);
+        setShowSuggestions(true);
+      }
+    } catch (err) {
+      if (request === latestSuggest.current) {
+        setSuggestions([]);
+      }
+    }
+  };
+
   // Handle Search
   const handleSearch = (query) => {
+    latestSuggest.current += 1;
     setSearchQuery(query);
+    setSuggestions([]);
+    setShowSuggestions(false);
     setCurrentPage(1);
     setMovies([]);
     
     if (query.trim()) {
-      fetchMovies('search', 1, false, '');
+      fetchMovies('search', 1, false, '', query);
     } else {
-      fetchMovies(currentCategory, 1, false, selectedGenre);
+      fetchMovies(currentCategory, 1, false, selectedGenre, '');
     }
   };
 
@@ -136,8 +169,9 @@ const Movies = () => {
     setCurrentPage(1);
     setMovies([]);
     setSearchQuery('');
+    setSearchInput('');
     
-    fetchMovies(currentCategory, 1, false, genre);
+    fetchMovies(currentCategory, 1, false, genre, '');
   };
 
   // Handle Load More
@@ -177,18 +211,48 @@ const Movies = () => {
         <div className="mb-8">
           <div className="flex flex-col md:flex-row gap-4 items-center">
             {/* Search Bar */}
-            <div className="relative flex-1 max-w-md">
+            <form
+              className="relative flex-1 max-w-md"
+              onSubmit={(e) => {
+                e.preventDefault();
+                handleSearch(searchInput);
+              }}
+            >
               <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
                 <MagnifyingGlassIcon className="h-5 w-5 text-gray-400" />
               </div>
               <input
                 type="text"
                 placeholder="Search movies..."
-                value={searchQuery}
-                onChange={(e) => handleSearch(e.target.value)}
+                value={searchInput}
+                onChange={(e) => handleSearchInput(e.target.value)}
+                onFocus={() => setShowSuggestions(true)}
+                onBlur={() => setTimeout(() => setShowSuggestions(false), 150)}
                 className="block w-full pl-10 pr-3 py-3 border border-gray-600 rounded-lg bg-gray-800 text-white placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-netflix-red focus:border-transparent"
               />
-            </div>
+
+              {/* Suggestions Dropdown */}
+              {showSuggestions && suggestions.length > 0 && (
+                <ul className="absolute z-20 mt-1 w-full bg-gray-800 border border-gray-600 rounded-lg shadow-lg overflow-hidden">
+                  {suggestions.map((item) => (
+                    <li key={item.tmdb_id}>
+                      <Link
+                        to={`/movies/${item.tmdb_id}`}
+                        className="flex items-center space-x-3 px-3 py-2 hover:bg-gray-700"
+                      >
+                        {item.poster_url ? (
+                          <img src={item.poster_url} alt="" className="w-8 h-12 object-cover rounded" />
+                        ) : (
+                          <div className="w-8 h-12 bg-gray-700 rounded" />
+                        )}
+                        <span className="text-white text-sm truncate">{item.title}</span>
+                        {item.year && <span className="text-gray-400 text-xs">{item.year}</span>}
+                      </Link>
+                    </li>
+                  ))}
+                </ul>
+              )}
+            </form>
 
             {/* Filter Toggle */}
             <button
@@ -234,7 +298,8 @@ const Movies = () => {
                     onClick={() => {
                       setSelectedGenre('');
                       setSearchQuery('');
-                      fetchMovies(currentCategory, 1, false, '');
+                      setSearchInput('');
+                      fetchMovies(currentCategory, 1, false, '', '');
                     }}
                     className="w-full px-4 py-2 bg-gray-600 hover:bg-gray-500 text-white rounded-md transition-colors"
                   >
@@ -324,9 +389,10 @@ const Movies = () => {
             <button
               onClick={() => {
                 setSearchQuery('');
+                setSearchInput('');
                 setSelectedGenre('');
                 setCurrentCategory('popular');
-                fetchMovies('popular', 1, false, '');
+                fetchMovies('popular', 1, false, '', '');
               }}
               className="bg-netflix-red hover:bg-red-700 text-white px-6 py-3 rounded-lg font-semibold transition-colors"
             >
@@ -22,8 +22,8 @@ const Profile = () => {
   const fetchUserData = async () => {
     try {
       setLoading(true);
-      const ratings = await ratingService.getMyRatings();
-      setUserRatings(ratings);
+      const ratings = await ratingService.getAllMyRatings();
+      setUserRatings(await ratingService.withMovies(ratings));
       
       // Calculate stats
       const totalRatings = ratings.length;
@@ -34,6 +34,25 @@ export const movieService = {
     }
   },
 
+  // Details for many movies in one request (the backend takes up to 300 ids per call).
+  // Returns { items, errors }; movies TMDB couldn't provide are listed in errors.
+  async getMoviesBatch(ids) {
+    const unique = [...new Set(ids)];
+    const items = [];
+    const errors = [];
+    try {
+      for (let start = 0; start < unique.length; start += 300) {
+        const response = await api.post('/movies/batch', { ids: unique.slice(start, start + 300) });
+        items.push(...response.data.items);
+        errors.push(...response.data.errors);
+      }
+      return { items, errors };
+    } catch (error) {
+      console.error('Error fetching movies:', error);
+      throw error;
+    }
+  },
+
   // Search movies (UPDATED - new search endpoint)
   async searchMovies(query, page = 1) {
     try {
@@ -45,6 +64,17 @@ export const movieService = {
     }
   },
 
+  // Typeahead suggestions from the backend's local title index (no TMDB call per keystroke)
+  async suggestMovies(query, limit = 8) {
+    try {
+      const response = await api.get(`/movies/suggest?q=${encodeURIComponent(query)}&limit=${limit}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching suggestions:', error);
+      throw error;
+    }
+  },
+
   // Get movies by genre (UPDATED - now uses category filtering)
   async getMoviesByGenre(genre, page = 1) {
     try {
@@ -168,7 +198,9 @@ export const {
   getMoviesByCategory,
   getMovies,
   getMovieById,
+  getMoviesBatch,
   searchMovies,
+  suggestMovies,
   getMoviesByGenre,
   getTrendingMovies,
   getPopularMovies,
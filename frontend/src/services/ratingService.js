@@ -1,5 +1,6 @@
 import api from './api';
 import toast from 'react-hot-toast';
+import { movieService } from './movieService';
 
 export const ratingService = {
   // Rate a movie
@@ -18,10 +19,11 @@ export const ratingService = {
     }
   },
 
-  // Get user's ratings
-  async getMyRatings() {
+  // Get a page of user's ratings, newest first
+  async getMyRatings(limit = 100, cursor = null) {
     try {
-      const response = await api.get('/ratings/my-ratings');
+      const params = cursor ? { limit, cursor } : { limit };
+      const response = await api.get('/ratings/my-ratings', { params });
       return response.data;
     } catch (error) {
       console.error('Error fetching ratings:', error);
@@ -29,6 +31,43 @@ export const ratingService = {
     }
   },
 
+  // Get all of user's ratings, following the X-Next-Cursor header page by page
+  async getAllMyRatings() {
+    try {
+      const ratings = [];
+      let cursor = null;
+      do {
+        const params = cursor ? { limit: 1000, cursor } : { limit: 1000 };
+        const response = await api.get('/ratings/my-ratings', { params });
+        ratings.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      return ratings;
+    } catch (error) {
+      console.error('Error fetching ratings:', error);
+      throw error;
+    }
+  },
+
+  // Attach current movie metadata as rating.movie, falling back to the title and poster saved with the rating
+  async withMovies(ratings) {
+    let movies = {};
+    try {
+      const { items } = await movieService.getMoviesBatch(ratings.map(r => r.tmdb_movie_id));
+      movies = Object.fromEntries(items.map(movie => [movie.id, movie]));
+    } catch (error) {
+      // Saved titles and posters are good enough to show
+    }
+    return ratings.map(rating => ({
+      ...rating,
+      movie: movies[rating.tmdb_movie_id] || {
+        id: rating.tmdb_movie_id,
+        title: rating.movie_title,
+        poster_url: rating.movie_poster
+      }
+    }));
+  },
+
   // Delete a rating
   async deleteRating(ratingId) {
     try {
@@ -39,5 +78,27 @@ export const ratingService = {
       toast.error(message);
       throw error;
     }
+  },
+
+  // CineMatch community ratings (count, average, histogram) for the movies on a page
+  async getCommunityStats(movieIds) {
+    try {
+      const response = await api.get(`/ratings/movies?ids=${movieIds.join(',')}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching community ratings:', error);
+      throw error;
+    }
+  },
+
+  // Movies ranked by our users: sort = 'bayesian' or 'count' (most rated)
+  async getCommunityTop(sort = 'bayesian', limit = 20) {
+    try {
+      const response = await api.get(`/ratings/movies/top?sort=${sort}&limit=${limit}`);
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching community top movies:', error);
+      throw error;
+    }
   }
 };
\ No newline at end of file